@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複利與攤還情境試算
+一次計算大量存款、貸款在不同利率與期間下的結果
+
+- 本金、年利率、年數、每年複利（繳款）次數都可以是陣列，彼此依廣播規則組合
+- 有安裝 NumPy 時以向量化運算計算，否則用內建函數逐筆計算
+- 攤還表可能非常大，以分批的方式串流寫入 CSV（可選 gzip 壓縮）
+
+用法：
+    python interest_scenarios.py --scenarios 1000000 --schedule-scenarios 2000
+"""
+
+import argparse
+import csv
+import gzip
+import itertools
+import math
+import random
+import time
+
+try:
+    import numpy as np      # 選用：有安裝 NumPy 時用來向量化計算
+except ImportError:
+    np = None
+
+SCHEDULE_COLUMNS = ["scenario", "period", "payment", "interest", "principal", "balance"]
+
+def broadcast(*columns):
+    """把純量與清單組合成等長的清單（純 Python 版本的廣播）"""
+    columns = [list(c) if isinstance(c, (list, tuple, range)) else [c] for c in columns]
+    length = max(len(c) for c in columns)
+    for c in columns:
+        if len(c) not in (1, length):
+            raise ValueError("各欄位的長度必須相同或為 1")
+    return [c * length if len(c) == 1 else c for c in columns]
+
+def use_vectorized(use_numpy):
+    """決定是否使用 NumPy"""
+    if use_numpy is None:
+        return np is not None
+    if use_numpy and np is None:
+        raise ValueError("向量化計算需要安裝 NumPy")
+    return use_numpy
+
+def compound_scenarios(principal, rate, years, compounds=1, use_numpy=None):
+    """複利情境 - 回傳 {"amount": 最終金額, "interest": 利息}
+    
+    principal: 本金
+    rate: 年利率（0.05 代表 5%）
+    years: 年數
+    compounds: 每年複利次數
+    公式：A = P(1 + r/n)^(nt)，以 exp(nt·log1p(r/n)) 計算，利率很小時也不失準
+    """
+    if use_vectorized(use_numpy):
+        principal, rate, years, compounds = np.broadcast_arrays(
+            np.asarray(principal, dtype=np.float64), np.asarray(rate, dtype=np.float64),
+            np.asarray(years, dtype=np.float64), np.asarray(compounds, dtype=np.float64))
+        growth = np.exp(compounds * years * np.log1p(rate / compounds))
+        amount = principal * growth
+        return {"amount": amount, "interest": amount - principal}
+    
+    amounts = []
+    for p, r, t, n in zip(*broadcast(principal, rate, years, compounds)):
+        amounts.append(p * math.exp(n * t * math.log1p(r / n)))
+    principals = broadcast(principal, amounts)[0]
+    return {"amount": amounts, "interest": [a - p for a, p in zip(amounts, principals)]}
+
+def loan_payments(principal, rate, years, payments_per_year=12, use_numpy=None):
+    """每期攤還金額（本息平均攤還）- 回傳 {"periods": 期數, "payment": 每期金額, "total_interest": 總利息}
+    
+    每期利率 i = r/m，期數 N = 年數 × m；公式：PMT = P·i / (1 - (1+i)^-N)，利率為 0 時 PMT = P/N
+    """
+    if use_vectorized(use_numpy):
+        principal, rate, years, payments_per_year = np.broadcast_arrays(
+            np.asarray(principal, dtype=np.float64), np.asarray(rate, dtype=np.float64),
+            np.asarray(years, dtype=np.float64), np.asarray(payments_per_year, dtype=np.float64))
+        periods = np.maximum(np.rint(years * payments_per_year), 1).astype(np.int64)
+        i = rate / payments_per_year
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # -expm1(-N·log1p(i)) 即 1 - (1+i)^-N，利率很小時比直接相減精確
+            payment = np.where(i != 0, principal * i / -np.expm1(-periods * np.log1p(i)),
+                               principal / periods)
+        return {"periods": periods, "payment": payment, "total_interest": payment * periods - principal}
+    
+    periods, payments = [], []
+    for p, r, t, m in zip(*broadcast(principal, rate, years, payments_per_year)):
+        n = max(round(t * m), 1)
+        i = r / m
+        periods.append(n)
+        payments.append(p * i / -math.expm1(-n * math.log1p(i)) if i else p / n)
+    principals = broadcast(principal, payments)[0]
+    return {
+        "periods": periods,
+        "payment": payments,
+        "total_interest": [pmt * n - p for pmt, n, p in zip(payments, periods, principals)]
+    }
+
+def schedule_block(principal, rate, payments_per_year, periods, payment):
+    """NumPy：一批貸款的完整攤還表，回傳 (貸款編號, 期數, 每期金額, 利息, 本金, 餘額) 陣列
+    
+    第 k 期後的餘額有公式解 B_k = P(1+i)^k - PMT·((1+i)^k - 1)/i，
+    所以整批貸款的所有期數可以一次以矩陣計算，不必逐期迴圈。
+    """
+    i = (rate / payments_per_year)[:, None]
+    k = np.arange(1, periods.max() + 1)[None, :]
+    growth = np.expm1(k * np.log1p(i))                              # (1+i)^k - 1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        annuity = np.where(i != 0, growth / i, k)                   # ((1+i)^k - 1)/i
+    balance = principal[:, None] * (1 + growth) - payment[:, None] * annuity
+    previous = np.concatenate([principal[:, None], balance[:, :-1]], axis=1)
+    interest = previous * i
+    
+    valid = k <= periods[:, None]
+    # 最後一期把餘額的浮點誤差一起結清
+    balance = np.where(k == periods[:, None], 0.0, balance)
+    rows, cols = np.nonzero(valid)
+    paid_principal = previous - balance
+    return (rows, cols + 1, (interest + paid_principal)[rows, cols], interest[rows, cols],
+            paid_principal[rows, cols], balance[rows, cols])
+
+def schedule_rows_python(principal, rate, years, payments_per_year):
+    """純 Python：逐期產生攤還表的每一列"""
+    columns = broadcast(principal, rate, years, payments_per_year)
+    terms = loan_payments(*columns, use_numpy=False)
+    for scenario, (p, r, _, m) in enumerate(zip(*columns)):
+        n = terms["periods"][scenario]
+        payment = terms["payment"][scenario]
+        i = r / m
+        balance = p
+        for period in range(1, n + 1):
+            interest = balance * i
+            paid = payment - interest if period < n else balance
+            balance = balance - paid if period < n else 0.0
+            yield scenario, period, interest + paid, interest, paid, balance
+
+def open_sink(filename, compression=None):
+    """開啟輸出檔案，compression="gzip" 時以 gzip 壓縮寫入"""
+    if compression == "gzip":
+        return gzip.open(filename, "wt", encoding="utf-8", newline="")
+    if compression is not None:
+        raise ValueError(f"不支援的壓縮格式: {compression}")
+    return open(filename, "w", encoding="utf-8", newline="")
+
+def stream_schedules_csv(filename, principal, rate, years, payments_per_year=12,
+                         chunk_size=2000, compression=None, use_numpy=None):
+    """把所有情境的攤還表串流寫入 CSV，回傳寫入的列數
+    
+    每次只計算 chunk_size 筆貸款，記憶體用量與情境總數無關。
+    """
+    vectorized = use_vectorized(use_numpy)
+    rows_written = 0
+    
+    with open_sink(filename, compression) as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(SCHEDULE_COLUMNS)
+        
+        if not vectorized:
+            for row in schedule_rows_python(principal, rate, years, payments_per_year):
+                writer.writerow([row[0], row[1]] + [f"{value:.2f}" for value in row[2:]])
+                rows_written += 1
+            return rows_written
+        
+        principal, rate, years, payments_per_year = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(principal, dtype=np.float64)),
+            np.atleast_1d(np.asarray(rate, dtype=np.float64)),
+            np.atleast_1d(np.asarray(years, dtype=np.float64)),
+            np.atleast_1d(np.asarray(payments_per_year, dtype=np.float64)))
+        terms = loan_payments(principal, rate, years, payments_per_year)
+        
+        for start in range(0, len(principal), chunk_size):
+            block = slice(start, start + chunk_size)
+            scenario, period, payment, interest, paid, balance = schedule_block(
+                principal[block], rate[block], payments_per_year[block],
+                terms["periods"][block], terms["payment"][block])
+            table = np.column_stack([scenario + start, period, payment, interest, paid, balance])
+            np.savetxt(f, table, fmt=["%d", "%d", "%.2f", "%.2f", "%.2f", "%.2f"], delimiter=",")
+            rows_written += len(table)
+    
+    return rows_written
+
+def scenario_grid(principals, rates, years, compounds):
+    """所有參數組合（笛卡兒積）攤平成四個等長欄位"""
+    combos = list(itertools.product(principals, rates, years, compounds))
+    return [list(column) for column in zip(*combos)]
+
+def random_portfolio(count, seed=42):
+    """產生固定種子的隨機存款/貸款組合，供效能測試使用"""
+    rng = random.Random(seed)
+    principal = [rng.uniform(1_000, 1_000_000) for _ in range(count)]
+    rate = [rng.choice([0.0, 0.01, 0.025, 0.035, 0.05, 0.08]) for _ in range(count)]
+    years = [rng.choice([1, 5, 10, 20, 30]) for _ in range(count)]
+    frequency = [rng.choice([1, 4, 12]) for _ in range(count)]
+    return principal, rate, years, frequency
+
+def benchmark(scenarios=1_000_000, schedule_scenarios=2000, schedule_file=None,
+              compression=None, seed=42, use_numpy=None):
+    """效能測試：大量情境的複利與攤還計算，以及攤還表串流寫入"""
+    principal, rate, years, frequency = random_portfolio(scenarios, seed)
+    if use_vectorized(use_numpy):
+        principal, rate, years, frequency = (np.array(c, dtype=np.float64)
+                                             for c in (principal, rate, years, frequency))
+    
+    results = {}
+    start = time.perf_counter()
+    compound_scenarios(principal, rate, years, frequency, use_numpy=use_numpy)
+    results["compound_seconds"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    loan_payments(principal, rate, years, frequency, use_numpy=use_numpy)
+    results["payment_seconds"] = time.perf_counter() - start
+    
+    if schedule_file and schedule_scenarios:
+        start = time.perf_counter()
+        rows = stream_schedules_csv(schedule_file, principal[:schedule_scenarios], rate[:schedule_scenarios],
+                                    years[:schedule_scenarios], frequency[:schedule_scenarios],
+                                    compression=compression, use_numpy=use_numpy)
+        results["schedule_seconds"] = time.perf_counter() - start
+        results["schedule_rows"] = rows
+    
+    return results
+
+def main():
+    """命令列進入點：執行效能測試"""
+    parser = argparse.ArgumentParser(description="複利與攤還情境試算效能測試")
+    parser.add_argument("--scenarios", type=int, default=1_000_000, help="情境數量")
+    parser.add_argument("--schedule-scenarios", type=int, default=2000,
+                        help="寫出完整攤還表的情境數量（0 表示不寫出）")
+    parser.add_argument("--schedule-file", default="schedules.csv", help="攤還表輸出檔案")
+    parser.add_argument("--gzip", action="store_true", help="以 gzip 壓縮攤還表")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--pure-python", action="store_true", help="不使用 NumPy")
+    args = parser.parse_args()
+    
+    schedule_file = args.schedule_file + (".gz" if args.gzip and not args.schedule_file.endswith(".gz") else "")
+    results = benchmark(args.scenarios, args.schedule_scenarios, schedule_file,
+                        "gzip" if args.gzip else None, args.seed,
+                        False if args.pure_python else None)
+    
+    print(f"情境數量：{args.scenarios:,}")
+    print(f"複利計算：{results['compound_seconds']:.3f} 秒"
+          f"（每秒 {args.scenarios / max(results['compound_seconds'], 1e-9):,.0f} 筆）")
+    print(f"攤還金額：{results['payment_seconds']:.3f} 秒"
+          f"（每秒 {args.scenarios / max(results['payment_seconds'], 1e-9):,.0f} 筆）")
+    if "schedule_seconds" in results:
+        print(f"攤還表：{results['schedule_rows']:,} 列，{results['schedule_seconds']:.3f} 秒"
+              f"（每秒 {results['schedule_rows'] / max(results['schedule_seconds'], 1e-9):,.0f} 列）→ {schedule_file}")
+
+if __name__ == "__main__":
+    main()
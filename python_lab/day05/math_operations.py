@@ -222,6 +222,37 @@ def compound_interest_calculator():
     except ValueError:
         print("請輸入有效的數字！")
 
+def compound_scenario_table():
+    """複利情境比較表 - 一次比較多組利率、年數與複利頻率"""
+    print("\n=== 複利情境比較表 ===")
+    
+    # 只有這個選項需要情境計算（會一併載入 NumPy），所以用到時才匯入，其他功能不必等待
+    from interest_scenarios import compound_scenarios, scenario_grid
+    
+    try:
+        principal = float(input("請輸入本金："))
+        rates = [float(x) / 100 for x in input("請輸入年利率（%，以空格分隔，例如：1 2.5 5）：").split()]
+        years = [int(x) for x in input("請輸入投資年數（以空格分隔，例如：5 10 20）：").split()]
+        compounds = [int(x) for x in input("請輸入每年複利次數（以空格分隔，例如：1 12）：").split() or ["1"]]
+        
+        if not rates or not years:
+            print("請至少輸入一個利率和一個年數！")
+            return
+        
+        # 所有組合一次計算
+        principals, rate_column, year_column, compound_column = scenario_grid([principal], rates, years, compounds)
+        results = compound_scenarios(principals, rate_column, year_column, compound_column)
+        
+        print(f"\n本金：${principal:,.2f}")
+        print(f"{'年利率':>8} {'年數':>6} {'複利次數':>8} {'最終金額':>16} {'獲得利息':>16}")
+        print("-" * 60)
+        for rate, year, compound, amount, interest in zip(rate_column, year_column, compound_column,
+                                                          results["amount"], results["interest"]):
+            print(f"{rate*100:>7.2f}% {year:>6} {compound:>8} {amount:>16,.2f} {interest:>16,.2f}")
+        
+    except ValueError:
+        print("請輸入有效的數字！")
+
 def main():
     """主程式"""
     print("Day 5: 數學運算範例程式")
@@ -236,9 +267,10 @@ def main():
         print("5. 幾何計算器")
         print("6. 數字猜測遊戲")
         print("7. 複利計算器")
+        print("8. 複利情境比較表")
         print("0. 結束程式")
         
-        choice = input("\n請輸入選項 (0-7)：")
+        choice = input("\n請輸入選項 (0-8)：")
         
         if choice == "1":
             basic_math_demo()
@@ -254,6 +286,8 @@ def main():
             number_guessing_game()
         elif choice == "7":
             compound_interest_calculator()
+        elif choice == "8":
+            compound_scenario_table()
         elif choice == "0":
             print("感謝使用，再見！")
             break
@@ -0,0 +1,173 @@
+"""
+Day 17: Bootstrap 信賴區間
+以重複抽樣估計平均、中位數、任意百分位數與相關係數的信賴區間
+
+- 有安裝 NumPy 時一次產生一整個區塊的抽樣，以向量化運算計算
+- 每個區塊有自己的亂數種子，不論分給幾個行程，固定 seed 的結果都相同
+- 抽樣次數多時把區塊分給多個行程平行計算
+"""
+
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np      # 選用：有安裝 NumPy 時用來向量化計算
+except ImportError:
+    np = None
+
+# 每個區塊最多抽出的數值數量（抽樣次數 × 資料量），用來控制記憶體用量
+BLOCK_ELEMENTS = 4_000_000
+
+# 抽樣總量（抽樣次數 × 資料量）超過這個數量就自動使用多行程
+PARALLEL_THRESHOLD = 50_000_000
+
+# 子行程共用的資料，由 init_worker 設定一次，不必每個區塊都重新傳送
+worker_data = {}
+
+def init_worker(data, other, use_numpy):
+    """子行程初始化：保存要抽樣的資料"""
+    worker_data["data"] = data
+    worker_data["other"] = other
+    worker_data["use_numpy"] = use_numpy
+
+def percentile_of_sorted(sorted_values, p):
+    """以線性插值計算已排序資料的百分位數（p 為 0~100）"""
+    position = (p / 100) * (len(sorted_values) - 1)
+    lower = int(position)
+    weight = position - lower
+    if weight == 0:
+        return sorted_values[lower]
+    return sorted_values[lower] * (1 - weight) + sorted_values[lower + 1] * weight
+
+def pearson(xs, ys):
+    """純 Python 的 Pearson 相關係數"""
+    n = len(xs)
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    return sxy / math.sqrt(sxx * syy) if sxx and syy else math.nan
+
+def statistic_python(statistic, p, xs, ys=None):
+    """純 Python：計算一個樣本的統計量"""
+    if statistic == "mean":
+        return sum(xs) / len(xs)
+    if statistic == "correlation":
+        return pearson(xs, ys)
+    return percentile_of_sorted(sorted(xs), 50 if statistic == "median" else p)
+
+def statistic_numpy(statistic, p, samples, other_samples=None):
+    """NumPy：對每一列（一次抽樣）計算統計量"""
+    if statistic == "mean":
+        return samples.mean(axis=1)
+    if statistic == "median":
+        return np.median(samples, axis=1)
+    if statistic == "percentile":
+        return np.percentile(samples, p, axis=1)
+    
+    x = samples - samples.mean(axis=1, keepdims=True)
+    y = other_samples - other_samples.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (x * y).sum(axis=1) / np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+
+def run_block(task):
+    """計算一個區塊的抽樣結果（可在子行程中執行）"""
+    statistic, p, seed, block_index, size = task
+    data = worker_data["data"]
+    other = worker_data["other"]
+    n = len(data)
+    
+    if worker_data["use_numpy"]:
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(block_index,)))
+        indices = rng.integers(0, n, size=(size, n))
+        other_samples = other[indices] if other is not None else None
+        return statistic_numpy(statistic, p, data[indices], other_samples).tolist()
+    
+    rng = random.Random(f"{seed}-{block_index}")
+    results = []
+    for _ in range(size):
+        indices = [rng.randrange(n) for _ in range(n)]
+        xs = [data[i] for i in indices]
+        ys = [other[i] for i in indices] if other is not None else None
+        results.append(statistic_python(statistic, p, xs, ys))
+    return results
+
+def bootstrap_ci(data, statistic="mean", percentile=None, other_data=None, resamples=10_000,
+                 confidence=0.95, seed=42, processes=None, use_numpy=None):
+    """Bootstrap 信賴區間（百分位數法）
+    
+    statistic: "mean"、"median"、"percentile"（搭配 percentile=0~100）或 "correlation"（搭配 other_data）
+    resamples: 抽樣次數
+    confidence: 信賴水準，例如 0.95
+    seed: 亂數種子，相同種子得到相同結果
+    processes: 平行計算的行程數；None 時抽樣總量大才自動平行，1 表示不平行
+    
+    回傳 {"statistic", "estimate", "lower", "upper", "confidence", "std_error", "resamples"}
+    """
+    if statistic not in ("mean", "median", "percentile", "correlation"):
+        raise ValueError(f"不支援的統計量: {statistic}")
+    if statistic == "percentile" and percentile is None:
+        raise ValueError("請指定 percentile（0~100）")
+    if statistic == "correlation" and (other_data is None or len(other_data) != len(data)):
+        raise ValueError("相關係數需要等長的 other_data")
+    if len(data) < 2:
+        raise ValueError("資料至少需要兩筆")
+    if not 0 < confidence < 1:
+        raise ValueError("信賴水準必須介於 0 和 1 之間")
+    
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ValueError("向量化計算需要安裝 NumPy")
+    
+    if use_numpy:
+        data = np.asarray(data, dtype=np.float64)
+        other = np.asarray(other_data, dtype=np.float64) if other_data is not None else None
+        estimate = float(statistic_numpy(statistic, percentile, data[None, :],
+                                         other[None, :] if other is not None else None)[0])
+    else:
+        data = [float(x) for x in data]
+        other = [float(y) for y in other_data] if other_data is not None else None
+        estimate = statistic_python(statistic, percentile, data, other)
+    
+    # 依資料量決定區塊大小，讓每個區塊的抽樣陣列不會太大
+    block_size = max(1, min(resamples, BLOCK_ELEMENTS // len(data)))
+    tasks = []
+    for block_index, start in enumerate(range(0, resamples, block_size)):
+        tasks.append((statistic, percentile, seed, block_index, min(block_size, resamples - start)))
+    
+    if processes is None:
+        processes = os.cpu_count() if resamples * len(data) >= PARALLEL_THRESHOLD else 1
+    
+    if processes > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=processes, initializer=init_worker,
+                                 initargs=(data, other, use_numpy)) as executor:
+            blocks = list(executor.map(run_block, tasks))
+    else:
+        init_worker(data, other, use_numpy)
+        try:
+            blocks = [run_block(task) for task in tasks]
+        finally:
+            # 出錯時也要清掉，下一次在同一個行程中呼叫不會沿用這次的資料
+            worker_data.clear()
+    
+    estimates = sorted(value for block in blocks for value in block if not math.isnan(value))
+    if not estimates:
+        return None
+    
+    alpha = (1 - confidence) / 2
+    mean_estimate = sum(estimates) / len(estimates)
+    variance = sum((x - mean_estimate) ** 2 for x in estimates) / max(len(estimates) - 1, 1)
+    
+    return {
+        "statistic": statistic if statistic != "percentile" else f"P{percentile}",
+        "estimate": estimate,
+        "lower": percentile_of_sorted(estimates, alpha * 100),
+        "upper": percentile_of_sorted(estimates, (1 - alpha) * 100),
+        "confidence": confidence,
+        "std_error": math.sqrt(variance),
+        "resamples": len(estimates)
+    }
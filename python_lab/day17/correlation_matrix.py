@@ -0,0 +1,241 @@
+"""
+Day 17: 相關係數矩陣
+一次計算多組等長資料兩兩之間的 Pearson / Spearman 相關係數
+
+- 有安裝 NumPy 時以矩陣乘法分塊向量化計算，否則用內建函數計算
+- pairwise_complete=True 時每一對資料只使用兩者都有值的位置（spearman 在這些位置上重新排名，與 pandas 相同）
+- processes 可把不同的區塊分給多個行程平行計算
+"""
+
+import math
+import operator
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np      # 選用：有安裝 NumPy 時用來向量化計算
+except ImportError:
+    np = None
+
+def to_number(value):
+    """轉成 float，缺值或無效值轉成 NaN"""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return math.nan
+
+def average_ranks(values):
+    """計算排名（同分取平均排名），NaN 保持為 NaN"""
+    order = sorted((i for i, v in enumerate(values) if not math.isnan(v)), key=lambda i: values[i])
+    ranks = [math.nan] * len(values)
+    
+    start = 0
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        rank = (start + end) / 2 + 1
+        for position in range(start, end + 1):
+            ranks[order[position]] = rank
+        start = end + 1
+    
+    return ranks
+
+def average_ranks_numpy(values):
+    """NumPy：計算沒有缺值的一維陣列的排名（同分取平均排名）"""
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    starts = np.cumsum(counts) - counts
+    return (starts + (counts + 1) / 2)[inverse.ravel()]
+
+def pearson_block_python(block_a, block_b, pairwise_complete, rerank=False):
+    """純 Python：計算兩個區塊之間的相關係數
+    
+    rerank=True 時（spearman 且 pairwise_complete），共同有值的位置少於任一組自己有值的位置時，
+    在共同的位置上重新排名。
+    """
+    result = []
+    for a in block_a:
+        observed_a = sum(1 for x in a if not math.isnan(x)) if rerank else 0
+        row = []
+        for b in block_b:
+            if pairwise_complete:
+                pairs = [(x, y) for x, y in zip(a, b) if not (math.isnan(x) or math.isnan(y))]
+                xs = [x for x, _ in pairs]
+                ys = [y for _, y in pairs]
+                if rerank and (len(pairs) < observed_a or
+                               len(pairs) < sum(1 for y in b if not math.isnan(y))):
+                    xs = average_ranks(xs)
+                    ys = average_ranks(ys)
+            else:
+                xs, ys = a, b
+            
+            n = len(xs)
+            if n < 2:
+                row.append(math.nan)
+                continue
+            
+            mean_x = sum(xs) / n
+            mean_y = sum(ys) / n
+            dx = [x - mean_x for x in xs]
+            dy = [y - mean_y for y in ys]
+            denominator = math.sqrt(sum(map(operator.mul, dx, dx)) * sum(map(operator.mul, dy, dy)))
+            row.append(sum(map(operator.mul, dx, dy)) / denominator if denominator else math.nan)
+        result.append(row)
+    return result
+
+def pearson_pair_numpy(x, y):
+    """NumPy：兩個沒有缺值的一維陣列的相關係數（先減去平均再計算）"""
+    if len(x) < 2:
+        return math.nan
+    dx = x - x.mean()
+    dy = y - y.mean()
+    denominator = math.sqrt((dx @ dx) * (dy @ dy))
+    return float(dx @ dy / denominator) if denominator else math.nan
+
+def pearson_block_numpy(block_a, block_b, pairwise_complete, rerank=False):
+    """NumPy：以矩陣乘法計算兩個區塊（列為觀測值、欄為資料組）之間的相關係數
+    
+    rerank 的意義與 pearson_block_python 相同：缺值位置不同的資料對逐對重新排名計算。
+    """
+    if not pairwise_complete:
+        a = block_a - block_a.mean(axis=0)
+        b = block_b - block_b.mean(axis=0)
+        norms = np.outer(np.sqrt((a * a).sum(axis=0)), np.sqrt((b * b).sum(axis=0)))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(norms > 0, (a.T @ b) / norms, np.nan)
+    
+    # 每一對只用兩者都有值的列：把缺值當 0，再用遮罩矩陣算出每一對的計數與總和
+    mask_a = ~np.isnan(block_a)
+    mask_b = ~np.isnan(block_b)
+    weight_a = mask_a.astype(np.float64)
+    weight_b = mask_b.astype(np.float64)
+    
+    # 先減去每一組自己的平均，避免數值很大（例如加上 1e8）時總和相減互相抵銷
+    # （整組都是缺值時 nanmean 會發出 RuntimeWarning，這些資料對最後都是 NaN）
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        a = np.nan_to_num(block_a - np.nanmean(block_a, axis=0))
+        b = np.nan_to_num(block_b - np.nanmean(block_b, axis=0))
+    
+    n = weight_a.T @ weight_b
+    sum_a = a.T @ weight_b               # sum_a[i, j]：i 在 j 也有值的列上的總和
+    sum_b = weight_a.T @ b
+    sum_aa = (a * a).T @ weight_b
+    sum_bb = weight_a.T @ (b * b)
+    sum_ab = a.T @ b
+    
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # 以每一對自己的平均計算離差乘積和：Σ(x - x̄)(y - ȳ) = Σxy - ΣxΣy / n
+        covariance = sum_ab - sum_a * sum_b / n
+        variance = (sum_aa - sum_a ** 2 / n) * (sum_bb - sum_b ** 2 / n)
+        result = covariance / np.sqrt(variance)
+    result[(n < 2) | ~(variance > 0)] = np.nan
+    result = np.clip(result, -1.0, 1.0)
+    
+    if rerank:
+        # 任一組在另一組缺值的位置上有值：共同位置上的排名與原本不同，逐對重新排名
+        differs = (weight_a.T @ (1 - weight_b) + (1 - weight_a).T @ weight_b) > 0
+        for i, j in zip(*np.nonzero(differs)):
+            common = mask_a[:, i] & mask_b[:, j]
+            result[i, j] = pearson_pair_numpy(average_ranks_numpy(block_a[common, i]),
+                                              average_ranks_numpy(block_b[common, j]))
+    return result
+
+def compute_block(task):
+    """計算一個區塊（可在子行程中執行）"""
+    i, j, block_a, block_b, pairwise_complete, rerank, use_numpy = task
+    if use_numpy:
+        return i, j, pearson_block_numpy(block_a, block_b, pairwise_complete, rerank)
+    return i, j, pearson_block_python(block_a, block_b, pairwise_complete, rerank)
+
+def correlation_matrix(series, method="pearson", pairwise_complete=False,
+                       block_size=256, processes=None, use_numpy=None):
+    """計算多組等長資料兩兩之間的相關係數矩陣
+    
+    series: {名稱: 數值清單} 或數值清單的清單；None 或無效值視為缺值
+    method: "pearson" 或 "spearman"（以排名計算 Pearson）
+    pairwise_complete: False 時刪除任一組有缺值的列；True 時每一對各自使用共同有值的列
+                       （spearman 在每一對共同有值的列上重新排名，結果與 pandas DataFrame.corr 相同）
+    block_size: 每個區塊的資料組數量
+    processes: 平行計算的行程數，None 或 1 表示不使用多行程
+    
+    回傳 {"names": 名稱清單, "matrix": 相關係數的二維清單}
+    """
+    if method not in ("pearson", "spearman"):
+        raise ValueError(f"不支援的相關係數: {method}")
+    
+    if isinstance(series, dict):
+        names = list(series.keys())
+        columns = list(series.values())
+    else:
+        columns = list(series)
+        names = [f"series_{i + 1}" for i in range(len(columns))]
+    
+    if not columns:
+        return {"names": [], "matrix": []}
+    
+    length = len(columns[0])
+    if any(len(column) != length for column in columns):
+        raise ValueError("所有資料組的長度必須相同")
+    
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ValueError("向量化計算需要安裝 NumPy")
+    
+    columns = [[to_number(v) for v in column] for column in columns]
+    
+    if not pairwise_complete:
+        # 只保留每一組都有值的列
+        complete_rows = [r for r in range(length) if not any(math.isnan(column[r]) for column in columns)]
+        if len(complete_rows) != length:
+            columns = [[column[r] for r in complete_rows] for column in columns]
+    
+    if method == "spearman":
+        columns = [average_ranks(column) for column in columns]
+    
+    count = len(columns)
+    if use_numpy:
+        data = np.array(columns, dtype=np.float64).T     # 列為觀測值、欄為資料組
+        blocks = [data[:, start:start + block_size] for start in range(0, count, block_size)]
+    else:
+        blocks = [columns[start:start + block_size] for start in range(0, count, block_size)]
+    
+    # 只計算上三角的區塊，下三角用對稱補上
+    rerank = method == "spearman" and pairwise_complete
+    tasks = [(i, j, blocks[i], blocks[j], pairwise_complete, rerank, use_numpy)
+             for i in range(len(blocks)) for j in range(i, len(blocks))]
+    
+    if processes and processes > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(compute_block, tasks))
+    else:
+        results = [compute_block(task) for task in tasks]
+    
+    matrix = [[math.nan] * count for _ in range(count)]
+    for i, j, block in results:
+        rows = block.tolist() if use_numpy else block
+        for a, row in enumerate(rows):
+            for b, value in enumerate(row):
+                r, c = i * block_size + a, j * block_size + b
+                matrix[r][c] = value
+                matrix[c][r] = value
+    
+    for k in range(count):
+        if not math.isnan(matrix[k][k]):
+            matrix[k][k] = 1.0
+    
+    return {"names": names, "matrix": matrix}
+
+def format_correlation_matrix(result, decimals=3):
+    """把相關係數矩陣排成文字表格"""
+    names = result["names"]
+    width = max([len(name) for name in names] + [decimals + 4])
+    
+    lines = [" " * width + " " + " ".join(f"{name:>{width}}" for name in names)]
+    for name, row in zip(names, result["matrix"]):
+        cells = " ".join(f"{value:>{width}.{decimals}f}" if not math.isnan(value) else f"{'-':>{width}}"
+                         for value in row)
+        lines.append(f"{name:>{width}} {cells}")
+    
+    return "\n".join(lines)
@@ -0,0 +1,209 @@
+"""
+Day 17: 分組統計
+一次掃描把資料依鍵值分組，再計算每組的基本統計、變異性指標與百分位數
+
+- 有安裝 NumPy 時把所有資料依（組別, 數值）排序成一個共用的陣列，
+  每組剛好是其中連續且已排序的一段，所有組別一起向量化計算
+- 沒有 NumPy 時每組各自排序計算，資料量大時把不同組別分給多個行程
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from statistical_analyzer import batch_moments
+
+try:
+    import numpy as np      # 選用：有安裝 NumPy 時用來向量化計算
+except ImportError:
+    np = None
+
+# 純 Python 計算時，資料超過這個數量就自動使用多行程
+PARALLEL_THRESHOLD = 200_000
+
+def field_getter(field):
+    """欄位名稱或索引轉成取值函數；本身是函數就直接使用"""
+    if callable(field):
+        return field
+    return lambda record: record[field]
+
+def interpolate(sorted_values, p):
+    """以線性插值計算已排序資料的百分位數（p 為 0~100）"""
+    position = (p / 100) * (len(sorted_values) - 1)
+    lower = int(position)
+    weight = position - lower
+    if weight == 0:
+        return sorted_values[lower]
+    return sorted_values[lower] * (1 - weight) + sorted_values[lower + 1] * weight
+
+def summarize_group(task):
+    """計算一組的統計結果（可在子行程中執行）"""
+    key, values, invalid, percentiles = task
+    row = {"key": key, "count": len(values), "invalid": invalid}
+    
+    if not values:
+        return row
+    
+    values.sort()
+    moments = batch_moments(values)
+    n = moments["count"]
+    variance = moments["m2"] / (n - 1) if n > 1 else 0.0
+    
+    row.update({
+        "sum": moments["total"],
+        "mean": moments["mean"],
+        "std": math.sqrt(variance),
+        "variance": variance,
+        "min": values[0],
+        "max": values[-1]
+    })
+    for p in percentiles:
+        row[f"P{p}"] = interpolate(values, p)
+    
+    return row
+
+def summarize_numpy(keys, group_ids, values, invalid_counts, percentiles):
+    """NumPy：所有組別共用一個依（組別, 數值）排序的陣列，一起向量化計算"""
+    order = np.lexsort((values, group_ids))
+    values = values[order]
+    group_ids = group_ids[order]
+    
+    counts = np.bincount(group_ids, minlength=len(keys))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    safe_starts = starts[present]
+    
+    sums = np.zeros(len(keys))
+    sums[present] = np.add.reduceat(values, safe_starts)
+    means = np.divide(sums, counts, out=np.zeros(len(keys)), where=present)
+    deviations = values - means[group_ids]
+    squares = np.zeros(len(keys))
+    squares[present] = np.add.reduceat(deviations * deviations, safe_starts)
+    variances = np.divide(squares, counts - 1, out=np.zeros(len(keys)), where=counts > 1)
+    
+    percentile_values = {}
+    for p in percentiles:
+        position = starts + (p / 100) * np.maximum(counts - 1, 0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, starts + np.maximum(counts - 1, 0))
+        weight = position - lower
+        safe_lower = np.minimum(lower, max(len(values) - 1, 0))
+        safe_upper = np.minimum(upper, max(len(values) - 1, 0))
+        if len(values):
+            percentile_values[p] = values[safe_lower] * (1 - weight) + values[safe_upper] * weight
+    
+    rows = []
+    for g, key in enumerate(keys):
+        row = {"key": key, "count": int(counts[g]), "invalid": invalid_counts[g]}
+        if counts[g]:
+            end = starts[g] + counts[g] - 1
+            row.update({
+                "sum": float(sums[g]),
+                "mean": float(means[g]),
+                "std": math.sqrt(float(variances[g])),
+                "variance": float(variances[g]),
+                "min": float(values[starts[g]]),
+                "max": float(values[end])
+            })
+            for p in percentiles:
+                row[f"P{p}"] = float(percentile_values[p][g])
+        rows.append(row)
+    
+    return rows
+
+def group_stats(records, key, value, percentiles=(25, 50, 75), processes=None, use_numpy=None):
+    """分組統計 - 回傳每組一列的精簡表格（字典清單，依鍵值排序）
+    
+    records: 可迭代的資料（字典、元組等）
+    key / value: 欄位名稱、索引，或從一筆資料取值的函數
+    percentiles: 每組要計算的百分位數
+    processes: 純 Python 計算時的行程數；None 時資料量大才自動平行，1 表示不平行
+    use_numpy: None 時有安裝 NumPy 就使用
+    
+    每列包含 key、count、invalid、sum、mean、std、variance、min、max 與 P..
+    """
+    get_key = field_getter(key)
+    get_value = field_getter(value)
+    percentiles = list(percentiles) if percentiles else []
+    
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and np is None:
+        raise ValueError("向量化計算需要安裝 NumPy")
+    
+    # 一次掃描完成分組：記錄每組的編號、數值與無效資料數量
+    group_index = {}
+    keys = []
+    invalid_counts = []
+    group_ids = []
+    numbers = []
+    for record in records:
+        group_key = get_key(record)
+        g = group_index.get(group_key)
+        if g is None:
+            g = group_index[group_key] = len(keys)
+            keys.append(group_key)
+            invalid_counts.append(0)
+        try:
+            number = float(get_value(record))
+        except (ValueError, TypeError):
+            invalid_counts[g] += 1
+            continue
+        group_ids.append(g)
+        numbers.append(number)
+    
+    if use_numpy:
+        rows = summarize_numpy(keys, np.array(group_ids, dtype=np.int64),
+                               np.array(numbers, dtype=np.float64), invalid_counts, percentiles)
+    else:
+        partitions = [[] for _ in keys]
+        for g, number in zip(group_ids, numbers):
+            partitions[g].append(number)
+        
+        tasks = [(k, partitions[g], invalid_counts[g], percentiles) for g, k in enumerate(keys)]
+        
+        if processes is None:
+            processes = os.cpu_count() if len(numbers) >= PARALLEL_THRESHOLD else 1
+        
+        if processes > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                rows = list(executor.map(summarize_group, tasks, chunksize=max(1, len(tasks) // (processes * 4))))
+        else:
+            rows = [summarize_group(task) for task in tasks]
+    
+    try:
+        rows = sorted(rows, key=lambda row: row["key"])
+    except TypeError:
+        pass   # 鍵值無法比較時保留第一次出現的順序
+    
+    return rows
+
+def format_group_table(rows, decimals=2):
+    """把分組統計結果排成文字表格"""
+    if not rows:
+        return "無資料"
+    
+    columns = list(rows[0].keys())
+    for row in rows:
+        for column in row:
+            if column not in columns:
+                columns.append(column)
+    
+    def cell(value):
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return f"{value:.{decimals}f}"
+        return str(value)
+    
+    table = [[str(column) for column in columns]]
+    table += [[cell(row.get(column)) for column in columns] for row in rows]
+    widths = [max(len(line[i]) for line in table) for i in range(len(columns))]
+    
+    lines = []
+    for n, line in enumerate(table):
+        lines.append("  ".join(text.rjust(width) for text, width in zip(line, widths)))
+        if n == 0:
+            lines.append("  ".join("-" * width for width in widths))
+    
+    return "\n".join(lines)
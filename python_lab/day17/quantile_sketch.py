@@ -0,0 +1,220 @@
+"""
+Day 17: 分位數草圖（KLL Sketch）
+在有限記憶體內回答無限資料流的百分位數，並且可以把多個分片的草圖合併
+"""
+
+import math
+import random
+import struct
+import sys
+from array import array
+
+# 二進位格式：魔術字、k、資料總數、最小值、最大值、層數
+HEADER_FORMAT = "<4sIQddH"
+MAGIC = b"KLL1"
+
+class KLLSketch:
+    """KLL 分位數草圖 - 每一層都是一個壓縮器，滿了就把一半資料以兩倍權重送到上一層
+    
+    k 越大越精確，記憶體約為 3k 個數值；常用的 k=200 的排名誤差約 1.65%。
+    """
+    
+    def __init__(self, k=200, seed=None):
+        """初始化草圖"""
+        if k < 8:
+            raise ValueError("k 至少需要 8")
+        
+        self.k = k
+        self.c = 2 / 3               # 每往下一層，容量縮小的比例
+        self.levels = [[]]           # 第 h 層的每個值代表 2**h 筆原始資料
+        self.count = 0
+        self.retained = 0            # 目前保存的數值數量
+        self.min_value = None
+        self.max_value = None
+        self.random = random.Random(seed)
+        self.update_max_size()
+    
+    @classmethod
+    def from_error(cls, error, seed=None):
+        """依照可接受的排名誤差（例如 0.01 代表 1%）建立草圖"""
+        if not 0 < error < 1:
+            raise ValueError("誤差必須介於 0 和 1 之間")
+        return cls(k=max(8, math.ceil(3.3 / error)), seed=seed)
+    
+    def capacity(self, level):
+        """計算某一層的容量 - 越上層容量越大"""
+        height = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * self.c ** height))
+    
+    def update_max_size(self):
+        """重新計算所有層的容量總和"""
+        self.max_size = sum(self.capacity(h) for h in range(len(self.levels)))
+    
+    def update(self, value):
+        """加入一筆資料"""
+        value = float(value)
+        self.levels[0].append(value)
+        self.count += 1
+        self.retained += 1
+        
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if self.max_value is None or value > self.max_value:
+            self.max_value = value
+        
+        if self.retained >= self.max_size:
+            self.compress()
+    
+    def extend(self, values):
+        """加入多筆資料"""
+        for value in values:
+            self.update(value)
+    
+    def compress(self):
+        """壓縮：找到第一個超過容量的層，隨機保留一半並升到上一層"""
+        for h in range(len(self.levels)):
+            level = self.levels[h]
+            if len(level) < self.capacity(h):
+                continue
+            
+            if h + 1 == len(self.levels):
+                self.levels.append([])
+                self.update_max_size()
+            
+            level.sort()
+            # 奇數個時保留最後一個在原層，其餘兩兩一組隨機取一個
+            leftover = [level.pop()] if len(level) % 2 == 1 else []
+            offset = self.random.randint(0, 1)
+            promoted = level[offset::2]
+            self.levels[h + 1].extend(promoted)
+            self.retained -= len(level) - len(promoted)
+            self.levels[h] = leftover
+            
+            if self.retained < self.max_size:
+                break
+    
+    def merge(self, other):
+        """合併另一個草圖（例如其他分片的結果）"""
+        if other.k != self.k:
+            raise ValueError("只能合併 k 相同的草圖")
+        
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        self.update_max_size()
+        
+        for h, level in enumerate(other.levels):
+            self.levels[h].extend(level)
+        
+        self.count += other.count
+        self.retained += other.retained
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+            self.max_value = other.max_value if self.max_value is None else max(self.max_value, other.max_value)
+        
+        while self.retained >= self.max_size:
+            self.compress()
+        
+        return self
+    
+    def weighted_items(self):
+        """回傳依數值排序的 (數值, 權重) 清單"""
+        items = [(value, 1 << h) for h, level in enumerate(self.levels) for value in level]
+        items.sort()
+        return items
+    
+    def quantiles(self, fractions):
+        """估計多個分位數（0~1），以與一般百分位數相同的線性插值方式計算"""
+        if not self.count:
+            return [None] * len(fractions)
+        
+        items = self.weighted_items()
+        values = [value for value, _ in items]
+        
+        # 每個值佔據 [起始排名, 起始排名 + 權重) 的位置
+        starts = []
+        position = 0
+        for _, weight in items:
+            starts.append(position)
+            position += weight
+        
+        def value_at(rank):
+            if rank <= 0:
+                return self.min_value
+            if rank >= self.count - 1:
+                return self.max_value
+            # 找出涵蓋這個排名的值
+            low, high = 0, len(starts) - 1
+            while low < high:
+                mid = (low + high + 1) // 2
+                if starts[mid] <= rank:
+                    low = mid
+                else:
+                    high = mid - 1
+            return values[low]
+        
+        results = []
+        for q in fractions:
+            position = q * (self.count - 1)
+            lower = math.floor(position)
+            weight = position - lower
+            lower_value = value_at(lower)
+            if weight == 0:
+                results.append(lower_value)
+            else:
+                results.append(lower_value * (1 - weight) + value_at(lower + 1) * weight)
+        
+        return results
+    
+    def quantile(self, fraction):
+        """估計單一分位數"""
+        return self.quantiles([fraction])[0]
+    
+    def rank(self, value):
+        """估計小於等於 value 的資料筆數"""
+        return sum(weight for item, weight in self.weighted_items() if item <= value)
+    
+    def to_bytes(self):
+        """序列化成精簡的二進位格式（每個保存的數值 8 bytes）"""
+        min_value = self.min_value if self.min_value is not None else math.nan
+        max_value = self.max_value if self.max_value is not None else math.nan
+        parts = [struct.pack(HEADER_FORMAT, MAGIC, self.k, self.count, min_value, max_value, len(self.levels))]
+        
+        for level in self.levels:
+            values = array("d", level)
+            if sys.byteorder == "big":
+                values.byteswap()
+            parts.append(struct.pack("<I", len(values)))
+            parts.append(values.tobytes())
+        
+        return b"".join(parts)
+    
+    @classmethod
+    def from_bytes(cls, data, seed=None):
+        """從 to_bytes() 的結果還原草圖"""
+        magic, k, count, min_value, max_value, num_levels = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != MAGIC:
+            raise ValueError("不是有效的 KLL 草圖資料")
+        
+        sketch = cls(k=k, seed=seed)
+        sketch.count = count
+        sketch.min_value = None if math.isnan(min_value) else min_value
+        sketch.max_value = None if math.isnan(max_value) else max_value
+        
+        offset = struct.calcsize(HEADER_FORMAT)
+        sketch.levels = []
+        for _ in range(num_levels):
+            (length,) = struct.unpack_from("<I", data, offset)
+            offset += 4
+            values = array("d")
+            values.frombytes(data[offset:offset + 8 * length])
+            if sys.byteorder == "big":
+                values.byteswap()
+            sketch.levels.append(values.tolist())
+            sketch.retained += length
+            offset += 8 * length
+        
+        sketch.update_max_size()
+        return sketch
+    
+    def __len__(self):
+        return self.count
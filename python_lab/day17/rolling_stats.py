@@ -0,0 +1,246 @@
+"""
+Day 17: 移動視窗統計
+對依時間排序的資料計算移動平均、標準差、中位數與百分位數
+
+- 平均與變異數在視窗滑動時以 O(1) 更新
+- 中位數與百分位數用可索引的跳躍串列（Indexable Skiplist），每步 O(log w)
+- 支援固定筆數的視窗與時間長度的視窗，結果以產生器逐筆回傳
+- NaN 視為缺值：不放進視窗的統計，count 只計算有效值
+"""
+
+import math
+import random
+from collections import deque
+
+class SkiplistEnd:
+    """跳躍串列的尾端標記 - 比任何值都大"""
+    
+    def __lt__(self, other):
+        return False
+    
+    def __le__(self, other):
+        return False
+    
+    def __gt__(self, other):
+        return True
+    
+    def __ge__(self, other):
+        return True
+
+class SkiplistNode:
+    """跳躍串列的節點 - 每一層記錄下一個節點與跨過的距離"""
+    __slots__ = ("value", "next", "width")
+    
+    def __init__(self, value, next_nodes, widths):
+        self.value = value
+        self.next = next_nodes
+        self.width = widths
+
+SKIPLIST_END = SkiplistNode(SkiplistEnd(), [], [])
+
+class IndexableSkiplist:
+    """可索引的跳躍串列 - 插入、刪除與取第 i 小的值都是 O(log n)"""
+    
+    def __init__(self, expected_size=100, seed=None):
+        """初始化跳躍串列，expected_size 決定層數"""
+        self.size = 0
+        self.max_levels = int(1 + math.log2(max(expected_size, 2)))
+        self.head = SkiplistNode("HEAD", [SKIPLIST_END] * self.max_levels, [1] * self.max_levels)
+        self.random = random.Random(seed)
+    
+    def __len__(self):
+        return self.size
+    
+    def __getitem__(self, index):
+        """取得第 index 小的值（從 0 開始）"""
+        if not 0 <= index < self.size:
+            raise IndexError("跳躍串列索引超出範圍")
+        
+        node = self.head
+        index += 1
+        for level in reversed(range(self.max_levels)):
+            while node.width[level] <= index:
+                index -= node.width[level]
+                node = node.next[level]
+        return node.value
+    
+    def insert(self, value):
+        """插入一個值"""
+        chain = [None] * self.max_levels
+        steps_at_level = [0] * self.max_levels
+        node = self.head
+        for level in reversed(range(self.max_levels)):
+            while node.next[level].value <= value:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        
+        # 新節點的高度：每高一層的機率減半
+        height = min(self.max_levels, 1 - int(math.log2(1.0 - self.random.random())))
+        new_node = SkiplistNode(value, [None] * height, [None] * height)
+        steps = 0
+        for level in range(height):
+            previous = chain[level]
+            new_node.next[level] = previous.next[level]
+            previous.next[level] = new_node
+            new_node.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(height, self.max_levels):
+            chain[level].width[level] += 1
+        self.size += 1
+    
+    def remove(self, value):
+        """刪除一個值（值必須存在）"""
+        chain = [None] * self.max_levels
+        node = self.head
+        for level in reversed(range(self.max_levels)):
+            while node.next[level].value < value:
+                node = node.next[level]
+            chain[level] = node
+        
+        target = chain[0].next[0]
+        if target is SKIPLIST_END or target.value != value:
+            raise KeyError(f"找不到值: {value}")
+        
+        for level in range(len(target.next)):
+            previous = chain[level]
+            previous.width[level] += target.width[level] - 1
+            previous.next[level] = target.next[level]
+        for level in range(len(target.next), self.max_levels):
+            chain[level].width[level] -= 1
+        self.size -= 1
+    
+    def percentile(self, p):
+        """以線性插值計算百分位數（p 為 0~100）"""
+        position = (p / 100) * (self.size - 1)
+        lower = int(position)
+        weight = position - lower
+        if weight == 0:
+            return self[lower]
+        return self[lower] * (1 - weight) + self[lower + 1] * weight
+
+class RollingWindow:
+    """移動視窗 - 以 Welford 公式在加入與移除時 O(1) 更新平均與變異數"""
+    
+    def __init__(self, expected_size=100, track_order=True, seed=None):
+        """初始化視窗，track_order=False 時不維護跳躍串列（不需要中位數時較快）"""
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.changes = 0
+        self.order = IndexableSkiplist(expected_size, seed) if track_order else None
+    
+    def __len__(self):
+        return len(self.values)
+    
+    def push(self, value):
+        """加入最新的值"""
+        self.values.append(value)
+        n = len(self.values)
+        delta = value - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (value - self.mean)
+        if self.order is not None:
+            self.order.insert(value)
+        self.count_change()
+    
+    def pop(self):
+        """移除最舊的值"""
+        value = self.values.popleft()
+        n = len(self.values)
+        if n == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+        else:
+            delta = value - self.mean
+            self.mean -= delta / n
+            self.m2 -= delta * (value - self.mean)
+        if self.order is not None:
+            self.order.remove(value)
+        self.count_change()
+        return value
+    
+    def count_change(self):
+        """每變動一整個視窗的次數就重新計算一次，避免浮點誤差累積（攤銷後仍是 O(1)）"""
+        self.changes += 1
+        if self.changes >= max(len(self.values), 1000):
+            self.changes = 0
+            n = len(self.values)
+            self.mean = sum(self.values) / n if n else 0.0
+            self.m2 = sum((x - self.mean) ** 2 for x in self.values)
+    
+    def variance(self):
+        """樣本變異數"""
+        n = len(self.values)
+        return max(self.m2, 0.0) / (n - 1) if n > 1 else 0.0
+    
+    def snapshot(self, percentiles):
+        """目前視窗的統計結果"""
+        std = math.sqrt(self.variance())
+        result = {"count": len(self.values), "mean": self.mean, "std": std}
+        if self.order is not None:
+            result["median"] = self.order.percentile(50)
+            for p in percentiles:
+                result[f"P{p}"] = self.order.percentile(p)
+        return result
+
+def rolling_statistics(values, window=None, duration=None, timestamps=None,
+                       percentiles=None, min_periods=None, include_order=True):
+    """逐筆產生移動視窗統計
+    
+    values: 依時間排序的數值（可以是任何可迭代物件，例如即時資料流）
+    window: 固定筆數的視窗大小（NaN 仍佔視窗中的位置，但不列入統計）
+    duration: 時間視窗長度（與 timestamps 搭配，數字或 timedelta 皆可）
+              視窗包含 (目前時間 - duration, 目前時間] 之間的資料
+    timestamps: 每個值對應的時間，需遞增
+    percentiles: 額外計算的百分位數，例如 [10, 90]
+    min_periods: 視窗內至少要有幾筆有效值（不含 NaN）才輸出（固定視窗預設為 window，時間視窗預設為 1）
+    include_order: False 時不計算中位數與百分位數
+    
+    每次產生 {"index": 位置, "time": 時間（時間視窗才有）, "count", "mean", "std", "median", "P..."}
+    """
+    if (window is None) == (duration is None):
+        raise ValueError("請指定 window 或 duration 其中一個")
+    if window is not None and window < 1:
+        raise ValueError("window 必須大於 0")
+    if duration is not None and timestamps is None:
+        raise ValueError("時間視窗需要提供 timestamps")
+    
+    percentiles = list(percentiles) if percentiles else []
+    if min_periods is None:
+        min_periods = window if window is not None else 1
+    
+    state = RollingWindow(expected_size=window or 10000, track_order=include_order)
+    
+    if window is not None:
+        positions = deque()     # 視窗內有效值的位置
+        for index, value in enumerate(values):
+            value = float(value)
+            if not math.isnan(value):
+                state.push(value)
+                positions.append(index)
+            while positions and positions[0] <= index - window:
+                positions.popleft()
+                state.pop()
+            if len(state) >= min_periods:
+                result = state.snapshot(percentiles)
+                result["index"] = index
+                yield result
+        return
+    
+    times = deque()
+    for index, (time_point, value) in enumerate(zip(timestamps, values)):
+        value = float(value)
+        if not math.isnan(value):
+            state.push(value)
+            times.append(time_point)
+        # 移除已經超出時間範圍的舊資料
+        while times and times[0] <= time_point - duration:
+            times.popleft()
+            state.pop()
+        if len(state) >= min_periods:
+            result = state.snapshot(percentiles)
+            result["index"] = index
+            result["time"] = time_point
+            yield result
@@ -5,65 +5,337 @@ Day 17: 統計分析工具
 
 import math
 import random
+from bisect import bisect_left, bisect_right, insort
 from collections import Counter
 
+import bootstrap
+import rolling_stats
+from correlation_matrix import correlation_matrix
+from quantile_sketch import KLLSketch
+
+try:
+    import numpy as np      # 選用：有安裝 NumPy 時用來向量化計算
+except ImportError:
+    np = None
+
+# 新增資料少於這個數量時逐筆 insort，否則以合併排序更新已排序快取
+INSORT_THRESHOLD = 32
+
+def batch_moments(values):
+    """一次掃描算出數量、總和、平均、二到四階中心動差與最大最小值
+    
+    平均與動差用 Welford 的遞推公式，總和用 Kahan 補償加法，數值較穩定。
+    """
+    n = 0
+    mean = m2 = m3 = m4 = 0.0
+    total = compensation = 0.0
+    low = high = values[0]
+    
+    for x in values:
+        n += 1
+        delta = x - mean
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        term1 = delta * delta_n * (n - 1)
+        mean += delta_n
+        m4 += term1 * delta_n2 * (n * n - 3 * n + 3) + 6 * delta_n2 * m2 - 4 * delta_n * m3
+        m3 += term1 * delta_n * (n - 2) - 3 * delta_n * m2
+        m2 += term1
+        
+        y = x - compensation
+        t = total + y
+        compensation = (t - total) - y
+        total = t
+        
+        if x < low:
+            low = x
+        elif x > high:
+            high = x
+    
+    return {"count": n, "total": total, "mean": mean, "m2": m2, "m3": m3, "m4": m4, "min": low, "max": high}
+
+def array_moments(batch):
+    """numpy 版本的 batch_moments - 以向量化運算計算同樣的結果"""
+    mean = float(batch.mean())
+    deviations = batch - mean
+    squared = deviations * deviations
+    return {
+        "count": len(batch),
+        "total": float(batch.sum()),
+        "mean": mean,
+        "m2": float(squared.sum()),
+        "m3": float(squared @ deviations),
+        "m4": float(squared @ squared),
+        "min": float(batch.min()),
+        "max": float(batch.max())
+    }
+
 class StatisticalAnalyzer:
-    """統計分析工具類別 - 展示內建函數的強大應用"""
+    """統計分析工具類別 - 展示內建函數的強大應用
     
-    def __init__(self, data=None):
+    backend="python" 用串列與內建函數計算；backend="numpy" 把數值存成連續的
+    float64 陣列並以向量化運算計算。未指定時，有安裝 NumPy 就自動使用 numpy。
+    
+    streaming=True 時不保存原始數值，百分位數、四分位數與異常值改由 KLL 草圖
+    在固定記憶體內估計，sketch_error 為可接受的排名誤差（0.01 代表 1%）。
+    """
+    
+    def __init__(self, data=None, backend=None, streaming=False, sketch_error=0.01):
         """初始化分析器"""
-        self.original_data = data if data else []
+        if backend is None:
+            backend = "numpy" if np is not None else "python"
+        if backend not in ("python", "numpy"):
+            raise ValueError(f"不支援的計算後端: {backend}")
+        if backend == "numpy" and np is None:
+            raise ValueError("numpy 後端需要安裝 NumPy")
+        
+        self.backend = backend
+        self.streaming = streaming
+        self.sketch_error = sketch_error
+        self.original_data = list(data) if data is not None else []
         self.numeric_data = []
         self.prepare_data()
     
+    def reset_aggregates(self):
+        """重設累計統計量（資料數量、總和、中心動差、最大最小值、無效資料）"""
+        self.count = 0
+        self.total = 0.0
+        self.total_compensation = 0.0   # Kahan 補償項
+        self.mean = 0.0
+        self.m2 = 0.0                   # 二到四階中心動差的累計值
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min_value = None
+        self.max_value = None
+        self.invalid_count = 0
+        self.invalid_samples = []     # 只保留前10個無效項目
+        self.value_counts = Counter()
+        self.sorted_cache = None      # 已排序資料的快取，需要時才建立
+        self.sketch = KLLSketch.from_error(self.sketch_error) if self.streaming else None
+        self.result_cache = {}          # 資料改變前可重複使用的計算結果
+    
     def prepare_data(self):
-        """準備數值資料 - 使用 filter() 過濾有效數據"""
-        if not self.original_data:
+        """準備數值資料 - 從 original_data 重新建立數值資料與累計統計量"""
+        if self.backend == "numpy":
+            self.buffer = np.empty(0, dtype=np.float64)   # 預留空間的連續陣列
+            self.numeric_data = self.buffer[:0]
+            self.pending = []                             # 逐筆加入、尚未寫入陣列的值
+        else:
             self.numeric_data = []
-            return
+        self.reset_aggregates()
+        self.ingest(self.original_data)
         
-        # 使用 filter 和 lambda 過濾數值資料
-        def is_numeric(value):
+        if self.streaming:
+            self.original_data = []   # 串流模式不保留原始資料
+    
+    def ingest(self, values):
+        """增量處理新資料 - 只分類、轉換新進的值，並更新累計統計量（NaN 視為無效資料）"""
+        new_numbers = []
+        for value in values:
             try:
-                float(value)
-                return True
+                number = float(value)
             except (ValueError, TypeError):
-                return False
+                number = math.nan
+            if math.isnan(number):
+                self.invalid_count += 1
+                if len(self.invalid_samples) < 10:
+                    self.invalid_samples.append(value)
+            else:
+                new_numbers.append(number)
+        
+        if not new_numbers:
+            return
+        
+        if self.streaming:
+            # 只更新累計統計量與草圖，不保存數值
+            self.update_moments(batch_moments(new_numbers))
+            self.sketch.extend(new_numbers)
+            return
+        
+        if self.backend == "numpy":
+            if len(new_numbers) <= INSORT_THRESHOLD:
+                # 少量資料先放進串列，等需要陣列時再一次寫入，避免每次加入都建立小陣列
+                self.pending.extend(new_numbers)
+                self.update_moments(batch_moments(new_numbers))
+            else:
+                self.flush_pending()
+                batch = np.array(new_numbers, dtype=np.float64)
+                self.update_moments(array_moments(batch))
+                self.ingest_array(batch)
+            return
+        
+        self.numeric_data.extend(new_numbers)
+        self.update_moments(batch_moments(new_numbers))
+        self.value_counts.update(new_numbers)
         
-        # 過濾出數值資料並轉換為 float
-        valid_data = filter(is_numeric, self.original_data)
-        self.numeric_data = list(map(float, valid_data))
+        # 已有排序快取時，直接把新資料合併進去，不必整個重新排序
+        if self.sorted_cache is not None:
+            if len(new_numbers) <= INSORT_THRESHOLD:
+                for number in new_numbers:
+                    insort(self.sorted_cache, number)
+            else:
+                # 兩段已排序的資料，sort() 會以線性時間合併
+                self.sorted_cache.extend(sorted(new_numbers))
+                self.sorted_cache.sort()
+    
+    def ingest_array(self, batch):
+        """numpy 後端：把新資料附加到預留空間的陣列（累計統計量由呼叫者更新）"""
+        stored = len(self.numeric_data)
+        needed = stored + len(batch)
+        if needed > len(self.buffer):
+            # 容量加倍，讓附加的攤銷成本維持 O(1)
+            new_buffer = np.empty(max(needed, 2 * len(self.buffer), 16), dtype=np.float64)
+            new_buffer[:stored] = self.buffer[:stored]
+            self.buffer = new_buffer
+        
+        self.buffer[stored:needed] = batch
+        self.numeric_data = self.buffer[:needed]
+        
+        if self.sorted_cache is not None:
+            # 找出插入位置後一次合併，不必整個重新排序
+            batch = np.sort(batch)
+            self.sorted_cache = np.insert(self.sorted_cache, np.searchsorted(self.sorted_cache, batch), batch)
+    
+    def flush_pending(self):
+        """numpy 後端：把暫存在串列中的值一次寫入陣列"""
+        if self.pending:
+            batch = np.array(self.pending, dtype=np.float64)
+            self.pending = []
+            self.ingest_array(batch)
+    
+    def get_numeric_data(self):
+        """取得所有數值資料 - numpy 後端會先寫入暫存的值，向量化計算前都要經過這裡"""
+        if self.backend == "numpy":
+            self.flush_pending()
+        return self.numeric_data
+    
+    def update_moments(self, batch):
+        """把一批資料的動差合併進累計值（Chan / Pébay 的合併公式）"""
+        na, nb = self.count, batch["count"]
+        n = na + nb
+        delta = batch["mean"] - self.mean
+        delta_n = delta / n
+        m2a, m3a = self.m2, self.m3
+        m2b, m3b = batch["m2"], batch["m3"]
+        
+        self.m4 += (batch["m4"] + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+                    + 6 * delta_n ** 2 * (na * na * m2b + nb * nb * m2a)
+                    + 4 * delta_n * (na * m3b - nb * m3a))
+        self.m3 += (m3b + delta * delta_n ** 2 * na * nb * (na - nb)
+                    + 3 * delta_n * (na * m2b - nb * m2a))
+        self.m2 += m2b + delta * delta_n * na * nb
+        self.mean += delta_n * nb
+        self.count = n
+        
+        # Kahan 補償加法累加總和
+        y = batch["total"] - self.total_compensation
+        t = self.total + y
+        self.total_compensation = (t - self.total) - y
+        self.total = t
+        
+        self.update_range(batch["min"], batch["max"])
+        self.result_cache = {}
+    
+    def moment_state(self):
+        """以 batch_moments 的格式回傳目前的累計值"""
+        return {"count": self.count, "total": self.total, "mean": self.mean, "m2": self.m2,
+                "m3": self.m3, "m4": self.m4, "min": self.min_value, "max": self.max_value}
+    
+    def moment_summary(self):
+        """融合的動差統計（數量、總和、平均、變異數、標準差、最大最小值、偏態、峰度）
+        
+        由累計的動差直接算出，結果會記住直到資料改變。
+        """
+        if not self.count:
+            return None
+        
+        if "moments" not in self.result_cache:
+            n = self.count
+            variance = self.m2 / (n - 1) if n > 1 else 0.0
+            has_spread = self.m2 > 0
+            self.result_cache["moments"] = {
+                "count": n,
+                "sum": self.total,
+                "mean": self.mean,
+                "variance": variance,
+                "std": math.sqrt(variance),
+                "min": self.min_value,
+                "max": self.max_value,
+                "skewness": math.sqrt(n) * self.m3 / self.m2 ** 1.5 if has_spread else 0.0,
+                "kurtosis": n * self.m4 / self.m2 ** 2 - 3 if has_spread else 0.0   # 超額峰度
+            }
+        
+        return self.result_cache["moments"]
+    
+    def update_range(self, batch_min, batch_max):
+        """更新累計的最大值與最小值"""
+        self.min_value = batch_min if self.min_value is None else min(self.min_value, batch_min)
+        self.max_value = batch_max if self.max_value is None else max(self.max_value, batch_max)
+    
+    def get_sorted_data(self):
+        """取得已排序資料 - 所有順序統計共用同一份快取（請勿直接修改）"""
+        if self.streaming:
+            raise ValueError("串流模式不保存原始資料，無法取得排序結果")
+        
+        data = self.get_numeric_data()     # 暫存的值寫入時會合併進已有的排序快取
+        if self.sorted_cache is None:
+            if self.backend == "numpy":
+                self.sorted_cache = np.sort(data)
+            else:
+                self.sorted_cache = sorted(data)  # sorted() 函數
+        return self.sorted_cache
     
     def add_data(self, *values):
-        """添加資料 - 使用 *args"""
-        self.original_data.extend(values)
+        """添加資料 - 使用 *args，只處理新加入的值"""
+        if not self.streaming:
+            self.original_data.extend(values)
+        self.ingest(values)
+    
+    def merge(self, other):
+        """合併另一個串流分析器（例如其他分片）的累計統計量與草圖"""
+        if not (self.streaming and other.streaming):
+            raise ValueError("只有串流模式的分析器可以合併")
+        
+        self.sketch.merge(other.sketch)
+        if other.count:
+            self.update_moments(other.moment_state())
+        self.invalid_count += other.invalid_count
+        self.invalid_samples = (self.invalid_samples + other.invalid_samples)[:10]
+        
+        return self
+    
+    def clear_data(self):
+        """清除所有資料"""
+        self.original_data = []
         self.prepare_data()
     
     def basic_stats(self):
-        """基本統計 - 展示基本內建函數的使用"""
-        if not self.numeric_data:
+        """基本統計 - 由累計統計量直接回答，不需重新掃描資料"""
+        if not self.count:
             return None
         
-        data = self.numeric_data
-        n = len(data)  # len() 函數
+        moments = self.moment_summary()
         
         return {
-            "資料數量": n,
-            "總和": sum(data),           # sum() 函數
-            "平均值": sum(data) / n,
-            "最大值": max(data),         # max() 函數
-            "最小值": min(data),         # min() 函數
-            "範圍": max(data) - min(data),
+            "資料數量": moments["count"],
+            "總和": moments["sum"],
+            "平均值": moments["mean"],
+            "最大值": moments["max"],
+            "最小值": moments["min"],
+            "範圍": moments["max"] - moments["min"],
             "中位數": self.calculate_median(),
             "眾數": self.calculate_mode()
         }
     
     def calculate_median(self):
-        """計算中位數 - 使用 sorted() 函數"""
-        if not self.numeric_data:
+        """計算中位數 - 使用共用的已排序快取"""
+        if not self.count:
             return None
         
-        sorted_data = sorted(self.numeric_data)  # sorted() 函數
+        if self.streaming:
+            return self.sketch.quantile(0.5)
+        
+        sorted_data = self.get_sorted_data()
         n = len(sorted_data)
         
         if n % 2 == 0:
@@ -74,12 +346,25 @@ class StatisticalAnalyzer:
             return sorted_data[n//2]
     
     def calculate_mode(self):
-        """計算眾數 - 使用 Counter 和 max()"""
-        if not self.numeric_data:
-            return None
-        
-        # 使用 Counter 計算頻率
-        counter = Counter(self.numeric_data)
+        """計算眾數 - 使用 Counter 和 max()，結果會記住直到資料改變"""
+        if not self.count or self.streaming:
+            return None   # 串流模式不保存每個值的次數
+        
+        if "mode" not in self.result_cache:
+            self.result_cache["mode"] = self.find_mode()
+        return self.result_cache["mode"]
+    
+    def find_mode(self):
+        """找出出現次數最多的值"""
+        if self.backend == "numpy":
+            # 向量化計算頻率，並依第一次出現的順序排列眾數（與 python 後端一致）
+            values, first_index, counts = np.unique(self.get_numeric_data(), return_index=True, return_counts=True)
+            is_mode = counts == counts.max()
+            modes = values[is_mode][np.argsort(first_index[is_mode])].tolist()
+            return modes[0] if len(modes) == 1 else modes
+        
+        # 使用累計的 Counter 取得頻率
+        counter = self.value_counts
         
         if not counter:
             return None
@@ -94,11 +379,14 @@ class StatisticalAnalyzer:
     
     def quartiles_analysis(self):
         """四分位數分析 - 進階排序應用"""
-        if len(self.numeric_data) < 4:
+        if self.count < 4:
             return None
         
-        sorted_data = sorted(self.numeric_data)
-        n = len(sorted_data)
+        if self.streaming:
+            q1, q2, q3 = self.sketch.quantiles([0.25, 0.5, 0.75])
+            return {"Q1": q1, "Q2": q2, "Q3": q3}
+        
+        sorted_data = self.get_sorted_data()
         
         def get_percentile(data, p):
             """計算百分位數"""
@@ -128,71 +416,143 @@ class StatisticalAnalyzer:
         lower_bound = q1 - 1.5 * iqr
         upper_bound = q3 + 1.5 * iqr
         
-        # 使用 filter() 找出異常值
-        outliers = list(filter(
-            lambda x: x < lower_bound or x > upper_bound, 
-            self.numeric_data
-        ))
+        if self.streaming:
+            # 只能從草圖保存的代表值中找出超出範圍的值（近似結果）
+            return [value for value, _ in self.sketch.weighted_items()
+                    if value < lower_bound or value > upper_bound]
+        
+        # 在已排序資料上用二分搜尋找出兩端的異常值，結果本身就已排序
+        sorted_data = self.get_sorted_data()
         
-        return sorted(outliers)  # sorted() 排序異常值
+        if self.backend == "numpy":
+            low_end = np.searchsorted(sorted_data, lower_bound, side="left")
+            high_start = np.searchsorted(sorted_data, upper_bound, side="right")
+            return np.concatenate((sorted_data[:low_end], sorted_data[high_start:])).tolist()
+        
+        low_end = bisect_left(sorted_data, lower_bound)
+        high_start = bisect_right(sorted_data, upper_bound)
+        
+        return sorted_data[:low_end] + sorted_data[high_start:]
     
-    def data_distribution(self, bins=10):
-        """資料分佈分析 - 綜合應用多個內建函數"""
-        if not self.numeric_data:
+    def data_distribution(self, bins=10, edges=None, log_scale=False):
+        """資料分佈分析 - 一次掃描就算出每筆資料所屬的區間
+        
+        bins: 等寬（或對數等寬）區間數量
+        edges: 自訂區間邊界（遞增），超出範圍的資料不計入
+        log_scale: 以對數刻度切分區間，資料必須全為正數
+        """
+        if not self.count:
             return {}
         
-        min_val, max_val = min(self.numeric_data), max(self.numeric_data)
+        min_val, max_val = self.min_value, self.max_value
         
-        if min_val == max_val:
-            return {f"{min_val}": len(self.numeric_data)}
+        if edges is None and min_val == max_val:
+            return {f"{min_val}": self.count}
         
-        bin_width = (max_val - min_val) / bins
-        bins_dict = {}
+        uniform = False
         
-        for i in range(bins):
-            lower = min_val + i * bin_width
-            upper = min_val + (i + 1) * bin_width
-            
-            # 使用 filter() 計算每個區間的數據量
-            if i == bins - 1:  # 最後一個區間包含上界
-                count = len(list(filter(lambda x: lower <= x <= upper, self.numeric_data)))
-            else:
-                count = len(list(filter(lambda x: lower <= x < upper, self.numeric_data)))
-            
-            bins_dict[f"{lower:.2f}-{upper:.2f}"] = count
+        if edges is not None:
+            edges = sorted(map(float, edges))
+            if len(edges) < 2:
+                raise ValueError("自訂區間至少需要兩個邊界")
+        elif log_scale:
+            if min_val <= 0:
+                raise ValueError("對數刻度需要所有資料皆為正數")
+            log_min = math.log(min_val)
+            log_width = (math.log(max_val) - log_min) / bins
+            edges = [math.exp(log_min + i * log_width) for i in range(bins)] + [max_val]
+        else:
+            bin_width = (max_val - min_val) / bins
+            edges = [min_val + i * bin_width for i in range(bins)] + [max_val]
+            uniform = True
+        
+        counts = self.bin_counts(edges, uniform)
+        
+        # 區間很窄時自動增加小數位數，避免標籤重複
+        narrowest = min(upper - lower for lower, upper in zip(edges, edges[1:]))
+        decimals = 2 if narrowest >= 0.01 or narrowest <= 0 else int(math.ceil(-math.log10(narrowest))) + 1
+        
+        bins_dict = {}
+        for lower, upper, count in zip(edges, edges[1:], counts):
+            bins_dict[f"{lower:.{decimals}f}-{upper:.{decimals}f}"] = count
         
         return bins_dict
     
-    def descriptive_statistics(self):
-        """描述性統計 - 變異性指標"""
-        if len(self.numeric_data) < 2:
-            return None
-        
-        mean = sum(self.numeric_data) / len(self.numeric_data)
+    def bin_counts(self, edges, uniform=False):
+        """計算每個區間的資料量 - 最後一個區間包含上界"""
+        num_bins = len(edges) - 1
+        
+        if self.streaming:
+            # 用草圖的代表值與權重估計各區間的資料量
+            counts = [0] * num_bins
+            for x, weight in self.sketch.weighted_items():
+                if edges[0] <= x <= edges[-1]:
+                    counts[min(bisect_right(edges, x) - 1, num_bins - 1)] += weight
+            return counts
+        
+        if self.backend == "numpy":
+            counts, _ = np.histogram(self.get_numeric_data(), bins=np.asarray(edges))
+            return counts.tolist()
+        
+        counts = [0] * num_bins
+        first, last = edges[0], edges[-1]
+        
+        if uniform:
+            # 等寬區間：直接用算術算出區間編號
+            scale = num_bins / (last - first)
+            for x in self.numeric_data:
+                if first <= x <= last:
+                    counts[min(int((x - first) * scale), num_bins - 1)] += 1
+        else:
+            # 不等寬區間：用二分搜尋找區間
+            for x in self.numeric_data:
+                if first <= x <= last:
+                    counts[min(bisect_right(edges, x) - 1, num_bins - 1)] += 1
         
-        # 計算變異數 - 使用 map() 和 sum()
-        squared_diffs = map(lambda x: (x - mean) ** 2, self.numeric_data)
-        variance = sum(squared_diffs) / (len(self.numeric_data) - 1)
+        return counts
+    
+    def descriptive_statistics(self, include_shape=False):
+        """描述性統計 - 變異性指標（include_shape=True 時加上偏態與峰度）"""
+        if self.count < 2:
+            return None
         
-        std_dev = math.sqrt(variance)
+        # 由融合計算的動差直接取得，不需再掃描資料
+        moments = self.moment_summary()
+        mean = moments["mean"]
+        std_dev = moments["std"]
         
-        return {
-            "變異數": variance,
+        result = {
+            "變異數": moments["variance"],
             "標準差": std_dev,
             "變異係數": (std_dev / mean * 100) if mean != 0 else 0
         }
+        
+        if include_shape:
+            result["偏態"] = moments["skewness"]
+            result["峰度"] = moments["kurtosis"]
+        
+        return result
     
     def percentile_analysis(self, percentiles=None):
         """百分位數分析"""
         if not percentiles:
             percentiles = [10, 25, 50, 75, 90, 95, 99]
         
-        if not self.numeric_data:
+        if not self.count:
             return {}
         
-        sorted_data = sorted(self.numeric_data)
+        if self.streaming:
+            values = self.sketch.quantiles([p / 100 for p in percentiles])
+            return {f"P{p}": value for p, value in zip(percentiles, values)}
+        
+        sorted_data = self.get_sorted_data()
         n = len(sorted_data)
         
+        if self.backend == "numpy":
+            # np.percentile 預設的線性插值與下方的計算方式相同
+            values = np.percentile(sorted_data, percentiles)
+            return {f"P{p}": float(value) for p, value in zip(percentiles, values)}
+        
         result = {}
         for p in percentiles:
             # 計算百分位數的位置
@@ -218,17 +578,26 @@ class StatisticalAnalyzer:
     
     def correlation_analysis(self, other_data):
         """相關性分析 - 兩組資料的關係"""
-        if not self.numeric_data or not other_data:
+        if not self.count or self.streaming or other_data is None or len(other_data) == 0:
             return None
         
         # 確保兩組資料長度相同
-        min_length = min(len(self.numeric_data), len(other_data))
-        data1 = self.numeric_data[:min_length]
+        min_length = min(self.count, len(other_data))
+        data1 = self.get_numeric_data()[:min_length]
         data2 = other_data[:min_length]
         
         if len(data1) < 2:
             return None
         
+        if self.backend == "numpy":
+            x = data1 - data1.mean()
+            y = np.asarray(data2, dtype=np.float64)
+            y = y - y.mean()
+            denominator = math.sqrt(float(x @ x) * float(y @ y))
+            if denominator == 0:
+                return 0
+            return round(float(x @ y) / denominator, 4)
+        
         # 計算平均值
         mean1 = sum(data1) / len(data1)
         mean2 = sum(data2) / len(data2)
@@ -248,31 +617,62 @@ class StatisticalAnalyzer:
         correlation = numerator / denominator
         return round(correlation, 4)
     
+    def rolling_statistics(self, window=None, duration=None, timestamps=None,
+                           percentiles=None, min_periods=None):
+        """移動視窗統計 - 依資料加入的順序滑動，以產生器逐步回傳平均、標準差、中位數與百分位數
+        
+        window 為固定筆數的視窗；duration 搭配 timestamps（每筆有效資料的時間）為時間視窗。
+        """
+        if self.streaming:
+            raise ValueError("串流模式不保存原始資料，請直接對資料流使用 rolling_stats.rolling_statistics")
+        
+        data = self.get_numeric_data().tolist() if self.backend == "numpy" else self.numeric_data
+        return rolling_stats.rolling_statistics(data, window=window, duration=duration,
+                                                timestamps=timestamps, percentiles=percentiles,
+                                                min_periods=min_periods)
+    
+    def bootstrap_confidence_interval(self, statistic="mean", percentile=None, other_data=None,
+                                      resamples=10_000, confidence=0.95, seed=42, processes=None):
+        """Bootstrap 信賴區間 - 平均（mean）、中位數（median）、百分位數（percentile）或相關係數（correlation）
+        
+        相同的 seed 得到相同的結果；抽樣量大時自動分給多個行程計算。
+        """
+        if self.streaming:
+            raise ValueError("串流模式不保存原始資料，無法重複抽樣")
+        if self.count < 2:
+            return None
+        
+        data = self.get_numeric_data()
+        if statistic == "correlation":
+            if other_data is None:
+                return None
+            # 與 correlation_analysis 相同，只使用兩組資料重疊的長度
+            min_length = min(self.count, len(other_data))
+            data = data[:min_length]
+            other_data = other_data[:min_length]
+        
+        return bootstrap.bootstrap_ci(data, statistic=statistic, percentile=percentile,
+                                      other_data=other_data, resamples=resamples,
+                                      confidence=confidence, seed=seed, processes=processes,
+                                      use_numpy=self.backend == "numpy")
+    
     def data_quality_report(self):
         """資料品質報告"""
-        total_count = len(self.original_data)
-        valid_count = len(self.numeric_data)
-        invalid_count = total_count - valid_count
-        
-        # 找出無效資料
-        invalid_data = []
-        for item in self.original_data:
-            try:
-                float(item)
-            except (ValueError, TypeError):
-                invalid_data.append(item)
+        valid_count = self.count
+        invalid_count = self.invalid_count
+        total_count = valid_count + invalid_count
         
         return {
             "總資料量": total_count,
             "有效資料": valid_count,
             "無效資料": invalid_count,
             "完整度": round((valid_count / total_count * 100), 2) if total_count > 0 else 0,
-            "無效項目": invalid_data[:10]  # 只顯示前10個無效項目
+            "無效項目": list(self.invalid_samples)  # 只顯示前10個無效項目
         }
     
     def generate_text_chart(self, chart_type="histogram", width=40):
         """生成文字圖表"""
-        if not self.numeric_data:
+        if not self.count:
             return "無資料可顯示"
         
         if chart_type == "histogram":
@@ -282,9 +682,9 @@ class StatisticalAnalyzer:
         else:
             return "不支援的圖表類型"
     
-    def create_histogram(self, width=40):
+    def create_histogram(self, width=40, bins=10, edges=None, log_scale=False):
         """創建文字直方圖"""
-        distribution = self.data_distribution(bins=10)
+        distribution = self.data_distribution(bins=bins, edges=edges, log_scale=log_scale)
         
         if not distribution:
             return "無資料分佈"
@@ -310,15 +710,15 @@ class StatisticalAnalyzer:
     
     def create_boxplot(self, width=40):
         """創建文字箱型圖"""
-        if len(self.numeric_data) < 4:
+        if self.count < 4:
             return "資料不足，無法繪製箱型圖"
         
         quartiles = self.quartiles_analysis()
         if not quartiles:
             return "無法計算四分位數"
         
-        min_val = min(self.numeric_data)
-        max_val = max(self.numeric_data)
+        min_val = self.min_value
+        max_val = self.max_value
         q1, q2, q3 = quartiles["Q1"], quartiles["Q2"], quartiles["Q3"]
         
         # 計算各位置在圖上的相對位置
@@ -374,7 +774,7 @@ class StatisticalAnalyzer:
     
     def comprehensive_report(self):
         """綜合統計報告"""
-        if not self.numeric_data:
+        if not self.count:
             return "❌ 無有效資料進行分析"
         
         report = "\n" + "=" * 80 + "\n"
@@ -404,7 +804,7 @@ class StatisticalAnalyzer:
                 report += f"{key:>12}: {str(value):>12}\n"
         
         # 3. 變異性指標
-        desc_stats = self.descriptive_statistics()
+        desc_stats = self.descriptive_statistics(include_shape=True)
         if desc_stats:
             report += f"\n📊 變異性指標:\n"
             for key, value in desc_stats.items():
@@ -444,13 +844,114 @@ class StatisticalAnalyzer:
         report += self.create_histogram(width=50)
         
         # 8. 箱型圖
-        if len(self.numeric_data) >= 4:
+        if self.count >= 4:
             report += self.create_boxplot(width=50)
         
         report += "\n" + "=" * 80 + "\n"
         
         return report
 
+def values_match(a, b, tolerance=1e-9):
+    """比較兩個統計結果是否一致（浮點數允許相對誤差，兩邊都是 NaN 視為一致）"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(values_match(a[k], b[k], tolerance) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(values_match(x, y, tolerance) for x, y in zip(a, b))
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return math.isclose(a, b, rel_tol=tolerance, abs_tol=tolerance) or (math.isnan(a) and math.isnan(b))
+    return a == b
+
+def compare_backends(data, other_data=None, extra_data=None, tolerance=1e-9):
+    """比較 python 與 numpy 兩個後端的結果，回傳不一致的項目清單
+    
+    extra_data 會在建立排序快取之後再加入，用來檢查增量更新的路徑。
+    """
+    if np is None:
+        raise ValueError("比較後端需要安裝 NumPy")
+    
+    analyzers = [StatisticalAnalyzer(data, backend=name) for name in ("python", "numpy")]
+    
+    if extra_data:
+        for analyzer in analyzers:
+            analyzer.get_sorted_data()
+            analyzer.add_data(*extra_data)
+    
+    checks = {
+        "basic_stats": lambda a: a.basic_stats(),
+        "descriptive_statistics": lambda a: a.descriptive_statistics(),
+        "quartiles_analysis": lambda a: a.quartiles_analysis(),
+        "percentile_analysis": lambda a: a.percentile_analysis([1, 5, 10, 25, 50, 75, 90, 95, 99]),
+        "detect_outliers_iqr": lambda a: a.detect_outliers_iqr(),
+        "data_distribution": lambda a: a.data_distribution(bins=10),
+        "data_quality_report": lambda a: a.data_quality_report(),
+        "sorted_data": lambda a: list(a.get_sorted_data())
+    }
+    if other_data is not None:
+        checks["correlation_analysis"] = lambda a: a.correlation_analysis(other_data)
+    
+    mismatches = []
+    for name, check in checks.items():
+        python_result, numpy_result = (check(analyzer) for analyzer in analyzers)
+        if not values_match(python_result, numpy_result, tolerance):
+            mismatches.append(name)
+    
+    return mismatches
+
+def backend_parity_check():
+    """以多組資料檢查 python 與 numpy 後端的計算結果是否一致"""
+    print("\n🔬 後端一致性檢查")
+    print("-" * 40)
+    
+    if np is None:
+        print("⚠️ 未安裝 NumPy，只有 python 後端可用")
+        return True
+    
+    rng = random.Random(17)
+    cases = {
+        "常態分佈": ([rng.gauss(50, 10) for _ in range(2000)], None),
+        "含重複值的整數": ([rng.randint(1, 20) for _ in range(500)], None),
+        "含異常值與無效資料": ([10, 12, 11, 13, 9, "N/A", 14, 200, None, -80, 12], None),
+        "增量加入": ([rng.uniform(0, 1) for _ in range(300)], [rng.uniform(-1, 2) for _ in range(100)]),
+        "少量資料": ([3, 1], None),
+        "含 NaN 與逐筆加入": ([rng.gauss(0, 5) if i % 7 else math.nan for i in range(200)] + ["nan"],
+                          [2.5, math.nan, -1.0, "NaN", 2.5])
+    }
+    
+    all_passed = True
+    for name, (data, extra) in cases.items():
+        other = [rng.gauss(0, 1) for _ in range(len(data))]
+        mismatches = compare_backends(data, other_data=other, extra_data=extra)
+        if mismatches:
+            all_passed = False
+            print(f"❌ {name}: {', '.join(mismatches)}")
+        else:
+            print(f"✅ {name}")
+    
+    # 相關係數矩陣（pairwise_complete）：數值加上很大的偏移量、缺值分散在不同位置時也要一致
+    base = [rng.gauss(0, 1) for _ in range(200)]
+    shifted = {"x": [v + 1e8 for v in base], "y": [0.7 * v + rng.gauss(0, 1) + 1e8 for v in base]}
+    shifted["x"][5] = None
+    scattered = {f"s{i}": [rng.randint(0, 30) if rng.random() > 0.2 else None for _ in range(80)]
+                 for i in range(5)}
+    matrix_cases = {"相關矩陣：偏移 1e8 且含缺值": shifted, "相關矩陣：缺值位置各不相同": scattered}
+    
+    for name, series in matrix_cases.items():
+        mismatches = []
+        for method in ("pearson", "spearman"):
+            python_result, numpy_result = (
+                correlation_matrix(series, method=method, pairwise_complete=True, use_numpy=flag)["matrix"]
+                for flag in (False, True))
+            diagonal = [row[k] for k, row in enumerate(numpy_result)]
+            if not values_match(python_result, numpy_result) or any(math.isnan(v) for v in diagonal):
+                mismatches.append(method)
+        if mismatches:
+            all_passed = False
+            print(f"❌ {name}: {', '.join(mismatches)}")
+        else:
+            print(f"✅ {name}")
+    
+    return all_passed
+
 # 示範內建函數的具體應用
 def builtin_functions_demo():
     """示範內建函數在統計分析中的應用"""
@@ -561,11 +1062,12 @@ def interactive_statistical_tool():
         print("8. 🧪 載入示範資料")
         print("9. 🧮 內建函數示範")
         print("10. 🧹 清除資料")
+        print("11. 🔬 後端一致性檢查")
         print("0. 🚪 退出程式")
         print("=" * 60)
         
         try:
-            choice = input("請選擇功能 (0-10): ").strip()
+            choice = input("請選擇功能 (0-11): ").strip()
             
             if choice == "0":
                 print("\n👋 感謝使用統計分析工具！")
@@ -590,9 +1092,10 @@ def interactive_statistical_tool():
             elif choice == "9":
                 builtin_functions_demo()
             elif choice == "10":
-                analyzer.original_data = []
-                analyzer.numeric_data = []
+                analyzer.clear_data()
                 print("✅ 資料已清除")
+            elif choice == "11":
+                backend_parity_check()
             else:
                 print("❌ 無效選擇，請重新輸入")
         
@@ -628,7 +1131,7 @@ def input_data_interface(analyzer):
                 analyzer.add_data(number)
                 count += 1
                 print(f"✅ 已添加: {number}")
-                
+            
             except ValueError:
                 print("❌ 請輸入有效數字")
         
@@ -662,7 +1165,7 @@ def input_data_interface(analyzer):
 
 def basic_analysis_interface(analyzer):
     """基本分析介面"""
-    if not analyzer.numeric_data:
+    if not analyzer.count:
         print("❌ 沒有有效資料進行分析")
         return
     
@@ -679,12 +1182,12 @@ def basic_analysis_interface(analyzer):
             print(f"{key:>10}: {value:>12}")
     
     # 顯示排序後的資料
-    sorted_data = sorted(analyzer.numeric_data)
+    sorted_data = analyzer.get_sorted_data()
     print(f"\n排序結果: {sorted_data}")
 
 def advanced_analysis_interface(analyzer):
     """進階分析介面"""
-    if not analyzer.numeric_data:
+    if not analyzer.count:
         print("❌ 沒有有效資料進行分析")
         return
     
@@ -711,10 +1214,18 @@ def advanced_analysis_interface(analyzer):
         # 四分位距
         iqr = quartiles["Q3"] - quartiles["Q1"]
         print(f"  IQR: {iqr:.3f}")
+    
+    # Bootstrap 信賴區間（串流模式沒有原始資料可以重複抽樣）
+    if not analyzer.streaming and analyzer.count >= 2:
+        print(f"\n95% 信賴區間 (Bootstrap 2000 次):")
+        for name, statistic in [("平均值", "mean"), ("中位數", "median")]:
+            interval = analyzer.bootstrap_confidence_interval(statistic, resamples=2000)
+            if interval:
+                print(f"  {name}: [{interval['lower']:.3f}, {interval['upper']:.3f}]")
 
 def visualization_interface(analyzer):
     """視覺化介面"""
-    if not analyzer.numeric_data:
+    if not analyzer.count:
         print("❌ 沒有有效資料進行視覺化")
         return
     
@@ -740,7 +1251,7 @@ def visualization_interface(analyzer):
 
 def outlier_detection_interface(analyzer):
     """異常值檢測介面"""
-    if not analyzer.numeric_data:
+    if not analyzer.count:
         print("❌ 沒有有效資料進行異常值檢測")
         return
     
@@ -755,16 +1266,16 @@ def outlier_detection_interface(analyzer):
             print(f"  {i:2d}. {outlier:.3f}")
         
         print(f"\n異常值統計:")
-        print(f"  異常值比例: {len(outliers) / len(analyzer.numeric_data) * 100:.2f}%")
+        print(f"  異常值比例: {len(outliers) / analyzer.count * 100:.2f}%")
         print(f"  異常值範圍: {min(outliers):.3f} ~ {max(outliers):.3f}")
-        
+    
     else:
         print("✅ 未檢測到異常值")
         print("資料分佈相對正常")
 
 def percentile_interface(analyzer):
     """百分位數分析介面"""
-    if not analyzer.numeric_data:
+    if not analyzer.count:
         print("❌ 沒有有效資料進行百分位數分析")
         return
     
@@ -789,7 +1300,7 @@ def percentile_interface(analyzer):
             print(f"\n自訂百分位數:")
             for p, value in custom_results.items():
                 print(f"  {p}: {value:.3f}")
-                
+        
         except ValueError:
             print("❌ 輸入格式錯誤")
 
@@ -838,7 +1349,7 @@ def load_demo_data_interface(analyzer):
         
         print(f"✅ 已載入「{selected['name']}」資料集")
         print(f"📊 資料內容: {selected['data']}")
-        print(f"📈 有效資料量: {len(analyzer.numeric_data)}")
+        print(f"📈 有效資料量: {analyzer.count}")
         
         # 顯示基本統計
         basic = analyzer.basic_stats()
@@ -0,0 +1,282 @@
+"""
+Day 19: 每月封存檔（Monthly Archive）
+把同一個月的日記打包成一個檔案，檔尾記錄每篇日記的位置，讀取單篇日記只需要一次 seek
+
+檔案格式：
+    [日記內容 ...][索引 JSON][8 位元組索引位置][8 位元組識別碼 DIARYPK1]
+
+- 寫入時只在檔尾追加新的內容與新的索引，寫到一半中斷時舊的索引仍然有效
+- 被取代的內容與舊索引累積過多時自動壓實（重寫成只含有效內容的新檔案）
+- 可以把既有的每日檔案目錄轉換成封存格式，也可以轉回每日檔案
+- 舊日記可以用 lzma（xz）或 gzip 壓縮：每日檔案加上 .xz / .gz 副檔名，封存檔則在索引中記錄壓縮格式
+
+用法：
+    python diary_archive.py pack diary_entries
+    python diary_archive.py unpack diary_entries
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import lzma
+import os
+import struct
+
+MAGIC = b"DIARYPK1"
+TRAILER = struct.Struct("<Q8s")     # 索引位置、識別碼
+
+# 檔案大小超過有效內容的這個倍數（且超過最小大小）時自動壓實
+COMPACT_RATIO = 2
+COMPACT_MIN_BYTES = 64 * 1024
+
+# 支援的壓縮格式：副檔名 → 壓縮模組
+CODECS = {"xz": lzma, "gz": gzip}
+
+def compress_data(data, codec):
+    """以指定格式壓縮位元組"""
+    if codec not in CODECS:
+        raise ValueError(f"不支援的壓縮格式：{codec}")
+    return CODECS[codec].compress(data)
+
+def decompress_data(data, codec):
+    """解壓縮位元組，codec 為 None 時原樣回傳"""
+    return CODECS[codec].decompress(data) if codec else data
+
+def entry_filename(date):
+    """每日檔案的檔名：diary_YYYY_MM_DD.txt"""
+    return f"diary_{date.strftime('%Y_%m_%d')}.txt"
+
+def archive_filename(date):
+    """每月封存檔的檔名：diary_YYYY_MM.pack"""
+    return f"diary_{date.strftime('%Y_%m')}.pack"
+
+def parse_entry_name(name):
+    """從 diary_YYYY_MM_DD.txt 依固定位置取出日期，格式不符時回傳 None"""
+    if (len(name) != 20 or not name.startswith('diary_') or not name.endswith('.txt')
+            or name[10] != '_' or name[13] != '_'):
+        return None
+    digits = name[6:10] + name[11:13] + name[14:16]
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    try:
+        return datetime.date(int(name[6:10]), int(name[11:13]), int(name[14:16]))
+    except ValueError:
+        return None
+
+def parse_stored_name(name):
+    """
+    解析每日檔案的檔名（可能是壓縮過的 diary_YYYY_MM_DD.txt.xz / .txt.gz）
+    
+    回傳:
+        tuple: (日期, 日記名稱 diary_YYYY_MM_DD.txt, 壓縮格式或 None)，格式不符時回傳 None
+    """
+    codec = None
+    if len(name) == 23 and name[20] == '.' and name[21:] in CODECS:
+        name, codec = name[:20], name[21:]
+    date = parse_entry_name(name)
+    return None if date is None else (date, name, codec)
+
+def is_archive_name(name):
+    """檢查是否為 diary_YYYY_MM.pack"""
+    return (len(name) == 18 and name.startswith('diary_') and name.endswith('.pack')
+            and name[10] == '_' and (name[6:10] + name[11:13]).isdigit())
+
+def read_record(path, offset, length):
+    """讀取封存檔中的一段內容（可在執行緒或子行程中執行）"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+class MonthlyArchive:
+    """每月封存檔 - 日記名稱 → [位置, 長度, 修改時間]（壓縮過的日記多一個壓縮格式）"""
+    
+    def __init__(self, path):
+        """path 是封存檔的位置"""
+        self.path = path
+    
+    def read_index(self):
+        """讀取檔尾的索引；檔案不存在時回傳空索引，格式錯誤時拋出 ValueError"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return {}
+        
+        with f:
+            size = f.seek(0, os.SEEK_END)
+            if size < TRAILER.size:
+                raise ValueError(f"不是有效的封存檔：{self.path}")
+            
+            f.seek(size - TRAILER.size)
+            index_offset, magic = TRAILER.unpack(f.read(TRAILER.size))
+            if magic != MAGIC or index_offset > size - TRAILER.size:
+                raise ValueError(f"不是有效的封存檔：{self.path}")
+            
+            f.seek(index_offset)
+            return json.loads(f.read(size - TRAILER.size - index_offset).decode('utf-8'))["entries"]
+    
+    def read(self, name):
+        """讀取一篇日記的位元組（已解壓縮），不存在時回傳 None"""
+        record = self.read_index().get(name)
+        if record is None:
+            return None
+        return decompress_data(read_record(self.path, record[0], record[1]), record_codec(record))
+    
+    def write_records(self, records):
+        """
+        寫入多篇日記，取代同名的舊內容
+        
+        參數:
+            records (dict): 日記名稱 → (內容位元組, 修改時間) 或 (壓縮後的位元組, 修改時間, 壓縮格式)
+        
+        回傳:
+            dict: 寫入後的索引
+        """
+        index = self.read_index()
+        
+        with open(self.path, 'ab') as f:
+            position = f.tell()
+            for name, (data, mtime, *codec) in records.items():
+                f.write(data)
+                index[name] = [position, len(data), mtime] + codec
+                position += len(data)
+            self.write_index(f, index, position)
+        
+        if self.needs_compaction(index):
+            index = self.compact(index)
+        return index
+    
+    def append(self, name, data, mtime):
+        """在一篇日記後面追加內容（整篇的新版本寫到檔尾），回傳這篇日記的 [位置, 長度, 修改時間]"""
+        existing = self.read(name) or b""
+        return self.write_records({name: (existing + data, mtime)})[name]
+    
+    def compress(self, names, codec):
+        """壓縮指定的日記（保留修改時間），回傳 {日記名稱: 新的索引記錄}"""
+        index = self.read_index()
+        records = {}
+        for name in names:
+            record = index.get(name)
+            if record is None or record_codec(record):
+                continue
+            data = read_record(self.path, record[0], record[1])
+            records[name] = (compress_data(data, codec), record[2], codec)
+        
+        if not records:
+            return {}
+        index = self.write_records(records)
+        return {name: index[name] for name in records}
+    
+    def remove(self, name):
+        """移除一篇日記，封存檔沒有日記時刪除整個檔案"""
+        index = self.read_index()
+        if index.pop(name, None) is None:
+            return
+        
+        if not index:
+            os.remove(self.path)
+            return
+        
+        with open(self.path, 'ab') as f:
+            self.write_index(f, index, f.tell())
+        
+        if self.needs_compaction(index):
+            self.compact(index)
+    
+    @staticmethod
+    def write_index(f, index, position):
+        """在目前位置寫入索引與檔尾，並確保寫入磁碟"""
+        f.write(json.dumps({"entries": index}, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        f.write(TRAILER.pack(position, MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    
+    def needs_compaction(self, index):
+        """被取代的內容是否已經多到值得壓實"""
+        live = sum(record[1] for record in index.values())
+        size = os.path.getsize(self.path)
+        return size > COMPACT_MIN_BYTES and size > live * COMPACT_RATIO
+    
+    def compact(self, index=None):
+        """重寫封存檔，只保留有效內容（先寫暫存檔再取代）"""
+        if index is None:
+            index = self.read_index()
+        
+        temp_path = self.path + ".tmp"
+        new_index = {}
+        with open(self.path, 'rb') as source, open(temp_path, 'wb') as target:
+            position = 0
+            for name in sorted(index):
+                offset, length = index[name][0], index[name][1]
+                source.seek(offset)
+                target.write(source.read(length))
+                new_index[name] = [position] + index[name][1:]
+                position += length
+            self.write_index(target, new_index, position)
+        os.replace(temp_path, self.path)
+        return new_index
+
+def record_codec(record):
+    """索引記錄中的壓縮格式，沒有壓縮時回傳 None"""
+    return record[3] if len(record) > 3 else None
+
+def pack_directory(diary_dir):
+    """把目錄中的每日檔案轉換成每月封存檔，回傳轉換的日記數量"""
+    months = {}
+    with os.scandir(diary_dir) as it:
+        for dir_entry in it:
+            parsed = parse_stored_name(dir_entry.name)
+            if parsed is not None and dir_entry.is_file():
+                months.setdefault(archive_filename(parsed[0]), []).append((dir_entry, parsed))
+    
+    count = 0
+    for archive_name, dir_entries in sorted(months.items()):
+        records = {}
+        for dir_entry, (_, name, codec) in sorted(dir_entries, key=lambda item: item[0].name):
+            with open(dir_entry.path, 'rb') as f:
+                records[name] = (f.read(), dir_entry.stat().st_mtime) + ((codec,) if codec else ())
+        
+        # 封存檔確定寫入磁碟後才刪除每日檔案
+        MonthlyArchive(os.path.join(diary_dir, archive_name)).write_records(records)
+        for dir_entry, _ in dir_entries:
+            os.remove(dir_entry.path)
+        count += len(records)
+    
+    return count
+
+def unpack_directory(diary_dir):
+    """把目錄中的每月封存檔轉回每日檔案（保留修改時間），回傳轉換的日記數量"""
+    count = 0
+    with os.scandir(diary_dir) as it:
+        archives = [dir_entry.path for dir_entry in it if is_archive_name(dir_entry.name)]
+    
+    for path in sorted(archives):
+        for name, record in MonthlyArchive(path).read_index().items():
+            # 壓縮過的日記維持壓縮，還原成 .xz / .gz 檔案
+            codec = record_codec(record)
+            filename = os.path.join(diary_dir, name + (f".{codec}" if codec else ""))
+            with open(filename, 'wb') as f:
+                f.write(read_record(path, record[0], record[1]))
+            os.utime(filename, (record[2], record[2]))
+            count += 1
+        os.remove(path)
+    
+    return count
+
+def main():
+    """命令列進入點：轉換日記目錄的儲存格式"""
+    parser = argparse.ArgumentParser(description="轉換日記目錄的儲存格式")
+    parser.add_argument("action", choices=["pack", "unpack"],
+                        help="pack：每日檔案 → 每月封存檔；unpack：每月封存檔 → 每日檔案")
+    parser.add_argument("diary_dir", nargs="?", default="diary_entries", help="日記目錄")
+    args = parser.parse_args()
+    
+    if args.action == "pack":
+        count = pack_directory(args.diary_dir)
+        print(f"📦 已把 {count} 篇日記打包成每月封存檔")
+    else:
+        count = unpack_directory(args.diary_dir)
+        print(f"📂 已把 {count} 篇日記還原成每日檔案")
+
+if __name__ == "__main__":
+    main()
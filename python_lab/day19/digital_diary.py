@@ -3,35 +3,204 @@ Day 19: 數位日記程式
 實作重點：檔案處理 - 讀寫檔案、檔案模式、路徑處理、編碼處理
 """
 
+import atexit
+import bisect
 import datetime
 import os
 import json
 import glob
+import gzip
+import re
 import shutil
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from diary_archive import (CODECS, MonthlyArchive, archive_filename, compress_data, decompress_data,
+                           entry_filename, is_archive_name, pack_directory, parse_entry_name,
+                           parse_stored_name, read_record, record_codec, unpack_directory)
+from metadata_index import MetadataIndex
+from trigram_index import TrigramIndex
+from word_index import WordIndex
+
+# 正規表示式需要全部掃描時，檔案超過這個數量就分給多個行程
+PARALLEL_SCAN_THRESHOLD = 500
+
+# 同時讀取日記檔案的執行緒數量（網路磁碟或冷快取時，平行讀取可以重疊每次讀取的等待時間）
+READ_WORKERS = 8
+
+# 統計資料延後寫入：累積這麼多次更新，或距離上次寫入超過這麼多秒才寫回檔案（程式結束時會寫回剩下的更新）
+STATS_FLUSH_EVERY = 20
+STATS_FLUSH_SECONDS = 30
+
+# 日記條目的格式（與 write_diary_entry 寫入的內容相同），重建統計時用來解析檔案
+ENTRY_TIME_PREFIX = "⏰ 時間："
+ENTRY_MOOD_PREFIX = "😊 心情："
+ENTRY_SEPARATOR = "─" * 40
+
+# 設定的編碼無法解碼時依序嘗試的編碼
+FALLBACK_ENCODINGS = ['utf-8', 'utf-8-sig', 'big5', 'gbk', 'cp1252']
+
+def parse_diary_entries(content):
+    """解析一個日記檔案，回傳每篇條目的 (心情, 字數) 清單"""
+    lines = content.split('\n')
+    entries = []
+    i = 0
+    while i < len(lines):
+        if (lines[i].startswith(ENTRY_TIME_PREFIX) and i + 2 < len(lines)
+                and lines[i + 1].startswith(ENTRY_MOOD_PREFIX) and lines[i + 2] == ENTRY_SEPARATOR):
+            mood = lines[i + 1][len(ENTRY_MOOD_PREFIX):]
+            end = i + 3
+            while end < len(lines) and lines[end] != ENTRY_SEPARATOR:
+                end += 1
+            entries.append((mood, sum(len(line.split()) for line in lines[i + 3:end])))
+            i = end + 1
+        else:
+            i += 1
+    return entries
+
+def read_text(filename, encoding):
+    """讀取整個文字檔，無法讀取時回傳 None（可在執行緒中執行）"""
+    try:
+        with open(filename, 'r', encoding=encoding) as f:
+            return f.read()
+    except Exception:
+        return None
+
+def decode_text(data, encoding):
+    """把位元組解碼成文字，換行的處理與以文字模式開啟檔案相同"""
+    return data.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+
+def read_entry_bytes(entry):
+    """讀取一篇日記的位元組（每日檔案或每月封存檔中的一段），壓縮過的日記會自動解壓縮"""
+    if 'offset' in entry:
+        data = read_record(entry['filename'], entry['offset'], entry['length'])
+    else:
+        with open(entry['filename'], 'rb') as f:
+            data = f.read()
+    return decompress_data(data, entry.get('codec'))
+
+def read_entry_text(entry, encoding):
+    """讀取一篇日記的文字，無法讀取時回傳 None（可在執行緒或子行程中執行）"""
+    if 'offset' not in entry and not entry.get('codec'):
+        return read_text(entry['filename'], encoding)
+    try:
+        return decode_text(read_entry_bytes(entry), encoding)
+    except Exception:
+        return None
+
+def read_entry_metadata(entry, encoding):
+    """
+    讀取並解析一篇日記的中繼資料（可在執行緒中執行）
+    
+    回傳:
+        tuple: (成功解碼的編碼, 每篇條目的 (心情, 字數) 清單)，無法讀取或解碼時回傳 None
+    """
+    try:
+        data = read_entry_bytes(entry)
+    except Exception:
+        return None
+    
+    for candidate in dict.fromkeys([encoding] + FALLBACK_ENCODINGS):
+        try:
+            return candidate, parse_diary_entries(decode_text(data, candidate))
+        except UnicodeDecodeError:
+            continue
+    return None
+
+def match_lines(content, regex):
+    """找出內容中符合正規表示式的行"""
+    matching_lines = []
+    for line_num, line in enumerate(content.split('\n'), 1):
+        if regex.search(line):
+            matching_lines.append({
+                'line_number': line_num,
+                'content': line.strip()
+            })
+    return matching_lines
+
+def scan_files(task):
+    """讀取一批日記並以正規表示式比對，回傳 (條目, 符合的行)（可在子行程中執行）"""
+    entries, pattern, flags, encoding = task
+    regex = re.compile(pattern, flags)
+    results = []
+    for entry in entries:
+        content = read_entry_text(entry, encoding)
+        if content is None:
+            # 忽略無法讀取的檔案
+            continue
+        matches = match_lines(content, regex)
+        if matches:
+            results.append((entry, matches))
+    return results
 
 class DigitalDiary:
     """數位日記程式 - 展示完整的檔案處理應用"""
     
-    def __init__(self, diary_dir="diary_entries"):
+    def __init__(self, diary_dir="diary_entries", read_workers=READ_WORKERS):
         """
         初始化數位日記程式
         
         參數:
             diary_dir (str): 日記儲存目錄
+            read_workers (int): 搜尋、匯出、重建索引時同時讀取檔案的執行緒數量，1 表示逐一讀取
         """
         self.diary_dir = diary_dir
+        self.read_workers = read_workers
         self.config_file = "diary_config.json"
         self.stats_file = "diary_stats.json"
+        self.trigram_file = "diary_trigrams.json"
+        self.word_index_file = "diary_word_index.json"
+        self.metadata_file = "diary_metadata.db"
+        
+        # 三字元索引在第一次使用正規表示式搜尋時才載入，詞彙索引在第一次關鍵字搜尋時才載入
+        self.trigram_index = None
+        self.word_index = None
+        
+        # 中繼資料索引（日期、心情、字數）在第一次寫入、篩選或統計時才開啟
+        self.metadata_index = None
+        
+        # 日記清單快取：(目錄修改時間, 條目清單)，目錄沒有變動時不必重新掃描
+        self._entries_cache = None
         
         # 確保目錄存在
         self.ensure_directory_exists()
         
-        # 載入配置和統計
-        self.config = self.load_config()
-        self.stats = self.load_statistics()
+        # 配置和統計在第一次使用時才載入，讓選單更快出現
+        self._config = None
+        self._stats = None
+        
+        # 統計資料延後寫入的狀態
+        self.stats_flush_every = STATS_FLUSH_EVERY
+        self.stats_flush_seconds = STATS_FLUSH_SECONDS
+        self._pending_stats_updates = 0
+        self._last_stats_flush = time.monotonic()
+        self._flush_registered = False
         
         print(f"📁 日記目錄：{os.path.abspath(self.diary_dir)}")
     
+    @property
+    def config(self):
+        """配置 - 第一次使用時才從檔案載入"""
+        if self._config is None:
+            self._config = self.load_config()
+        return self._config
+    
+    @config.setter
+    def config(self, value):
+        self._config = value
+    
+    @property
+    def stats(self):
+        """統計資料 - 第一次使用時才從檔案載入"""
+        if self._stats is None:
+            self._stats = self.load_statistics()
+        return self._stats
+    
+    @stats.setter
+    def stats(self, value):
+        self._stats = value
+    
     def ensure_directory_exists(self):
         """確保日記目錄存在 - 展示目錄操作"""
         try:
@@ -53,7 +222,10 @@ class DigitalDiary:
             "time_format": "%H:%M:%S",
             "encoding": "utf-8",
             "auto_backup": True,
-            "default_mood": "普通"
+            "default_mood": "普通",
+            "storage": "loose",     # loose：每天一個檔案；packed：每月一個封存檔
+            "compress_after_days": 0,   # 超過這麼多天的日記自動壓縮，0 表示不壓縮
+            "compression": "gz"         # 壓縮格式：gz（gzip，快；每天一篇的小檔案通常也較小）或 xz（lzma）
         }
         
         config_path = os.path.join(self.diary_dir, self.config_file)
@@ -75,7 +247,7 @@ class DigitalDiary:
                 print("📝 建立預設配置檔案...")
                 self.save_config(default_config)
                 return default_config
-                
+        
         except json.JSONDecodeError as e:
             print(f"⚠️ 配置檔案格式錯誤：{e}")
             print("使用預設配置...")
@@ -100,7 +272,11 @@ class DigitalDiary:
             print(f"❌ 儲存配置失敗：{e}")
     
     def load_statistics(self):
-        """載入統計資料 - 展示檔案存在性檢查"""
+        """載入統計資料 - 展示檔案存在性檢查
+        
+        檔案中的寫作日期是日期字串，載入後轉成排序好的日期序號（date.toordinal()），
+        查詢是否寫過、最近幾天寫了幾天都可以用二分搜尋。
+        """
         default_stats = {
             "total_entries": 0,
             "first_entry_date": None,
@@ -115,23 +291,62 @@ class DigitalDiary:
         try:
             if os.path.exists(stats_path):
                 with open(stats_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    stats = json.load(f)
+                stats["writing_days"] = self.parse_writing_days(stats.get("writing_days", []))
+                return stats
             else:
                 return default_stats
         except Exception as e:
             print(f"⚠️ 載入統計失敗：{e}")
             return default_stats
     
+    def parse_writing_days(self, writing_days):
+        """把寫作日期字串轉成排序、不重複的日期序號清單"""
+        date_format = self.config["date_format"]
+        ordinals = set()
+        for date_str in writing_days:
+            try:
+                ordinals.add(datetime.datetime.strptime(date_str, date_format).date().toordinal())
+            except (TypeError, ValueError):
+                continue
+        return sorted(ordinals)
+    
+    def serialize_statistics(self, stats=None):
+        """統計資料的 JSON 格式（寫作日期轉回日期字串），預設為 self.stats"""
+        if stats is None:
+            stats = self.stats
+        date_format = self.config["date_format"]
+        serialized = dict(stats)
+        serialized["writing_days"] = [datetime.date.fromordinal(day).strftime(date_format)
+                                      for day in stats["writing_days"]]
+        return serialized
+    
     def save_statistics(self):
         """儲存統計資料"""
         stats_path = os.path.join(self.diary_dir, self.stats_file)
         
         try:
             with open(stats_path, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, ensure_ascii=False, indent=2)
+                json.dump(self.serialize_statistics(), f, ensure_ascii=False, indent=2)
+            self._pending_stats_updates = 0
+            self._last_stats_flush = time.monotonic()
         except Exception as e:
             print(f"❌ 儲存統計失敗：{e}")
     
+    def flush_statistics(self, force=True):
+        """
+        寫回尚未儲存的統計更新
+        
+        參數:
+            force (bool): False 時只有累積夠多更新或距離上次寫入夠久才寫回
+        """
+        if not self._pending_stats_updates:
+            return
+        if not force and (self._pending_stats_updates < self.stats_flush_every and
+                          time.monotonic() - self._last_stats_flush < self.stats_flush_seconds):
+            return
+        self.save_statistics()
+    
     def get_diary_filename(self, date):
         """
         取得日記檔案名稱 - 展示路徑組合
@@ -143,11 +358,53 @@ class DigitalDiary:
             str: 完整的檔案路徑
         """
         # 使用日期生成檔案名稱
-        filename = f"diary_{date.strftime('%Y_%m_%d')}.txt"
+        filename = entry_filename(date)
         
         # 使用 os.path.join 組合路徑，確保跨平台相容性
         return os.path.join(self.diary_dir, filename)
     
+    def archive_entry(self, date, name, archive_path, record):
+        """每月封存檔中一篇日記的條目資訊（格式與 list_all_entries 相同，多了位置與長度）"""
+        return {
+            'date': date,
+            'name': name,
+            'filename': archive_path,
+            'offset': record[0],
+            'length': record[1],
+            'size': record[1],
+            'modified': datetime.datetime.fromtimestamp(record[2]),
+            'codec': record_codec(record)
+        }
+    
+    def locate_entry(self, date):
+        """
+        找出某一天的日記 - 每日檔案優先，其次是每月封存檔
+        
+        回傳:
+            dict: 條目資訊（格式與 list_all_entries 相同），沒有日記時回傳 None
+        """
+        name = entry_filename(date)
+        for codec in (None, *CODECS):
+            filename = os.path.join(self.diary_dir, name + (f".{codec}" if codec else ""))
+            try:
+                stat_info = os.stat(filename)
+            except FileNotFoundError:
+                continue
+            return {
+                'date': date,
+                'name': name,
+                'filename': filename,
+                'size': stat_info.st_size,
+                'modified': datetime.datetime.fromtimestamp(stat_info.st_mtime),
+                'codec': codec
+            }
+        
+        archive_path = os.path.join(self.diary_dir, archive_filename(date))
+        record = MonthlyArchive(archive_path).read_index().get(name)
+        if record is None:
+            return None
+        return self.archive_entry(date, name, archive_path, record)
+    
     def write_diary_entry(self, content, date=None, mood=None):
         """
         寫入日記條目 - 展示檔案寫入和追加
@@ -164,36 +421,70 @@ class DigitalDiary:
             mood = self.config["default_mood"]
         
         filename = self.get_diary_filename(date)
+        archive_path = os.path.join(self.diary_dir, archive_filename(date))
         
         try:
-            # 檢查檔案是否已存在
-            file_exists = os.path.exists(filename)
+            # 這一天已有日記時繼續寫在原本的位置；否則依設定或該月封存檔是否存在，決定寫入封存檔
+            existing = self.locate_entry(date)
+            file_exists = existing is not None
+            if file_exists:
+                packed = 'offset' in existing
+            else:
+                packed = self.config["storage"] == "packed" or os.path.exists(archive_path)
             
-            # 如果檔案已存在，使用追加模式；否則使用寫入模式
-            mode = 'a' if file_exists else 'w'
+            # 壓縮過的每日檔案先還原成一般檔案，才能直接追加
+            if file_exists and not packed and existing['codec']:
+                self.decompress_entry(existing)
             
-            with open(filename, mode, encoding=self.config["encoding"]) as f:
-                current_time = datetime.datetime.now()
-                
-                # 如果是新檔案，寫入檔頭
-                if not file_exists:
-                    f.write(f"📅 日記 - {date.strftime(self.config['date_format'])}\n")
-                    f.write(f"✍️  作者：{self.config['author']}\n")
-                    f.write("=" * 60 + "\n\n")
-                
-                # 寫入日記條目
-                f.write(f"⏰ 時間：{current_time.strftime(self.config['time_format'])}\n")
-                f.write(f"😊 心情：{mood}\n")
-                f.write("─" * 40 + "\n")
-                f.write(content)
-                f.write("\n\n" + "─" * 40 + "\n\n")
+            current_time = datetime.datetime.now()
+            parts = []
+            
+            # 如果是新的一天，先寫入檔頭
+            if not file_exists:
+                parts.append(f"📅 日記 - {date.strftime(self.config['date_format'])}\n")
+                parts.append(f"✍️  作者：{self.config['author']}\n")
+                parts.append("=" * 60 + "\n\n")
+            
+            # 寫入日記條目
+            parts.append(f"⏰ 時間：{current_time.strftime(self.config['time_format'])}\n")
+            parts.append(f"😊 心情：{mood}\n")
+            parts.append("─" * 40 + "\n")
+            parts.append(content)
+            parts.append("\n\n" + "─" * 40 + "\n\n")
+            
+            if packed:
+                # 封存檔：整篇的新版本追加到檔尾（壓縮過的內容會先解壓縮）
+                MonthlyArchive(archive_path).append(entry_filename(date),
+                                                    "".join(parts).encode(self.config["encoding"]),
+                                                    time.time())
+                filename = archive_path
+            else:
+                # 如果檔案已存在，使用追加模式；否則使用寫入模式
+                mode = 'a' if file_exists else 'w'
+                with open(filename, mode, encoding=self.config["encoding"]) as f:
+                    f.write("".join(parts))
+            
+            # 追加內容不會改變目錄時間，清除日記清單快取
+            self._entries_cache = None
             
             # 更新統計
             self.update_statistics(date, content, mood)
             
+            # 更新中繼資料索引；搜尋索引已載入時一併更新（未載入時，下次載入會依修改時間與大小補上）
+            entry = self.locate_entry(date)
+            if entry is not None:
+                self.update_metadata(entry, existing, mood, content)
+                for index in (self.trigram_index, self.word_index):
+                    if index is not None:
+                        self.index_entry(index, entry)
+            
+            # 開始新的一天時，依設定壓縮舊日記
+            if not file_exists and self.config["compress_after_days"] > 0:
+                self.compress_old_entries()
+            
             print(f"✅ 日記已儲存到：{filename}")
             return True
-            
+        
         except UnicodeEncodeError as e:
             print(f"❌ 編碼錯誤：{e}")
             return False
@@ -215,22 +506,30 @@ class DigitalDiary:
             str: 日記內容，如果不存在則返回None
         """
         filename = self.get_diary_filename(date)
+        data = None
         
         try:
-            # 檢查檔案是否存在
-            if not os.path.exists(filename):
+            # 檢查日記是否存在（每日檔案或每月封存檔）
+            entry = self.locate_entry(date)
+            if entry is None:
                 print(f"📝 {date.strftime(self.config['date_format'])} 沒有日記條目")
                 return None
             
+            # 封存檔只讀取這一天的內容，壓縮過的日記自動解壓縮
+            if 'offset' in entry or entry['codec']:
+                filename = entry['filename']
+                data = read_entry_bytes(entry)
+                return decode_text(data, self.config["encoding"])
+            
             # 讀取整個檔案
             with open(filename, 'r', encoding=self.config["encoding"]) as f:
                 content = f.read()
                 return content
-                
+        
         except UnicodeDecodeError as e:
             print(f"❌ 檔案編碼錯誤：{e}")
             # 嘗試其他編碼
-            return self.read_with_fallback_encoding(filename)
+            return self.read_with_fallback_encoding(filename, data)
         except PermissionError:
             print(f"❌ 沒有權限讀取檔案：{filename}")
             return None
@@ -238,16 +537,17 @@ class DigitalDiary:
             print(f"❌ 讀取日記失敗：{e}")
             return None
     
-    def read_with_fallback_encoding(self, filename):
-        """使用備用編碼讀取檔案"""
-        fallback_encodings = ['utf-8', 'utf-8-sig', 'big5', 'gbk', 'cp1252']
-        
-        for encoding in fallback_encodings:
+    def read_with_fallback_encoding(self, filename, data=None):
+        """使用備用編碼讀取檔案（data 是已讀出的封存檔內容時直接解碼）"""
+        for encoding in FALLBACK_ENCODINGS:
             try:
-                with open(filename, 'r', encoding=encoding) as f:
-                    content = f.read()
-                    print(f"✅ 使用 {encoding} 編碼成功讀取")
-                    return content
+                if data is not None:
+                    content = decode_text(data, encoding)
+                else:
+                    with open(filename, 'r', encoding=encoding) as f:
+                        content = f.read()
+                print(f"✅ 使用 {encoding} 編碼成功讀取")
+                return content
             except UnicodeDecodeError:
                 continue
         
@@ -256,104 +556,296 @@ class DigitalDiary:
     
     def list_all_entries(self):
         """
-        列出所有日記條目 - 展示目錄遍歷和glob模式匹配
+        列出所有日記條目 - 展示目錄遍歷（os.scandir）與快取
+        
+        新增、刪除檔案都會改變目錄的修改時間，所以目錄沒有變動時直接回傳上次的結果。
+        只修改既有檔案內容不會改變目錄時間，因此 write_diary_entry 寫入後會清除快取。
         
         回傳:
             list: 日記條目資訊列表
         """
         try:
-            # 使用glob模式匹配找出所有日記檔案
-            pattern = os.path.join(self.diary_dir, "diary_*.txt")
-            diary_files = glob.glob(pattern)
-            
-            if not diary_files:
-                return []
+            # 先取得目錄時間再掃描，掃描途中有變動時下次呼叫會重新掃描
+            directory_mtime = os.stat(self.diary_dir).st_mtime_ns
+            if self._entries_cache is not None and self._entries_cache[0] == directory_mtime:
+                return list(self._entries_cache[1])
             
             entries = []
+            archives = []
             
-            for file_path in diary_files:
-                try:
-                    # 從檔案名稱解析日期
-                    filename = os.path.basename(file_path)
-                    date_part = filename.replace('diary_', '').replace('.txt', '')
-                    date = datetime.datetime.strptime(date_part, '%Y_%m_%d').date()
+            with os.scandir(self.diary_dir) as it:
+                for dir_entry in it:
+                    name = dir_entry.name
+                    if is_archive_name(name):
+                        archives.append(dir_entry.path)
+                        continue
                     
-                    # 取得檔案資訊
-                    stat_info = os.stat(file_path)
-                    file_size = stat_info.st_size
-                    modified_time = datetime.datetime.fromtimestamp(stat_info.st_mtime)
+                    # 檔名固定為 diary_YYYY_MM_DD.txt（壓縮過的加上 .xz / .gz），直接依位置取出年月日
+                    parsed = parse_stored_name(name)
+                    if parsed is None:
+                        continue
+                    date, entry_name, codec = parsed
                     
-                    entries.append({
-                        'date': date,
-                        'filename': file_path,
-                        'size': file_size,
-                        'modified': modified_time
-                    })
+                    try:
+                        # 取得檔案資訊（DirEntry 會重用掃描目錄時取得的資料）
+                        stat_info = dir_entry.stat()
+                        
+                        entries.append({
+                            'date': date,
+                            'name': entry_name,
+                            'filename': os.path.join(self.diary_dir, name),
+                            'size': stat_info.st_size,
+                            'modified': datetime.datetime.fromtimestamp(stat_info.st_mtime),
+                            'codec': codec
+                        })
                     
-                except ValueError:
-                    # 忽略檔名格式不正確的檔案
-                    continue
-                except OSError:
-                    # 忽略無法存取的檔案
+                    except OSError:
+                        # 忽略無法存取的檔案
+                        continue
+            
+            # 壓縮到一半中斷時可能同時有一般與壓縮的檔案，以一般檔案為準
+            plain_names = {entry['name'] for entry in entries if not entry['codec']}
+            entries = [entry for entry in entries if not entry['codec'] or entry['name'] not in plain_names]
+            
+            # 每月封存檔：只讀取檔尾的索引；同一天也有每日檔案時以每日檔案為準
+            loose_names = {entry['name'] for entry in entries}
+            for archive_path in archives:
+                try:
+                    index = MonthlyArchive(archive_path).read_index()
+                except (OSError, ValueError):
+                    # 忽略無法讀取的封存檔
                     continue
+                for name, record in index.items():
+                    date = parse_entry_name(name)
+                    if date is not None and name not in loose_names:
+                        entries.append(self.archive_entry(date, name, archive_path, record))
             
             # 按日期排序（最新的在前）
             entries.sort(key=lambda x: x['date'], reverse=True)
-            return entries
-            
+            self._entries_cache = (directory_mtime, entries)
+            return list(entries)
+        
         except Exception as e:
             print(f"❌ 列出日記條目失敗：{e}")
             return []
     
+    def read_entries(self, entries, reader=read_entry_text):
+        """
+        依原本順序產生 (條目, 內容)，背後以執行緒平行讀取檔案；無法讀取的檔案內容為 None
+        
+        同時進行中的讀取最多是執行緒數量的兩倍，不會一次把所有檔案讀進記憶體。
+        reader(條目, 編碼) 決定每篇日記的讀取方式，預設讀出整篇文字。
+        """
+        encoding = self.config["encoding"]
+        if self.read_workers <= 1:
+            for entry in entries:
+                yield entry, reader(entry, encoding)
+            return
+        
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.read_workers) as executor:
+            for entry in entries:
+                pending.append((entry, executor.submit(reader, entry, encoding)))
+                if len(pending) >= self.read_workers * 2:
+                    entry, future = pending.popleft()
+                    yield entry, future.result()
+            
+            while pending:
+                entry, future = pending.popleft()
+                yield entry, future.result()
+    
     def search_entries(self, keyword, case_sensitive=False):
         """
-        搜尋日記條目 - 展示檔案內容搜尋
+        搜尋日記條目 - 從詞彙索引找出候選行，再確認每一行確實包含關鍵字
         
         參數:
             keyword (str): 搜尋關鍵字
             case_sensitive (bool): 是否區分大小寫
         
         回傳:
-            list: 搜尋結果列表
+            list: 搜尋結果列表，依 BM25 分數（'score'）由高到低排列
         """
         try:
-            results = []
             all_entries = self.list_all_entries()
+            ranked = self.get_word_index(all_entries).search(keyword)
             
-            for entry in all_entries:
-                try:
-                    with open(entry['filename'], 'r', encoding=self.config["encoding"]) as f:
-                        content = f.read()
-                        
-                        # 根據設定決定是否區分大小寫
-                        search_content = content if case_sensitive else content.lower()
-                        search_keyword = keyword if case_sensitive else keyword.lower()
-                        
-                        if search_keyword in search_content:
-                            # 找出包含關鍵字的行
-                            lines = content.split('\n')
-                            matching_lines = []
-                            
-                            for line_num, line in enumerate(lines, 1):
-                                check_line = line if case_sensitive else line.lower()
-                                if search_keyword in check_line:
-                                    matching_lines.append({
-                                        'line_number': line_num,
-                                        'content': line.strip()
-                                    })
-                            
-                            results.append({
-                                'date': entry['date'],
-                                'filename': entry['filename'],
-                                'matches': matching_lines
-                            })
-                            
-                except Exception:
+            if ranked is None:
+                # 關鍵字切不出任何詞（例如只有標點符號）：逐檔掃描
+                return self.scan_entries(all_entries, keyword, case_sensitive)
+            
+            search_keyword = keyword if case_sensitive else keyword.lower()
+            results = []
+            
+            candidates = [entry for entry in all_entries if entry['name'] in ranked]
+            
+            for entry, content in self.read_entries(candidates):
+                if content is None:
                     # 忽略無法讀取的檔案
                     continue
+                
+                score, line_numbers = ranked[entry['name']]
+                lines = content.split('\n')
+                
+                # 只檢查索引中同時包含所有查詢詞的行
+                matching_lines = []
+                for line_num in sorted(line_numbers):
+                    if line_num > len(lines):
+                        continue
+                    line = lines[line_num - 1]
+                    check_line = line if case_sensitive else line.lower()
+                    if search_keyword in check_line:
+                        matching_lines.append({
+                            'line_number': line_num,
+                            'content': line.strip()
+                        })
+                
+                if matching_lines:
+                    results.append({
+                        'date': entry['date'],
+                        'filename': entry['filename'],
+                        'matches': matching_lines,
+                        'score': score
+                    })
             
+            # 分數相同時維持原本的日期順序（新的在前）
+            results.sort(key=lambda result: result['score'], reverse=True)
             return results
+        
+        except Exception as e:
+            print(f"❌ 搜尋失敗：{e}")
+            return []
+    
+    def scan_entries(self, entries, keyword, case_sensitive=False):
+        """逐檔掃描搜尋（不使用索引），回傳格式與 search_entries 相同"""
+        search_keyword = keyword if case_sensitive else keyword.lower()
+        results = []
+        
+        for entry, content in self.read_entries(entries):
+            if content is None:
+                # 忽略無法讀取的檔案
+                continue
+            
+            # 根據設定決定是否區分大小寫
+            search_content = content if case_sensitive else content.lower()
+            
+            if search_keyword in search_content:
+                # 找出包含關鍵字的行
+                lines = content.split('\n')
+                matching_lines = []
+                
+                for line_num, line in enumerate(lines, 1):
+                    check_line = line if case_sensitive else line.lower()
+                    if search_keyword in check_line:
+                        matching_lines.append({
+                            'line_number': line_num,
+                            'content': line.strip()
+                        })
+                
+                results.append({
+                    'date': entry['date'],
+                    'filename': entry['filename'],
+                    'matches': matching_lines
+                })
+        
+        return results
+    
+    def index_entry(self, index, entry):
+        """把一篇日記加入（或重新加入）搜尋索引"""
+        content = read_entry_text(entry, self.config["encoding"])
+        if content is not None:
+            index.add_file(entry['name'], content, entry['modified'].timestamp(), entry['size'])
+    
+    def refresh_index(self, index, entries=None):
+        """重新索引新增或變動過的檔案、移除已刪除的檔案，並儲存索引"""
+        if entries is None:
+            entries = self.list_all_entries()
+        
+        current = set()
+        stale = []
+        for entry in entries:
+            name = entry['name']
+            current.add(name)
+            if not index.is_current(name, entry['modified'].timestamp(), entry['size']):
+                stale.append(entry)
+        
+        # 平行讀取需要重新索引的檔案，依序加入索引
+        for entry, content in self.read_entries(stale):
+            if content is not None:
+                index.add_file(entry['name'], content,
+                               entry['modified'].timestamp(), entry['size'])
+        
+        # 移除已經不存在的檔案
+        for name in [name for name in index.files if name not in current]:
+            index.remove_file(name)
+        
+        try:
+            index.save()
+        except OSError as e:
+            print(f"⚠️ 儲存搜尋索引失敗：{e}")
+        
+        return index
+    
+    def get_trigram_index(self, entries=None):
+        """取得三字元索引 - 第一次使用時載入，並與日記目錄同步"""
+        if self.trigram_index is None:
+            index_path = os.path.join(self.diary_dir, self.trigram_file)
+            self.trigram_index = TrigramIndex(index_path).load()
+        return self.refresh_index(self.trigram_index, entries)
+    
+    def get_word_index(self, entries=None):
+        """取得詞彙索引 - 第一次使用時載入，並與日記目錄同步"""
+        if self.word_index is None:
+            index_path = os.path.join(self.diary_dir, self.word_index_file)
+            self.word_index = WordIndex(index_path).load()
+        return self.refresh_index(self.word_index, entries)
+    
+    def regex_search(self, pattern, case_sensitive=False, processes=None):
+        """
+        正規表示式搜尋 - 先用三字元索引挑出候選日記，再逐行比對
+        
+        參數:
+            pattern (str): 正規表示式，例如 r"2024-0[1-3]-\d\d" 或 "去.*散步"
+            case_sensitive (bool): 是否區分大小寫
+            processes (int): 需要全部掃描時的行程數，None 時檔案多才自動平行
+        
+        回傳:
+            list: 搜尋結果列表（格式與 search_entries 相同）
+        """
+        flags = 0 if case_sensitive else re.IGNORECASE
+        try:
+            re.compile(pattern, flags)
+        except re.error as e:
+            print(f"❌ 正規表示式錯誤：{e}")
+            return []
+        
+        try:
+            all_entries = self.list_all_entries()
+            candidates = self.get_trigram_index(all_entries).candidates(pattern)
+            
+            if candidates is not None:
+                # 有可用的文字片段：只比對候選檔案
+                entries = [entry for entry in all_entries if entry['name'] in candidates]
+                found = scan_files((entries, pattern, flags, self.config["encoding"]))
+            else:
+                # 沒有可用的文字片段：全部掃描，檔案多時分給多個行程
+                if processes is None:
+                    processes = os.cpu_count() if len(all_entries) >= PARALLEL_SCAN_THRESHOLD else 1
+                
+                if processes > 1 and len(all_entries) > 1:
+                    chunk_size = max(1, len(all_entries) // (processes * 4))
+                    tasks = [(all_entries[start:start + chunk_size], pattern, flags, self.config["encoding"])
+                             for start in range(0, len(all_entries), chunk_size)]
+                    with ProcessPoolExecutor(max_workers=processes) as executor:
+                        found = [item for chunk in executor.map(scan_files, tasks) for item in chunk]
+                else:
+                    found = scan_files((all_entries, pattern, flags, self.config["encoding"]))
             
+            return [{
+                'date': entry['date'],
+                'filename': entry['filename'],
+                'matches': matches
+            } for entry, matches in found]
+        
         except Exception as e:
             print(f"❌ 搜尋失敗：{e}")
             return []
@@ -369,22 +861,38 @@ class DigitalDiary:
         filename = self.get_diary_filename(date)
         
         try:
-            if not os.path.exists(filename):
+            entry = self.locate_entry(date)
+            if entry is None:
                 print(f"📝 {date.strftime(self.config['date_format'])} 沒有日記可刪除")
                 return False
             
-            # 如果啟用備份功能
+            # 如果啟用備份功能（封存檔中的日記備份成一般的每日檔案）
             if create_backup and self.config.get("auto_backup", True):
                 backup_filename = f"{filename}.backup_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                shutil.copy2(filename, backup_filename)
+                if 'offset' in entry or entry['codec']:
+                    with open(backup_filename, 'wb') as f:
+                        f.write(read_entry_bytes(entry))
+                else:
+                    shutil.copy2(filename, backup_filename)
                 print(f"💾 已建立備份：{backup_filename}")
             
-            # 刪除檔案
-            os.remove(filename)
+            # 刪除檔案（或從封存檔移除）
+            if 'offset' in entry:
+                MonthlyArchive(entry['filename']).remove(entry['name'])
+            else:
+                os.remove(entry['filename'])
+            self._entries_cache = None
+            
+            for index in (self.trigram_index, self.word_index):
+                if index is not None:
+                    index.remove_file(entry['name'])
+            metadata_index = self.open_metadata_index()
+            metadata_index.remove_file(entry['name'])
+            metadata_index.save()
             print(f"🗑️ 已刪除 {date.strftime(self.config['date_format'])} 的日記")
             
             return True
-            
+        
         except PermissionError:
             print(f"❌ 沒有權限刪除檔案：{filename}")
             return False
@@ -392,6 +900,36 @@ class DigitalDiary:
             print(f"❌ 刪除失敗：{e}")
             return False
     
+    def update_metadata(self, entry, existing, mood, content):
+        """
+        寫入一篇條目後更新中繼資料索引
+        
+        索引與寫入前的檔案一致時只加上新條目，否則（例如檔案在程式外被修改過）重新解析整個檔案。
+        
+        參數:
+            entry (dict): 寫入後的條目資訊
+            existing (dict): 寫入前的條目資訊，新的一天為 None
+        """
+        try:
+            index = self.open_metadata_index()
+            modified = entry['modified'].timestamp()
+            word_count = len(content.split())
+            
+            if existing is None:
+                index.add_file(entry['name'], entry['date'].toordinal(), modified, entry['size'],
+                               self.config["encoding"], [(mood, word_count)])
+            elif index.is_current(existing['name'], existing['modified'].timestamp(), existing['size']):
+                index.add_entry(entry['name'], mood, word_count, modified, entry['size'])
+            else:
+                metadata = read_entry_metadata(entry, self.config["encoding"])
+                if metadata is not None:
+                    index.add_file(entry['name'], entry['date'].toordinal(), modified, entry['size'], *metadata)
+            
+            index.save()
+        
+        except Exception as e:
+            print(f"⚠️ 更新中繼資料索引失敗：{e}")
+    
     def update_statistics(self, date, content, mood):
         """更新統計資料"""
         try:
@@ -413,24 +951,34 @@ class DigitalDiary:
                 self.stats["mood_counts"][mood] = 0
             self.stats["mood_counts"][mood] += 1
             
-            # 更新寫作日期
-            if date_str not in self.stats["writing_days"]:
-                self.stats["writing_days"].append(date_str)
-            
-            # 儲存統計
-            self.save_statistics()
+            # 更新寫作日期（排序好的日期序號，用二分搜尋找位置）
+            ordinal = date.toordinal()
+            writing_days = self.stats["writing_days"]
+            position = bisect.bisect_left(writing_days, ordinal)
+            if position == len(writing_days) or writing_days[position] != ordinal:
+                writing_days.insert(position, ordinal)
             
+            # 延後寫入：累積多次更新再一起儲存，程式結束時寫回剩下的更新
+            self._pending_stats_updates += 1
+            if not self._flush_registered:
+                atexit.register(self.flush_statistics)
+                self._flush_registered = True
+            self.flush_statistics(force=False)
+        
         except Exception as e:
             print(f"⚠️ 更新統計失敗：{e}")
     
-    def export_diary(self, format='txt', start_date=None, end_date=None):
+    def export_diary(self, format='txt', start_date=None, end_date=None, compress=False):
         """
         匯出日記 - 展示不同格式的檔案輸出
         
+        每種格式都是逐篇讀取、逐篇寫出，記憶體用量與日記數量無關。
+        
         參數:
-            format (str): 匯出格式 ('txt', 'html', 'json', 'markdown')
+            format (str): 匯出格式 ('txt', 'html', 'json', 'jsonl', 'markdown')
             start_date (datetime.date): 開始日期
             end_date (datetime.date): 結束日期
+            compress (bool): 是否以 gzip 壓縮（檔名加上 .gz）
         """
         try:
             all_entries = self.list_all_entries()
@@ -457,6 +1005,8 @@ class DigitalDiary:
             # 生成匯出檔名
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             export_filename = f"diary_export_{timestamp}.{format}"
+            if compress:
+                export_filename += ".gz"
             export_path = os.path.join(self.diary_dir, export_filename)
             
             # 根據格式執行匯出
@@ -466,6 +1016,8 @@ class DigitalDiary:
                 success = self._export_html(all_entries, export_path)
             elif format == 'json':
                 success = self._export_json(all_entries, export_path)
+            elif format == 'jsonl':
+                success = self._export_jsonl(all_entries, export_path)
             elif format == 'markdown':
                 success = self._export_markdown(all_entries, export_path)
             else:
@@ -477,15 +1029,21 @@ class DigitalDiary:
                 return export_path
             else:
                 return None
-                
+        
         except Exception as e:
             print(f"❌ 匯出失敗：{e}")
             return None
     
+    def open_export(self, filename):
+        """開啟匯出檔案，檔名以 .gz 結尾時以 gzip 壓縮寫入"""
+        if filename.endswith('.gz'):
+            return gzip.open(filename, 'wt', encoding='utf-8', compresslevel=6)
+        return open(filename, 'w', encoding='utf-8')
+    
     def _export_txt(self, entries, filename):
         """匯出為純文字檔"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
+            with self.open_export(filename) as f:
                 # 寫入標題
                 f.write(f"📚 {self.config['author']} 的日記集\n")
                 f.write(f"📅 匯出時間：{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
@@ -493,14 +1051,12 @@ class DigitalDiary:
                 f.write("=" * 80 + "\n\n")
                 
                 # 按時間順序寫入日記
-                for entry in reversed(entries):
-                    try:
-                        with open(entry['filename'], 'r', encoding=self.config["encoding"]) as diary_file:
-                            content = diary_file.read()
-                            f.write(content)
-                            f.write("\n" + "=" * 80 + "\n\n")
-                    except Exception:
+                for entry, content in self.read_entries(reversed(entries)):
+                    if content is None:
                         f.write(f"❌ 無法讀取 {entry['date']} 的日記\n\n")
+                        continue
+                    f.write(content)
+                    f.write("\n" + "=" * 80 + "\n\n")
             
             return True
         except Exception as e:
@@ -510,7 +1066,7 @@ class DigitalDiary:
     def _export_html(self, entries, filename):
         """匯出為HTML檔案"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
+            with self.open_export(filename) as f:
                 # 寫入HTML標頭
                 f.write("""<!DOCTYPE html>
 <html lang="zh-TW">
@@ -565,7 +1121,7 @@ class DigitalDiary:
     </style>
 </head>
 <body>""")
-                
+
                 # 寫入標題
                 f.write(f"""
     <div class="header">
@@ -576,31 +1132,27 @@ class DigitalDiary:
         </div>
     </div>
 """)
-                
+
                 # 寫入日記內容
-                for entry in reversed(entries):
-                    try:
-                        with open(entry['filename'], 'r', encoding=self.config["encoding"]) as diary_file:
-                            content = diary_file.read()
-                            # HTML轉義
-                            content = content.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                            
-                            date_str = entry['date'].strftime('%Y年%m月%d日')
-                            f.write(f"""
+                for entry, content in self.read_entries(reversed(entries)):
+                    date_str = entry['date'].strftime('%Y年%m月%d日')
+                    if content is not None:
+                        # HTML轉義
+                        content = content.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+                        f.write(f"""
     <div class="diary-entry">
         <div class="date">{date_str}</div>
         <div class="content">{content}</div>
     </div>
 """)
-                    except Exception:
-                        date_str = entry['date'].strftime('%Y年%m月%d日')
+                    else:
                         f.write(f"""
     <div class="diary-entry">
         <div class="date">{date_str}</div>
         <div class="content">❌ 無法讀取此日記</div>
     </div>
 """)
-                
+
                 # 結束HTML
                 f.write("</body></html>")
             
@@ -609,52 +1161,70 @@ class DigitalDiary:
             print(f"❌ 匯出HTML失敗：{e}")
             return False
     
+    def export_entry_data(self, entry, content):
+        """一篇日記在 JSON 匯出中的資料"""
+        if content is None:
+            # 記錄無法讀取的條目
+            return {
+                "date": entry['date'].isoformat(),
+                "content": "無法讀取",
+                "file_size": entry['size'],
+                "modified_time": entry['modified'].isoformat(),
+                "error": True
+            }
+        
+        return {
+            "date": entry['date'].isoformat(),
+            "content": content,
+            "file_size": entry['size'],
+            "modified_time": entry['modified'].isoformat()
+        }
+    
     def _export_json(self, entries, filename):
-        """匯出為JSON格式"""
+        """匯出為JSON格式 - 逐篇寫出，結果與一次 json.dump(indent=2) 相同"""
         try:
-            export_data = {
+            header = {
                 "author": self.config['author'],
                 "export_time": datetime.datetime.now().isoformat(),
                 "total_entries": len(entries),
-                "statistics": self.stats,
-                "entries": []
+                "statistics": self.serialize_statistics()
             }
             
-            for entry in entries:
-                try:
-                    with open(entry['filename'], 'r', encoding=self.config["encoding"]) as diary_file:
-                        content = diary_file.read()
-                        
-                        entry_data = {
-                            "date": entry['date'].isoformat(),
-                            "content": content,
-                            "file_size": entry['size'],
-                            "modified_time": entry['modified'].isoformat()
-                        }
-                        export_data["entries"].append(entry_data)
-                except Exception:
-                    # 記錄無法讀取的條目
-                    entry_data = {
-                        "date": entry['date'].isoformat(),
-                        "content": "無法讀取",
-                        "file_size": entry['size'],
-                        "modified_time": entry['modified'].isoformat(),
-                        "error": True
-                    }
-                    export_data["entries"].append(entry_data)
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, ensure_ascii=False, indent=2)
+            with self.open_export(filename) as f:
+                # 先寫出標頭欄位（去掉結尾的 "\n}"），再逐篇補上 "entries" 陣列
+                f.write(json.dumps(header, ensure_ascii=False, indent=2)[:-2])
+                f.write(',\n  "entries": [')
+                
+                separator = "\n    "
+                for entry, content in self.read_entries(entries):
+                    entry_json = json.dumps(self.export_entry_data(entry, content), ensure_ascii=False, indent=2)
+                    f.write(separator + entry_json.replace("\n", "\n    "))
+                    separator = ",\n    "
+                
+                f.write("]\n}" if separator == "\n    " else "\n  ]\n}")
             
             return True
         except Exception as e:
             print(f"❌ 匯出JSON失敗：{e}")
             return False
     
+    def _export_jsonl(self, entries, filename):
+        """匯出為JSON Lines格式 - 每行一篇日記，方便逐行處理"""
+        try:
+            with self.open_export(filename) as f:
+                for entry, content in self.read_entries(entries):
+                    f.write(json.dumps(self.export_entry_data(entry, content), ensure_ascii=False))
+                    f.write("\n")
+            
+            return True
+        except Exception as e:
+            print(f"❌ 匯出JSON Lines失敗：{e}")
+            return False
+    
     def _export_markdown(self, entries, filename):
         """匯出為Markdown格式"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
+            with self.open_export(filename) as f:
                 # Markdown 標題
                 f.write(f"# 📚 {self.config['author']} 的日記\n\n")
                 f.write(f"**匯出時間：** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  \n")
@@ -662,20 +1232,15 @@ class DigitalDiary:
                 f.write("---\n\n")
                 
                 # 寫入日記內容
-                for entry in reversed(entries):
-                    try:
-                        with open(entry['filename'], 'r', encoding=self.config["encoding"]) as diary_file:
-                            content = diary_file.read()
-                            
-                            date_str = entry['date'].strftime('%Y年%m月%d日')
-                            f.write(f"## 📅 {date_str}\n\n")
-                            f.write("```\n")
-                            f.write(content)
-                            f.write("\n```\n\n")
-                            f.write("---\n\n")
-                    except Exception:
-                        date_str = entry['date'].strftime('%Y年%m月%d日')
-                        f.write(f"## 📅 {date_str}\n\n")
+                for entry, content in self.read_entries(reversed(entries)):
+                    date_str = entry['date'].strftime('%Y年%m月%d日')
+                    f.write(f"## 📅 {date_str}\n\n")
+                    if content is not None:
+                        f.write("```\n")
+                        f.write(content)
+                        f.write("\n```\n\n")
+                        f.write("---\n\n")
+                    else:
                         f.write("❌ 無法讀取此日記\n\n")
                         f.write("---\n\n")
             
@@ -685,8 +1250,8 @@ class DigitalDiary:
             return False
     
     def get_statistics(self):
-        """取得統計資訊"""
-        stats = self.stats.copy()
+        """取得統計資訊 - 從中繼資料索引計算，不讀取日記檔案"""
+        stats = self.metadata_statistics()
         
         # 計算額外統計
         if stats["total_entries"] > 0:
@@ -695,23 +1260,231 @@ class DigitalDiary:
             stats["average_words"] = 0
         
         # 計算寫作頻率（最近30天）
-        try:
-            recent_days = 0
-            today = datetime.date.today()
-            
-            for date_str in stats["writing_days"]:
-                try:
-                    date = datetime.datetime.strptime(date_str, self.config["date_format"]).date()
-                    if (today - date).days <= 30:
-                        recent_days += 1
-                except ValueError:
-                    continue
+        stats["recent_30_days"] = self.count_recent_days(30, stats["writing_days"])
+        
+        return self.serialize_statistics(stats)
+    
+    def count_recent_days(self, days=30, writing_days=None):
+        """最近 days 天內（含今天）有寫日記的天數 - 在排序好的日期序號上二分搜尋"""
+        earliest = datetime.date.today().toordinal() - days
+        if writing_days is None:
+            writing_days = self.stats["writing_days"]
+        return len(writing_days) - bisect.bisect_left(writing_days, earliest)
+    
+    def metadata_statistics(self):
+        """從中繼資料索引計算統計資料（格式與 self.stats 相同，寫作日期是日期序號）"""
+        index = self.get_metadata_index()
+        total_entries, total_words = index.totals()
+        writing_days = index.writing_days()
+        date_format = self.config["date_format"]
+        
+        return {
+            "total_entries": total_entries,
+            "first_entry_date": (datetime.date.fromordinal(writing_days[0]).strftime(date_format)
+                                 if writing_days else None),
+            "last_entry_date": (datetime.date.fromordinal(writing_days[-1]).strftime(date_format)
+                                if writing_days else None),
+            "total_words": total_words,
+            "mood_counts": index.mood_counts(),
+            "writing_days": writing_days
+        }
+    
+    def rebuild_statistics(self):
+        """
+        從日記檔案重建中繼資料索引與統計資料 - 以執行緒平行讀取所有日記，解析每篇條目的心情與字數
+        
+        回傳:
+            dict: 重建後的統計資料
+        """
+        self.rebuild_metadata_index()
+        self.stats = self.metadata_statistics()
+        self.save_statistics()
+        return self.stats
+    
+    def open_metadata_index(self):
+        """開啟中繼資料索引（第一次使用時開啟，不與日記目錄同步）"""
+        if self.metadata_index is None:
+            index_path = os.path.join(self.diary_dir, self.metadata_file)
+            self.metadata_index = MetadataIndex(index_path).load()
+        return self.metadata_index
+    
+    def get_metadata_index(self, entries=None):
+        """取得中繼資料索引 - 與日記目錄同步，只解析新增或變動過的檔案、移除已刪除的檔案"""
+        index = self.open_metadata_index()
+        if entries is None:
+            entries = self.list_all_entries()
+        
+        known = index.file_stats()
+        current = set()
+        stale = []
+        for entry in entries:
+            current.add(entry['name'])
+            if known.get(entry['name']) != (entry['modified'].timestamp(), entry['size']):
+                stale.append(entry)
+        
+        # 平行讀取並解析需要重新索引的檔案
+        for entry, metadata in self.read_entries(stale, read_entry_metadata):
+            if metadata is not None:
+                index.add_file(entry['name'], entry['date'].toordinal(),
+                               entry['modified'].timestamp(), entry['size'], *metadata)
+        
+        for name in known.keys() - current:
+            index.remove_file(name)
+        
+        index.save()
+        return index
+    
+    def rebuild_metadata_index(self):
+        """清空中繼資料索引並從所有日記檔案重建"""
+        self.open_metadata_index().clear()
+        return self.get_metadata_index()
+    
+    def filter_entries(self, start_date=None, end_date=None, mood=None):
+        """
+        依日期範圍與心情篩選日記 - 從中繼資料索引查詢，不讀取日記檔案
+        
+        參數:
+            start_date (datetime.date): 開始日期（包含），None 表示不限
+            end_date (datetime.date): 結束日期（包含），None 表示不限
+            mood (str): 至少有一篇條目是這個心情，None 表示不限
+        
+        回傳:
+            list: 條目資訊（格式與 list_all_entries 相同），另外加上
+                  'encoding'、'entry_count'、'word_count' 與 'moods'（心情 → 條目數）
+        """
+        all_entries = self.list_all_entries()
+        rows = self.get_metadata_index(all_entries).query(
+            start_date.toordinal() if start_date else None,
+            end_date.toordinal() if end_date else None,
+            mood)
+        
+        entries_by_name = {entry['name']: entry for entry in all_entries}
+        results = []
+        for row in rows:
+            entry = entries_by_name.get(row['name'])
+            if entry is not None:
+                results.append(dict(entry, encoding=row['encoding'], entry_count=row['entry_count'],
+                                    word_count=row['word_count'], moods=row['moods']))
+        return results
+    
+    def mood_statistics(self, start_date=None, end_date=None):
+        """日期範圍內各心情的條目數（心情 → 條目數）- 從中繼資料索引計算"""
+        return self.get_metadata_index().mood_counts(
+            start_date.toordinal() if start_date else None,
+            end_date.toordinal() if end_date else None)
+    
+    def convert_storage(self, storage):
+        """
+        轉換儲存格式 - 'packed' 把每日檔案打包成每月封存檔，'loose' 還原成每日檔案
+        
+        日記名稱、大小與修改時間都不變，搜尋索引不需要重建。
+        
+        回傳:
+            int: 轉換的日記數量
+        """
+        if storage == "packed":
+            count = pack_directory(self.diary_dir)
+        elif storage == "loose":
+            count = unpack_directory(self.diary_dir)
+        else:
+            raise ValueError(f"不支援的儲存格式：{storage}")
+        
+        self._entries_cache = None
+        self.config["storage"] = storage
+        self.save_config()
+        return count
+    
+    def existing_indexes(self):
+        """已建立的搜尋索引與中繼資料索引（已載入或磁碟上已有索引檔），載入但不與日記目錄同步"""
+        trigram_path = os.path.join(self.diary_dir, self.trigram_file)
+        if self.trigram_index is None and os.path.exists(trigram_path):
+            self.trigram_index = TrigramIndex(trigram_path).load()
+        
+        word_index_path = os.path.join(self.diary_dir, self.word_index_file)
+        if self.word_index is None and os.path.exists(word_index_path):
+            self.word_index = WordIndex(word_index_path).load()
+        
+        metadata_path = os.path.join(self.diary_dir, self.metadata_file)
+        if self.metadata_index is None and os.path.exists(metadata_path):
+            self.open_metadata_index()
+        
+        return [index for index in (self.trigram_index, self.word_index, self.metadata_index)
+                if index is not None]
+    
+    def compress_old_entries(self, days=None, codec=None):
+        """
+        壓縮舊日記 - 超過指定天數的日記以 lzma（xz）或 gzip（gz）壓縮，讀取與搜尋時自動解壓縮
+        
+        壓縮後日記名稱與修改時間不變，搜尋索引只更新記錄的大小，不必解壓縮重新索引。
+        
+        參數:
+            days (int): 日期早於幾天前的日記要壓縮，預設使用設定中的 compress_after_days
+            codec (str): 'xz' 或 'gz'，預設使用設定中的 compression
+        
+        回傳:
+            dict: {"entries": 壓縮的日記數, "before": 壓縮前位元組數, "after": 壓縮後位元組數}
+        """
+        days = self.config["compress_after_days"] if days is None else days
+        codec = codec or self.config["compression"]
+        if codec not in CODECS:
+            raise ValueError(f"不支援的壓縮格式：{codec}")
+        
+        cutoff = datetime.date.today() - datetime.timedelta(days=days)
+        old_entries = [entry for entry in self.list_all_entries()
+                       if entry['date'] < cutoff and not entry['codec']]
+        
+        compressed = []     # (條目, 壓縮後大小)
+        archives = {}
+        for entry in old_entries:
+            if 'offset' in entry:
+                # 封存檔中的日記：同一個封存檔一次壓縮
+                archives.setdefault(entry['filename'], []).append(entry)
+                continue
             
-            stats["recent_30_days"] = recent_days
-        except Exception:
-            stats["recent_30_days"] = 0
+            # 每日檔案：先寫好壓縮檔（保留修改時間）再刪除原檔
+            compressed_path = f"{entry['filename']}.{codec}"
+            with open(entry['filename'], 'rb') as f:
+                data = compress_data(f.read(), codec)
+            with open(compressed_path, 'wb') as f:
+                f.write(data)
+            stat_info = os.stat(entry['filename'])
+            os.utime(compressed_path, ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns))
+            os.remove(entry['filename'])
+            compressed.append((entry, len(data)))
+        
+        for archive_path, entries in archives.items():
+            records = MonthlyArchive(archive_path).compress([entry['name'] for entry in entries], codec)
+            compressed.extend((entry, records[entry['name']][1]) for entry in entries
+                              if entry['name'] in records)
+        
+        self._entries_cache = None
+        
+        # 內容沒變，索引只需要更新記錄的大小
+        indexes = self.existing_indexes()
+        for entry, size in compressed:
+            modified = entry['modified'].timestamp()
+            for index in indexes:
+                if index.is_current(entry['name'], modified, entry['size']):
+                    index.update_file_stat(entry['name'], modified, size)
+        for index in indexes:
+            try:
+                index.save()
+            except OSError as e:
+                print(f"⚠️ 儲存搜尋索引失敗：{e}")
         
-        return stats
+        return {
+            "entries": len(compressed),
+            "before": sum(entry['size'] for entry, _ in compressed),
+            "after": sum(size for _, size in compressed)
+        }
+    
+    def decompress_entry(self, entry):
+        """把壓縮過的每日檔案還原成一般檔案"""
+        filename = os.path.join(self.diary_dir, entry['name'])
+        with open(filename, 'wb') as f:
+            f.write(read_entry_bytes(entry))
+        os.remove(entry['filename'])
+        self._entries_cache = None
     
     def cleanup_backups(self, days_old=7):
         """清理舊的備份檔案"""
@@ -761,6 +1534,19 @@ def get_date_input(prompt, allow_empty=True):
         except ValueError:
             print("❌ 日期格式錯誤，請使用 YYYY-MM-DD 格式")
 
+def get_optional_date_input(prompt):
+    """取得可以留空的日期輸入，留空時回傳 None"""
+    while True:
+        date_str = input(prompt).strip()
+        
+        if not date_str:
+            return None
+        
+        try:
+            return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            print("❌ 日期格式錯誤，請使用 YYYY-MM-DD 格式")
+
 def write_diary_interface(diary):
     """寫日記介面"""
     print("\n✍️ 寫日記")
@@ -842,6 +1628,22 @@ def list_entries_interface(diary):
         print("📝 還沒有任何日記")
         return
     
+    # 依日期範圍或心情篩選（從中繼資料索引查詢，不讀取日記檔案）
+    if input("依日期範圍或心情篩選？(y/N): ").strip().lower() == 'y':
+        start_date = get_optional_date_input("開始日期 (YYYY-MM-DD，按Enter不限): ")
+        end_date = get_optional_date_input("結束日期 (YYYY-MM-DD，按Enter不限): ")
+        mood = input("心情 (按Enter不限): ").strip() or None
+        
+        entries = diary.filter_entries(start_date, end_date, mood)
+        if not entries:
+            print("📝 沒有符合條件的日記")
+            return
+        
+        mood_counts = diary.mood_statistics(start_date, end_date)
+        summary = "、".join(f"{name} {count}" for name, count
+                           in sorted(mood_counts.items(), key=lambda x: x[1], reverse=True))
+        print(f"\n😊 日期範圍內的心情分佈：{summary}")
+    
     print(f"📚 共找到 {len(entries)} 篇日記:\n")
     
     # 顯示日記列表
@@ -879,10 +1681,14 @@ def search_interface(diary):
         print("❌ 請輸入關鍵字")
         return
     
+    use_regex = input("使用正規表示式？(y/N): ").strip().lower() == 'y'
     case_sensitive = input("區分大小寫？(y/N): ").strip().lower() == 'y'
     
     print(f"\n🔍 搜尋 '{keyword}'...")
-    results = diary.search_entries(keyword, case_sensitive)
+    if use_regex:
+        results = diary.regex_search(keyword, case_sensitive)
+    else:
+        results = diary.search_entries(keyword, case_sensitive)
     
     if not results:
         print(f"📝 沒有找到包含 '{keyword}' 的日記")
@@ -947,6 +1753,7 @@ def export_interface(diary):
         ("txt", "純文字檔 (.txt)"),
         ("html", "網頁檔案 (.html)"),
         ("json", "JSON格式 (.json)"),
+        ("jsonl", "JSON Lines (.jsonl)"),
         ("markdown", "Markdown (.md)")
     ]
     
@@ -962,6 +1769,8 @@ def export_interface(diary):
     
     selected_format = formats[int(format_choice) - 1][0]
     
+    compress = input("以 gzip 壓縮？(y/N): ").strip().lower() == 'y'
+    
     # 選擇日期範圍
     range_choice = input("\n是否指定日期範圍？(y/N): ").strip().lower() == 'y'
     
@@ -976,7 +1785,7 @@ def export_interface(diary):
             if start_date > end_date:
                 print("❌ 開始日期不能晚於結束日期")
                 return
-            
+        
         except KeyboardInterrupt:
             print("\n❌ 取消匯出")
             return
@@ -984,7 +1793,7 @@ def export_interface(diary):
     # 執行匯出
     print(f"\n📦 正在匯出為 {selected_format.upper()} 格式...")
     
-    export_path = diary.export_diary(selected_format, start_date, end_date)
+    export_path = diary.export_diary(selected_format, start_date, end_date, compress)
     
     if export_path:
         file_size = os.path.getsize(export_path)
@@ -1013,8 +1822,15 @@ def settings_interface(diary):
         print(f"  {i}. {name}: {value}")
     
     print(f"  4. 清理備份檔案")
+    print(f"  5. 從日記檔案重建統計與中繼資料索引")
+    storage_names = {"loose": "每天一個檔案", "packed": "每月一個封存檔"}
+    print(f"  6. 儲存格式: {storage_names.get(config['storage'], config['storage'])}")
+    if config['compress_after_days'] > 0:
+        print(f"  7. 壓縮舊日記: 超過 {config['compress_after_days']} 天 ({config['compression']})")
+    else:
+        print(f"  7. 壓縮舊日記: 關閉")
     
-    choice = input(f"\n選擇要修改的項目 (1-4)，按Enter返回: ").strip()
+    choice = input(f"\n選擇要修改的項目 (1-7)，按Enter返回: ").strip()
     
     if choice == "1":
         new_author = input(f"新的作者名稱 (目前: {config['author']}): ").strip()
@@ -1049,6 +1865,34 @@ def settings_interface(diary):
             diary.cleanup_backups(days)
         except ValueError:
             print("❌ 請輸入有效數字")
+    
+    elif choice == "5":
+        print("🔄 重建統計與中繼資料索引中...")
+        stats = diary.rebuild_statistics()
+        print(f"✅ 統計已重建：{stats['total_entries']} 篇日記，{len(stats['writing_days'])} 天")
+    
+    elif choice == "6":
+        target = "loose" if config['storage'] == "packed" else "packed"
+        if input(f"轉換為「{storage_names[target]}」？(y/N): ").strip().lower() == 'y':
+            count = diary.convert_storage(target)
+            print(f"✅ 已轉換 {count} 篇日記，儲存格式：{storage_names[target]}")
+    
+    elif choice == "7":
+        days = input("壓縮超過幾天的日記？(0 表示關閉): ").strip()
+        codec = input("壓縮格式 gz 或 xz？(預設 gz): ").strip().lower() or "gz"
+        if not days.isdigit() or codec not in ("xz", "gz"):
+            print("❌ 請輸入有效的天數與格式")
+            return
+        
+        config['compress_after_days'] = int(days)
+        config['compression'] = codec
+        diary.save_config()
+        if config['compress_after_days'] > 0:
+            result = diary.compress_old_entries()
+            print(f"🗜️ 已壓縮 {result['entries']} 篇日記："
+                  f"{result['before']:,} → {result['after']:,} bytes")
+        else:
+            print("✅ 已關閉自動壓縮")
 
 def main():
     """主程式"""
@@ -0,0 +1,187 @@
+"""
+Day 19: 日記中繼資料索引（Metadata Index）
+以 SQLite 記錄每個日記檔案的日期、心情、字數、條目數與編碼，依日期或心情篩選、統計時不必讀取日記檔案
+
+- files 資料表：每個日記檔案一列（日期以 date.toordinal() 儲存，方便範圍查詢）
+- moods 資料表：每個檔案中每種心情的條目數與字數
+- 與其他索引相同，記錄檔案的修改時間與大小，變動過的檔案重新解析即可
+"""
+
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    date INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    encoding TEXT NOT NULL,
+    entry_count INTEGER NOT NULL,
+    word_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_date ON files (date);
+CREATE TABLE IF NOT EXISTS moods (
+    name TEXT NOT NULL,
+    mood TEXT NOT NULL,
+    entry_count INTEGER NOT NULL,
+    word_count INTEGER NOT NULL,
+    PRIMARY KEY (name, mood)
+);
+CREATE INDEX IF NOT EXISTS moods_mood ON moods (mood);
+"""
+
+def date_conditions(start=None, end=None, column="date"):
+    """日期範圍（日期序號，包含兩端）的 SQL 條件與參數"""
+    conditions = []
+    parameters = []
+    if start is not None:
+        conditions.append(f"{column} >= ?")
+        parameters.append(start)
+    if end is not None:
+        conditions.append(f"{column} <= ?")
+        parameters.append(end)
+    return conditions, parameters
+
+class MetadataIndex:
+    """日記中繼資料索引 - 檔名 → 日期、修改時間、大小、編碼、條目數、字數，以及各心情的條目數與字數"""
+    
+    def __init__(self, index_path):
+        """初始化索引，index_path 是 SQLite 資料庫檔的位置"""
+        self.index_path = index_path
+        self.connection = None
+    
+    def load(self):
+        """開啟資料庫（不存在時建立資料表），資料庫損壞時重新建立"""
+        try:
+            self.connection = sqlite3.connect(self.index_path)
+            self.connection.executescript(SCHEMA)
+        except sqlite3.DatabaseError:
+            if self.connection is not None:
+                self.connection.close()
+            with open(self.index_path, 'wb'):
+                pass
+            self.connection = sqlite3.connect(self.index_path)
+            self.connection.executescript(SCHEMA)
+        return self
+    
+    def save(self):
+        """提交尚未寫入的變更"""
+        self.connection.commit()
+    
+    def close(self):
+        """提交變更並關閉資料庫"""
+        if self.connection is not None:
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
+    
+    def clear(self):
+        """清空索引（重建前使用）"""
+        self.connection.execute("DELETE FROM moods")
+        self.connection.execute("DELETE FROM files")
+    
+    def file_stats(self):
+        """所有已索引的檔案：檔名 → (修改時間, 大小)"""
+        return {name: (mtime, size) for name, mtime, size
+                in self.connection.execute("SELECT name, mtime, size FROM files")}
+    
+    def is_current(self, name, mtime, size):
+        """檢查檔案自索引後是否沒有變動"""
+        row = self.connection.execute("SELECT mtime, size FROM files WHERE name = ?", (name,)).fetchone()
+        return row == (mtime, size)
+    
+    def update_file_stat(self, name, mtime, size):
+        """內容沒變、只換了儲存方式（例如壓縮）時，更新記錄的修改時間與大小，不必重新解析"""
+        self.connection.execute("UPDATE files SET mtime = ?, size = ? WHERE name = ?", (mtime, size, name))
+    
+    def add_file(self, name, date, mtime, size, encoding, entries):
+        """
+        索引一個檔案（已索引過的檔案會先移除）
+        
+        參數:
+            date (int): 日期序號
+            entries (list): 每篇條目的 (心情, 字數)，即 parse_diary_entries 的結果
+        """
+        self.remove_file(name)
+        
+        moods = {}
+        for mood, word_count in entries:
+            counts = moods.setdefault(mood, [0, 0])
+            counts[0] += 1
+            counts[1] += word_count
+        
+        self.connection.execute(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (name, date, mtime, size, encoding, len(entries), sum(count for _, count in entries)))
+        self.connection.executemany(
+            "INSERT INTO moods VALUES (?, ?, ?, ?)",
+            [(name, mood, entry_count, word_count) for mood, (entry_count, word_count) in moods.items()])
+    
+    def add_entry(self, name, mood, word_count, mtime, size):
+        """在已索引的檔案中加入一篇新條目，並更新修改時間與大小（檔案未索引時不做任何事）"""
+        updated = self.connection.execute(
+            "UPDATE files SET mtime = ?, size = ?, entry_count = entry_count + 1, "
+            "word_count = word_count + ? WHERE name = ?", (mtime, size, word_count, name)).rowcount
+        if updated:
+            self.connection.execute(
+                "INSERT INTO moods VALUES (?, ?, 1, ?) ON CONFLICT (name, mood) DO UPDATE SET "
+                "entry_count = entry_count + 1, word_count = word_count + excluded.word_count",
+                (name, mood, word_count))
+    
+    def remove_file(self, name):
+        """把檔案從索引移除"""
+        self.connection.execute("DELETE FROM moods WHERE name = ?", (name,))
+        self.connection.execute("DELETE FROM files WHERE name = ?", (name,))
+    
+    def query(self, start=None, end=None, mood=None):
+        """
+        依日期範圍（日期序號）與心情篩選檔案，日期新的在前
+        
+        回傳:
+            list: 每個檔案的 {'name', 'date', 'encoding', 'entry_count', 'word_count', 'moods'}，
+                  mood 有指定時只包含至少有一篇條目是這個心情的檔案
+        """
+        conditions, parameters = date_conditions(start, end)
+        if mood is not None:
+            conditions.append("name IN (SELECT name FROM moods WHERE mood = ?)")
+            parameters.append(mood)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        rows = self.connection.execute(
+            f"SELECT name, date, encoding, entry_count, word_count FROM files{where} ORDER BY date DESC",
+            parameters).fetchall()
+        
+        moods = {}
+        mood_conditions, mood_parameters = date_conditions(start, end, "files.date")
+        mood_where = f" WHERE {' AND '.join(mood_conditions)}" if mood_conditions else ""
+        for name, mood_name, entry_count in self.connection.execute(
+                "SELECT moods.name, moods.mood, moods.entry_count FROM moods "
+                f"JOIN files ON files.name = moods.name{mood_where}", mood_parameters):
+            moods.setdefault(name, {})[mood_name] = entry_count
+        
+        return [{
+            'name': name,
+            'date': date,
+            'encoding': encoding,
+            'entry_count': entry_count,
+            'word_count': word_count,
+            'moods': moods.get(name, {})
+        } for name, date, encoding, entry_count, word_count in rows]
+    
+    def mood_counts(self, start=None, end=None):
+        """日期範圍內各心情的條目數：心情 → 條目數"""
+        conditions, parameters = date_conditions(start, end, "files.date")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return dict(self.connection.execute(
+            "SELECT moods.mood, SUM(moods.entry_count) FROM moods "
+            f"JOIN files ON files.name = moods.name{where} GROUP BY moods.mood", parameters))
+    
+    def totals(self):
+        """所有檔案的 (總條目數, 總字數)"""
+        entry_count, word_count = self.connection.execute(
+            "SELECT SUM(entry_count), SUM(word_count) FROM files").fetchone()
+        return entry_count or 0, word_count or 0
+    
+    def writing_days(self):
+        """有日記的日期序號（排序好的清單）"""
+        return [date for date, in self.connection.execute("SELECT date FROM files ORDER BY date")]
@@ -0,0 +1,262 @@
+"""
+Day 19: 日記檔案平行讀取效能測試
+比較不同執行緒數量下，搜尋、匯出、重建索引讀取大量日記檔案所需的時間
+
+- 產生指定數量的日記檔案（預設 10,000 篇）
+- 冷快取：每次測試前請作業系統丟掉這些檔案的快取（posix_fadvise），模擬第一次讀取或網路磁碟
+- 熱快取：先完整讀過一次，檔案都在記憶體快取中
+- --exports：另外量測每種匯出格式（含 gzip 壓縮）每秒可以匯出幾篇日記
+- --compression：比較不壓縮、gzip、lzma 的佔用空間與全文掃描時間
+- --metadata：比較依心情與日期篩選、統計時，逐檔解析與使用中繼資料索引的時間
+
+用法：
+    python read_benchmark.py --entries 10000 --workers 1,4,8,16
+    python read_benchmark.py --entries 10000 --exports --compression --metadata
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from digital_diary import DigitalDiary, read_entry_metadata
+from word_index import WordIndex
+
+WORDS = ["今天", "天氣", "很好", "散步", "公園", "咖啡", "工作", "會議", "讀書", "運動",
+         "morning", "coffee", "meeting", "project", "python", "walk", "rain", "music"]
+
+def create_entries(diary_dir, count, seed=42):
+    """產生 count 篇日記檔案（格式與 write_diary_entry 相同），回傳總位元組數"""
+    rng = random.Random(seed)
+    start = datetime.date(2000, 1, 1)
+    total = 0
+    for i in range(count):
+        date = start + datetime.timedelta(days=i)
+        body = "\n".join(" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 20)))
+                         for _ in range(rng.randint(3, 12)))
+        text = (f"📅 日記 - {date:%Y-%m-%d}\n✍️  作者：測試\n" + "=" * 60 + "\n\n"
+                f"⏰ 時間：21:00:00\n😊 心情：普通\n" + "─" * 40 + "\n" + body
+                + "\n\n" + "─" * 40 + "\n\n")
+        filename = os.path.join(diary_dir, f"diary_{date:%Y_%m_%d}.txt")
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(text)
+        total += os.path.getsize(filename)
+    return total
+
+def drop_cache(filenames):
+    """請作業系統丟掉檔案的快取；不支援時回傳 False"""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    os.sync()
+    for filename in filenames:
+        fd = os.open(filename, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+def warm_cache(filenames):
+    """把檔案完整讀過一次，讓它們留在快取中"""
+    for filename in filenames:
+        with open(filename, 'rb') as f:
+            while f.read(1 << 20):
+                pass
+
+def run_workload(diary, workload, entries, export_path):
+    """執行一種工作並回傳秒數"""
+    start = time.perf_counter()
+    if workload == "search":
+        diary.scan_entries(entries, "coffee")
+    elif workload == "export":
+        diary._export_txt(entries, export_path)
+    elif workload == "index":
+        diary.refresh_index(WordIndex(os.path.join(diary.diary_dir, "benchmark_index.json")), entries)
+    return time.perf_counter() - start
+
+def benchmark(diary_dir, worker_counts, workloads=("search", "export", "index")):
+    """對每種執行緒數量與工作，分別量測冷快取與熱快取的時間"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        diary = DigitalDiary(diary_dir)
+        entries = diary.list_all_entries()
+        diary.config    # 先載入設定，不計入讀取時間
+    filenames = [entry['filename'] for entry in entries]
+    export_path = os.path.join(tempfile.gettempdir(), "read_benchmark_export.txt")
+    
+    results = []
+    for workload in workloads:
+        for workers in worker_counts:
+            diary.read_workers = workers
+            row = {"workload": workload, "workers": workers}
+            
+            if drop_cache(filenames):
+                row["cold_seconds"] = run_workload(diary, workload, entries, export_path)
+            warm_cache(filenames)
+            row["warm_seconds"] = run_workload(diary, workload, entries, export_path)
+            results.append(row)
+    
+    if os.path.exists(export_path):
+        os.remove(export_path)
+    return len(entries), results
+
+def benchmark_exports(diary_dir, formats=("txt", "html", "json", "jsonl", "markdown")):
+    """量測每種匯出格式（未壓縮與 gzip）的匯出速度"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        diary = DigitalDiary(diary_dir)
+        count = len(diary.list_all_entries())
+        diary.config
+    
+    results = []
+    for format in formats:
+        for compress in (False, True):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                export_path = diary.export_diary(format, compress=compress)
+                seconds = time.perf_counter() - start
+            results.append({
+                "format": format + (".gz" if compress else ""),
+                "seconds": seconds,
+                "entries_per_second": count / seconds,
+                "bytes": os.path.getsize(export_path)
+            })
+            os.remove(export_path)
+    return count, results
+
+def benchmark_compression(diary_dir, codecs=(None, "gz", "xz")):
+    """在日記目錄的副本上壓縮所有日記，比較佔用空間與冷/熱快取的全文掃描時間"""
+    results = []
+    for codec in codecs:
+        work_dir = tempfile.mkdtemp(prefix="diary_tier_")
+        copy_dir = os.path.join(work_dir, "diary_entries")
+        shutil.copytree(diary_dir, copy_dir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                diary = DigitalDiary(copy_dir)
+                diary.config
+                start = time.perf_counter()
+                if codec:
+                    diary.compress_old_entries(days=0, codec=codec)
+                compress_seconds = time.perf_counter() - start
+                entries = diary.list_all_entries()
+            
+            filenames = sorted({entry['filename'] for entry in entries})
+            row = {
+                "codec": codec or "none",
+                "bytes": sum(os.path.getsize(filename) for filename in filenames),
+                "compress_seconds": compress_seconds
+            }
+            if drop_cache(filenames):
+                row["cold_scan_seconds"] = run_workload(diary, "search", entries, None)
+            warm_cache(filenames)
+            row["warm_scan_seconds"] = run_workload(diary, "search", entries, None)
+            results.append(row)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+def benchmark_metadata(diary_dir, mood="普通"):
+    """比較篩選與統計：逐檔讀取解析（不使用索引）、重建中繼資料索引、從索引查詢"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        diary = DigitalDiary(diary_dir)
+        entries = diary.list_all_entries()
+        diary.config
+    filenames = sorted({entry['filename'] for entry in entries})
+    start_date = min(entry['date'] for entry in entries)
+    end_date = start_date + datetime.timedelta(days=365)
+    
+    results = []
+    
+    # 不使用索引：讀取並解析每個檔案，再依日期與心情篩選
+    drop_cache(filenames)
+    start = time.perf_counter()
+    matched = [entry for entry, metadata in diary.read_entries(entries, read_entry_metadata)
+               if metadata is not None and start_date <= entry['date'] <= end_date
+               and any(entry_mood == mood for entry_mood, _ in metadata[1])]
+    results.append({"method": "scan", "seconds": time.perf_counter() - start, "matched": len(matched)})
+    
+    # 建立索引（第一次使用或重建時的成本）
+    drop_cache(filenames)
+    start = time.perf_counter()
+    diary.rebuild_metadata_index()
+    results.append({"method": "build", "seconds": time.perf_counter() - start, "matched": None})
+    
+    # 從索引查詢：新的程式（只掃描目錄，不讀取日記檔案）
+    with contextlib.redirect_stdout(io.StringIO()):
+        indexed = DigitalDiary(diary_dir)
+        indexed.config
+    start = time.perf_counter()
+    matched = indexed.filter_entries(start_date, end_date, mood)
+    results.append({"method": "filter", "seconds": time.perf_counter() - start, "matched": len(matched)})
+    
+    start = time.perf_counter()
+    indexed.get_statistics()
+    results.append({"method": "statistics", "seconds": time.perf_counter() - start, "matched": None})
+    
+    os.remove(os.path.join(diary_dir, diary.metadata_file))
+    return results
+
+def main():
+    """命令列進入點：執行效能測試"""
+    parser = argparse.ArgumentParser(description="日記檔案平行讀取效能測試")
+    parser.add_argument("--entries", type=int, default=10_000, help="產生的日記數量")
+    parser.add_argument("--workers", default="1,4,8,16", help="要比較的執行緒數量，以逗號分隔")
+    parser.add_argument("--diary-dir", help="使用現有的日記目錄（不產生新檔案）")
+    parser.add_argument("--exports", action="store_true", help="量測各種匯出格式的速度")
+    parser.add_argument("--compression", action="store_true", help="比較壓縮格式的空間與掃描時間")
+    parser.add_argument("--metadata", action="store_true", help="比較逐檔解析與中繼資料索引的篩選、統計時間")
+    args = parser.parse_args()
+    
+    worker_counts = [int(value) for value in args.workers.split(",") if value.strip()]
+    work_dir = None
+    diary_dir = args.diary_dir
+    if diary_dir is None:
+        work_dir = tempfile.mkdtemp(prefix="diary_bench_")
+        diary_dir = os.path.join(work_dir, "diary_entries")
+        os.makedirs(diary_dir)
+        size = create_entries(diary_dir, args.entries)
+        print(f"已產生 {args.entries:,} 篇日記（{size / 1024 / 1024:.1f} MB）")
+    
+    try:
+        count, results = benchmark(diary_dir, worker_counts)
+        if args.exports:
+            _, export_results = benchmark_exports(diary_dir)
+        if args.compression:
+            compression_results = benchmark_compression(diary_dir)
+        if args.metadata:
+            metadata_results = benchmark_metadata(diary_dir)
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    if args.exports:
+        print(f"\n{'格式':<14}{'秒數':>8}{'篇/秒':>12}{'大小':>14}")
+        for row in export_results:
+            print(f"{row['format']:<16}{row['seconds']:>8.3f}{row['entries_per_second']:>13,.0f}"
+                  f"{row['bytes'] / 1024 / 1024:>12.1f} MB")
+    
+    if args.compression:
+        print(f"\n{'壓縮':<8}{'大小':>12}{'壓縮耗時':>10}{'冷掃描':>10}{'熱掃描':>10}")
+        for row in compression_results:
+            cold = f"{row['cold_scan_seconds']:.3f}s" if "cold_scan_seconds" in row else "不支援"
+            print(f"{row['codec']:<8}{row['bytes'] / 1024 / 1024:>11.1f} MB{row['compress_seconds']:>11.2f}s"
+                  f"{cold:>12}{row['warm_scan_seconds']:>11.3f}s")
+    
+    if args.metadata:
+        print(f"\n{'方式':<12}{'秒數':>8}{'符合':>8}")
+        for row in metadata_results:
+            matched = "" if row['matched'] is None else row['matched']
+            print(f"{row['method']:<12}{row['seconds']:>10.4f}{matched:>10}")
+    
+    print(f"\n{'工作':<8}{'執行緒':>6}{'冷快取':>12}{'熱快取':>12}")
+    for row in results:
+        cold = f"{row['cold_seconds']:.3f}s" if "cold_seconds" in row else "不支援"
+        print(f"{row['workload']:<8}{row['workers']:>8}{cold:>14}{row['warm_seconds']:>13.3f}s")
+    print(f"\n共 {count:,} 篇日記")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Day 19: 三字元索引（Trigram Index）
+記錄每個日記檔案包含哪些連續三個字元，正規表示式搜尋時先用索引挑出候選檔案
+
+- 從正規表示式中找出「一定要出現」的文字片段，轉成三字元查詢
+- 只對候選檔案執行真正的正規表示式比對
+- 找不到可用的文字片段時，回傳 None 代表需要全部掃描
+"""
+
+import json
+import os
+
+try:
+    from re import _parser as sre_parse     # Python 3.11 以後
+except ImportError:
+    import sre_parse
+
+# 正規表示式解析後的語法節點種類
+LITERAL = sre_parse.LITERAL
+SUBPATTERN = sre_parse.SUBPATTERN
+BRANCH = sre_parse.BRANCH
+REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, "POSSESSIVE_REPEAT", None))
+ATOMIC_GROUP = getattr(sre_parse, "ATOMIC_GROUP", None)
+
+def trigrams(text):
+    """取得文字中所有連續三個字元（轉小寫，大小寫不同的搜尋可以共用索引）"""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def required_clauses(items):
+    """分析已解析的正規表示式，回傳必須成立的條件清單
+    
+    每個條件是一組文字片段，至少其中一個必須出現在符合的內容中（OR），
+    所有條件都必須成立（AND）。只保留長度至少 3 的片段。
+    """
+    clauses = []
+    run = []
+    
+    def close_run():
+        if len(run) >= 3:
+            clauses.append(["".join(run)])
+        run.clear()
+    
+    for op, value in items:
+        if op is LITERAL:
+            run.append(chr(value))
+            continue
+        
+        close_run()
+        
+        if op is SUBPATTERN:
+            clauses.extend(required_clauses(value[-1]))
+        elif op is ATOMIC_GROUP:
+            clauses.extend(required_clauses(value))
+        elif op in REPEATS:
+            minimum, _, item = value
+            if minimum >= 1:
+                clauses.extend(required_clauses(item))
+        elif op is BRANCH:
+            # 每個分支都要有可用的片段，才能組成「其中之一必須出現」的條件
+            alternatives = []
+            for branch in value[1]:
+                branch_clauses = required_clauses(branch)
+                if not branch_clauses:
+                    alternatives = None
+                    break
+                alternatives.append(max((text for clause in branch_clauses for text in clause
+                                         if len(clause) == 1), key=len, default=None))
+                if alternatives[-1] is None:
+                    alternatives = None
+                    break
+            if alternatives:
+                clauses.append(alternatives)
+    
+    close_run()
+    return clauses
+
+def pattern_clauses(pattern):
+    """把正規表示式字串轉成必須成立的條件清單"""
+    return required_clauses(sre_parse.parse(pattern))
+
+class TrigramIndex:
+    """三字元索引 - 三字元 → 包含它的檔案名稱，並記錄每個檔案索引時的修改時間與大小"""
+    
+    def __init__(self, index_path):
+        """初始化索引，index_path 是索引檔的位置"""
+        self.index_path = index_path
+        self.files = {}         # 檔名 → [修改時間, 大小]
+        self.postings = {}      # 三字元 → 檔名集合
+        self.dirty = False
+        self._file_grams = None     # 檔名 → 這個檔案包含的三字元
+    
+    def load(self):
+        """從索引檔載入，檔案不存在或格式錯誤時從空索引開始"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.files = data["files"]
+            self.postings = {gram: set(names) for gram, names in data["postings"].items()}
+        except (OSError, ValueError, KeyError):
+            self.files = {}
+            self.postings = {}
+        self.dirty = False
+        self._file_grams = None
+        return self
+    
+    def save(self):
+        """有變更時寫回索引檔（先寫暫存檔再取代，避免寫到一半的索引）"""
+        if not self.dirty:
+            return
+        
+        data = {
+            "files": self.files,
+            "postings": {gram: sorted(names) for gram, names in self.postings.items()}
+        }
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, self.index_path)
+        self.dirty = False
+    
+    def get_file_grams(self):
+        """檔名 → 這個檔案包含的三字元（第一次使用時從 postings 建立）"""
+        if self._file_grams is None:
+            self._file_grams = {name: set() for name in self.files}
+            for gram, names in self.postings.items():
+                for name in names:
+                    self._file_grams.setdefault(name, set()).add(gram)
+        return self._file_grams
+    
+    def add_file(self, name, content, mtime, size):
+        """索引一個檔案（已索引過的檔案會先移除）"""
+        self.remove_file(name)
+        
+        grams = trigrams(content)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(name)
+        self.get_file_grams()[name] = grams
+        self.files[name] = [mtime, size]
+        self.dirty = True
+    
+    def remove_file(self, name):
+        """把檔案從索引移除，只更新這個檔案包含的三字元"""
+        if name not in self.files:
+            return
+        
+        del self.files[name]
+        for gram in self.get_file_grams().pop(name, ()):
+            names = self.postings.get(gram)
+            if names is None:
+                continue
+            names.discard(name)
+            if not names:
+                del self.postings[gram]
+        self.dirty = True
+    
+    def is_current(self, name, mtime, size):
+        """檢查檔案自索引後是否沒有變動"""
+        return self.files.get(name) == [mtime, size]
+    
+    def update_file_stat(self, name, mtime, size):
+        """內容沒變、只換了儲存方式（例如壓縮）時，更新記錄的修改時間與大小，不必重新索引"""
+        if name in self.files:
+            self.files[name] = [mtime, size]
+            self.dirty = True
+    
+    def files_containing(self, text):
+        """回傳包含 text 所有三字元的檔案集合（可能多出不含 text 的檔案，但不會漏掉）"""
+        result = None
+        for gram in trigrams(text):
+            names = self.postings.get(gram, set())
+            result = set(names) if result is None else result & names
+            if not result:
+                return set()
+        return result if result is not None else set(self.files)
+    
+    def candidates(self, pattern):
+        """回傳可能符合正規表示式的檔案集合；沒有可用的文字片段時回傳 None"""
+        clauses = pattern_clauses(pattern)
+        if not clauses:
+            return None
+        
+        result = None
+        for clause in clauses:
+            matched = set()
+            for text in clause:
+                matched |= self.files_containing(text)
+            result = matched if result is None else result & matched
+            if not result:
+                return set()
+        return result
@@ -0,0 +1,223 @@
+"""
+Day 19: 詞彙反向索引（Inverted Index）
+記錄每個詞出現在哪些日記檔案的哪些行，關鍵字搜尋直接從索引找出候選行，並以 BM25 排序
+
+- 中日韓文字以「相鄰兩字」（bigram）為單位，單獨一個字時以單字為單位
+- 英文與數字以整個單字為單位，全部轉小寫
+- 查詢詞會對應到所有「包含它」的索引詞，因此只會多找、不會漏找，最後再逐行確認
+- 「片段 → 索引詞」對照表讓查詢詞直接查表找到包含它的索引詞，不必掃描整個詞彙表
+"""
+
+import json
+import math
+import os
+import re
+
+# 中日韓文字（平假名、片假名、漢字、韓文）
+CJK_PATTERN = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]+")
+WORD_PATTERN = re.compile(r"\w+")
+
+# BM25 參數
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 對照表中片段的最大長度：較短的查詢詞直接查同樣長度的對照表，較長的取各片段對應的索引詞再確認
+GRAM_LENGTH = 3
+
+def tokenize(text):
+    """把文字切成索引詞：中日韓文字取相鄰兩字，其他文字取整個單字"""
+    tokens = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        position = 0
+        for match in CJK_PATTERN.finditer(word):
+            if match.start() > position:
+                tokens.append(word[position:match.start()])
+            run = match.group()
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            position = match.end()
+        if position < len(word):
+            tokens.append(word[position:])
+    return tokens
+
+def grams(token, length):
+    """索引詞中所有長度為 length 的片段"""
+    return {token[i:i + length] for i in range(len(token) - length + 1)}
+
+class WordIndex:
+    """詞彙反向索引 - 詞 → {檔名: [出現次數, 行號清單]}，並記錄每個檔案的詞數供 BM25 使用"""
+    
+    def __init__(self, index_path):
+        """初始化索引，index_path 是索引檔的位置"""
+        self.index_path = index_path
+        self.files = {}         # 檔名 → [修改時間, 大小]
+        self.lengths = {}       # 檔名 → 詞數
+        self.postings = {}      # 詞 → {檔名: [出現次數, 行號清單]}
+        self.dirty = False
+        
+        # 由 postings 推得、不寫入索引檔的輔助結構，第一次需要時才建立
+        self._file_tokens = None    # 檔名 → 這個檔案包含的詞
+        self._token_grams = {}      # 片段長度 → {片段: 包含這個片段的詞}
+    
+    def load(self):
+        """從索引檔載入，檔案不存在或格式錯誤時從空索引開始"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.files = data["files"]
+            self.lengths = data["lengths"]
+            self.postings = data["postings"]
+        except (OSError, ValueError, KeyError):
+            self.files = {}
+            self.lengths = {}
+            self.postings = {}
+        self.dirty = False
+        self._file_tokens = None
+        self._token_grams = {}
+        return self
+    
+    def save(self):
+        """有變更時寫回索引檔（先寫暫存檔再取代，避免寫到一半的索引）"""
+        if not self.dirty:
+            return
+        
+        data = {"files": self.files, "lengths": self.lengths, "postings": self.postings}
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, self.index_path)
+        self.dirty = False
+    
+    def is_current(self, name, mtime, size):
+        """檢查檔案自索引後是否沒有變動"""
+        return self.files.get(name) == [mtime, size]
+    
+    def update_file_stat(self, name, mtime, size):
+        """內容沒變、只換了儲存方式（例如壓縮）時，更新記錄的修改時間與大小，不必重新索引"""
+        if name in self.files:
+            self.files[name] = [mtime, size]
+            self.dirty = True
+    
+    def get_file_tokens(self):
+        """檔名 → 這個檔案包含的詞（第一次使用時從 postings 建立）"""
+        if self._file_tokens is None:
+            self._file_tokens = {}
+            for token, documents in self.postings.items():
+                for name in documents:
+                    self._file_tokens.setdefault(name, []).append(token)
+        return self._file_tokens
+    
+    def get_token_grams(self, length):
+        """片段 → 包含這個片段的詞（每種長度在第一次查詢需要時才從詞彙表建立）"""
+        if length not in self._token_grams:
+            token_grams = self._token_grams[length] = {}
+            for token in self.postings:
+                for gram in grams(token, length):
+                    token_grams.setdefault(gram, set()).add(token)
+        return self._token_grams[length]
+    
+    def add_file(self, name, content, mtime, size):
+        """索引一個檔案（已索引過的檔案會先移除再重新索引）"""
+        self.remove_file(name)
+        
+        length = 0
+        tokens = {}
+        for line_number, line in enumerate(content.split('\n'), 1):
+            for token in tokenize(line):
+                length += 1
+                documents = self.postings.get(token)
+                if documents is None:
+                    documents = self.postings[token] = {}
+                    for gram_length, token_grams in self._token_grams.items():
+                        for gram in grams(token, gram_length):
+                            token_grams.setdefault(gram, set()).add(token)
+                posting = documents.setdefault(name, [0, []])
+                posting[0] += 1
+                if not posting[1] or posting[1][-1] != line_number:
+                    posting[1].append(line_number)
+                tokens[token] = None
+        
+        self.get_file_tokens()[name] = list(tokens)
+        self.files[name] = [mtime, size]
+        self.lengths[name] = length
+        self.dirty = True
+    
+    def remove_file(self, name):
+        """把檔案從索引移除（只更新這個檔案包含的詞）"""
+        if name not in self.files:
+            return
+        
+        del self.files[name]
+        del self.lengths[name]
+        for token in self.get_file_tokens().pop(name, ()):
+            documents = self.postings.get(token)
+            if documents is None or documents.pop(name, None) is None or documents:
+                continue
+            
+            # 沒有檔案包含這個詞了：從詞彙表與片段對照表移除
+            del self.postings[token]
+            for gram_length, token_grams in self._token_grams.items():
+                for gram in grams(token, gram_length):
+                    matches = token_grams.get(gram)
+                    if matches is not None:
+                        matches.discard(token)
+                        if not matches:
+                            del token_grams[gram]
+        self.dirty = True
+    
+    def matching_tokens(self, term):
+        """所有包含查詢詞的索引詞
+        
+        查詢詞不超過 GRAM_LENGTH 個字元時直接查表；較長時從它的片段中
+        對應索引詞最少的一個開始，逐一確認是否包含整個查詢詞。
+        """
+        if len(term) <= GRAM_LENGTH:
+            return self.get_token_grams(len(term)).get(term, ())
+        
+        token_grams = self.get_token_grams(GRAM_LENGTH)
+        candidates = min((token_grams.get(term[i:i + GRAM_LENGTH], ())
+                          for i in range(len(term) - GRAM_LENGTH + 1)), key=len)
+        return [token for token in candidates if term in token]
+    
+    def search(self, query):
+        """以 BM25 為包含查詢的檔案評分
+        
+        回傳 {檔名: (分數, 候選行號集合)}；候選行包含查詢的每一個詞，
+        實際是否包含整個查詢字串仍需逐行確認。查詢切不出任何詞時回傳 None。
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return None
+        
+        document_count = len(self.files)
+        average_length = sum(self.lengths.values()) / document_count if document_count else 0
+        
+        candidates = None       # 檔名 → 候選行號集合
+        scores = {}
+        for term in terms:
+            # 查詢詞可能只是較長單字的一部分，所以對應到所有包含它的索引詞
+            frequencies = {}
+            lines = {}
+            for token in self.matching_tokens(term):
+                for name, (count, line_numbers) in self.postings[token].items():
+                    frequencies[name] = frequencies.get(name, 0) + count
+                    lines.setdefault(name, set()).update(line_numbers)
+            
+            if candidates is None:
+                candidates = lines
+            else:
+                candidates = {name: candidates[name] & term_lines
+                              for name, term_lines in lines.items() if name in candidates}
+                candidates = {name: line_set for name, line_set in candidates.items() if line_set}
+            if not candidates:
+                return {}
+            
+            # BM25：詞越少見（idf 越大）、在短文件中出現越多次，分數越高
+            idf = math.log(1 + (document_count - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+            for name, frequency in frequencies.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[name] / (average_length or 1))
+                scores[name] = scores.get(name, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        
+        return {name: (scores[name], line_set) for name, line_set in candidates.items()}
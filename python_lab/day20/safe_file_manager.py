@@ -20,6 +20,127 @@ import datetime
 from pathlib import Path
 
 
+def trigrams(text):
+    """
+    All 3-character substrings of the lowercased text
+    """
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """
+    Persistent trigram index over the files in a directory
+    Like a book's index: look up a few pages instead of reading the whole book
+    
+    Maps every trigram to the names of the files containing it, and remembers
+    each file's mtime and size so changed files can be re-indexed.
+    Each file's own trigram set is kept in memory, so re-indexing or dropping
+    one file only touches that file's postings.
+    """
+    
+    def __init__(self, index_path):
+        self.index_path = Path(index_path)
+        self.files = {}      # filename -> [mtime_ns, size]
+        self.postings = {}   # trigram -> set of filenames
+        self.dirty = False
+        self._file_grams = None   # filename -> set of trigrams, derived from postings on first use
+    
+    def load(self):
+        """
+        Load the index from disk, starting empty if it is missing or damaged
+        """
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.files = data["files"]
+            self.postings = {gram: set(names) for gram, names in data["postings"].items()}
+        except (OSError, ValueError, KeyError):
+            self.files = {}
+            self.postings = {}
+        self.dirty = False
+        self._file_grams = None
+        return self
+    
+    def save(self):
+        """
+        Write the index back to disk if it changed (via a temp file, so it is never half-written)
+        """
+        if not self.dirty:
+            return
+        
+        data = {
+            "files": self.files,
+            "postings": {gram: sorted(names) for gram, names in self.postings.items()}
+        }
+        temp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temp_path, self.index_path)
+        self.dirty = False
+    
+    def is_current(self, name, mtime_ns, size):
+        """
+        Check whether a file is unchanged since it was indexed
+        """
+        return self.files.get(name) == [mtime_ns, size]
+    
+    def get_file_grams(self):
+        """
+        Map each indexed file to its trigrams (built from the postings the first time it is needed)
+        """
+        if self._file_grams is None:
+            self._file_grams = {name: set() for name in self.files}
+            for gram, names in self.postings.items():
+                for name in names:
+                    self._file_grams.setdefault(name, set()).add(gram)
+        return self._file_grams
+    
+    def add_file(self, name, content, mtime_ns, size):
+        """
+        Index a file's content, replacing whatever was indexed for it before
+        """
+        self.remove_files([name])
+        
+        grams = trigrams(content) if content else set()
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(name)
+        self.get_file_grams()[name] = grams
+        self.files[name] = [mtime_ns, size]
+        self.dirty = True
+    
+    def remove_files(self, names):
+        """
+        Drop files from the index, touching only the postings of their own trigrams
+        """
+        file_grams = self.get_file_grams()
+        for name in names:
+            if name not in self.files:
+                continue
+            
+            del self.files[name]
+            for gram in file_grams.pop(name, ()):
+                postings = self.postings.get(gram)
+                if postings is None:
+                    continue
+                postings.discard(name)
+                if not postings:
+                    del self.postings[gram]
+            self.dirty = True
+    
+    def candidates(self, search_term):
+        """
+        Files that may contain the term (never misses one; terms under 3 characters match all)
+        """
+        result = None
+        for gram in trigrams(search_term):
+            names = self.postings.get(gram, set())
+            result = set(names) if result is None else result & names
+            if not result:
+                return set()
+        return set(self.files) if result is None else result
+
+
 class SafeFileManager:
     """
     A robust file manager that handles errors gracefully
@@ -33,6 +154,11 @@ class SafeFileManager:
         self.working_dir = Path(working_dir)
         self.log_file = "file_manager_log.txt"
         self.config_file = "file_manager_config.json"
+        # The search index belongs to this directory, so it lives inside it
+        self.index_file = os.path.join(self.working_dir, "file_manager_search_index.json")
+        
+        # Content search index, loaded on the first search
+        self.search_index = None
         
         # Ensure working directory exists
         self.ensure_directory_exists(self.working_dir)
@@ -215,6 +341,10 @@ class SafeFileManager:
             with open(file_path, "w", encoding="utf-8") as f:
                 f.write(content)
             
+            # Keep the search index in step (if it has been loaded)
+            if self.search_index is not None:
+                self.index_file_content(file_path)
+            
             self.log_info(f"Successfully wrote file: {filename}")
             print(f"File '{filename}' written successfully!")
             return True
@@ -290,6 +420,8 @@ class SafeFileManager:
             
             # Delete the file
             file_path.unlink()
+            if self.search_index is not None:
+                self.search_index.remove_files([file_path.name])
             self.log_info(f"Successfully deleted file: {filename}")
             print(f"File '{filename}' deleted successfully!")
             return True
@@ -310,7 +442,7 @@ class SafeFileManager:
         try:
             files = []
             for item in self.working_dir.iterdir():
-                if item.is_file():
+                if item.is_file() and not self.is_internal_file(item.name):
                     file_info = {
                         'name': item.name,
                         'size': item.stat().st_size,
@@ -406,22 +538,97 @@ class SafeFileManager:
         print("Too many invalid attempts")
         return None
     
+    def read_for_index(self, file_path):
+        """
+        Read a file for indexing the way safe_read_file would, but quietly
+        """
+        try:
+            if file_path.stat().st_size / (1024 * 1024) > self.config.get("max_file_size_mb", 100):
+                return None
+            try:
+                return file_path.read_text(encoding="utf-8")
+            except UnicodeDecodeError:
+                return file_path.read_text(encoding="latin1")
+        except OSError:
+            return None
+    
+    def index_file_content(self, file_path):
+        """
+        (Re-)index a single file
+        """
+        try:
+            stat = file_path.stat()
+        except OSError:
+            self.search_index.remove_files([file_path.name])
+            return
+        
+        self.search_index.add_file(file_path.name, self.read_for_index(file_path),
+                                   stat.st_mtime_ns, stat.st_size)
+    
+    def is_internal_file(self, name):
+        """
+        Check whether a file in the working directory is the search index (or its temp file)
+        """
+        index_name = os.path.basename(self.index_file)
+        return name in (index_name, index_name + ".tmp")
+    
+    def get_search_index(self):
+        """
+        Load the search index and bring it up to date
+        
+        One directory scan compares every file's mtime and size with the index;
+        only new or changed files are read, and vanished files are dropped.
+        Returns the index and the file names in directory order.
+        """
+        if self.search_index is None:
+            self.search_index = SearchIndex(self.index_file).load()
+        
+        names = []
+        changed = []
+        with os.scandir(self.working_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or self.is_internal_file(entry.name):
+                    continue
+                names.append(entry.name)
+                stat = entry.stat()
+                if not self.search_index.is_current(entry.name, stat.st_mtime_ns, stat.st_size):
+                    changed.append((entry.name, stat))
+        
+        current = set(names)
+        self.search_index.remove_files([name for name in self.search_index.files if name not in current])
+        for name, stat in changed:
+            content = self.read_for_index(self.working_dir / name)
+            self.search_index.add_file(name, content, stat.st_mtime_ns, stat.st_size)
+        
+        try:
+            self.search_index.save()
+        except OSError as e:
+            self.log_error(f"Could not save search index: {e}")
+        
+        return self.search_index, names
+    
     def search_files(self, search_term):
         """
         Search for files containing a specific term
+        
+        The search index narrows the files down to a few candidates,
+        which are then read and checked for the term.
         """
         try:
             matching_files = []
-            
-            for file_path in self.working_dir.glob("*"):
-                if file_path.is_file():
-                    try:
-                        content = self.safe_read_file(file_path.name)
-                        if content and search_term.lower() in content.lower():
-                            matching_files.append(file_path.name)
-                    except Exception:
-                        # Skip files that can't be read
-                        continue
+            index, names = self.get_search_index()
+            candidates = index.candidates(search_term)
+            
+            for name in names:
+                if name not in candidates:
+                    continue
+                try:
+                    content = self.safe_read_file(name)
+                    if content and search_term.lower() in content.lower():
+                        matching_files.append(name)
+                except Exception:
+                    # Skip files that can't be read
+                    continue
             
             if matching_files:
                 print(f"\nFiles containing '{search_term}':")
@@ -442,7 +649,7 @@ class SafeFileManager:
         Show statistics about managed files
         """
         try:
-            files = list(self.working_dir.glob("*"))
+            files = [f for f in self.working_dir.glob("*") if not self.is_internal_file(f.name)]
             total_files = sum(1 for f in files if f.is_file())
             total_dirs = sum(1 for f in files if f.is_dir())
             
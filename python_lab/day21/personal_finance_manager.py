@@ -55,10 +55,11 @@ class PersonalFinanceManager:
         # Ensure all directories exist
         self.ensure_directories()
         
-        # Load data with error handling
-        self.transactions = self.load_transactions()
-        self.budgets = self.load_budgets()
-        self.config = self.load_config()
+        # Data files are loaded on first use (see the properties below),
+        # so the main menu appears without reading them
+        self._transactions = None
+        self._budgets = None
+        self._config = None
         
         # Default categories for new users
         self.default_categories = [
@@ -70,6 +71,45 @@ class PersonalFinanceManager:
         print("Personal Finance Manager initialized successfully!")
         print(f"Data directory: {self.data_dir.absolute()}")
     
+    @property
+    def transactions(self):
+        """
+        Transaction list, loaded from disk the first time it is needed
+        """
+        if self._transactions is None:
+            self._transactions = self.load_transactions()
+        return self._transactions
+    
+    @transactions.setter
+    def transactions(self, value):
+        self._transactions = value
+    
+    @property
+    def budgets(self):
+        """
+        Budget settings, loaded from disk the first time they are needed
+        """
+        if self._budgets is None:
+            self._budgets = self.load_budgets()
+        return self._budgets
+    
+    @budgets.setter
+    def budgets(self, value):
+        self._budgets = value
+    
+    @property
+    def config(self):
+        """
+        Configuration, loaded from disk (with defaults) the first time it is needed
+        """
+        if self._config is None:
+            self._config = self.load_config()
+        return self._config
+    
+    @config.setter
+    def config(self, value):
+        self._config = value
+    
     def ensure_directories(self):
         """
         Create necessary directories with error handling
@@ -14,13 +14,22 @@ This program showcases:
 Think of this as your personal academic performance consultant!
 """
 
-import matplotlib.pyplot as plt
-import numpy as np
 import json
 import csv
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-import seaborn as sns
+
+# The shared lazy-import helper lives next to the day folders
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lazy_import import LazyModule
+
+plt = LazyModule('matplotlib.pyplot')
+np = LazyModule('numpy')
+sns = LazyModule('seaborn')
+
+# Menu options that need the student data (option 9 exits)
+ANALYZER_OPTIONS = {"1", "2", "3", "4", "5", "6", "7", "8"}
 
 
 class GradeAnalyzer:
@@ -43,13 +52,17 @@ class GradeAnalyzer:
         
         print(f"📊 Grade Analyzer initialized with {len(self.students_data)} students")
         
-        # Set up matplotlib styling
-        self.setup_plot_style()
+        # matplotlib styling is applied before the first chart is drawn
+        self.plot_style_ready = False
     
     def setup_plot_style(self):
         """
         Configure matplotlib for professional-looking plots
         """
+        if self.plot_style_ready:
+            return
+        self.plot_style_ready = True
+        
         plt.style.use('default')  # Reset to default first
         
         # Set global parameters
@@ -235,6 +248,8 @@ class GradeAnalyzer:
         """
         Create comprehensive grade distribution visualizations
         """
+        self.setup_plot_style()
+        
         fig, axes = plt.subplots(2, 3, figsize=(18, 12))
         fig.suptitle('📊 Grade Distribution Analysis', fontsize=20, fontweight='bold', y=0.98)
         
@@ -309,6 +324,8 @@ class GradeAnalyzer:
         """
         Create performance trend analysis over the semester
         """
+        self.setup_plot_style()
+        
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
         fig.suptitle('📈 Performance Trends Analysis', fontsize=18, fontweight='bold')
         
@@ -437,6 +454,8 @@ class GradeAnalyzer:
         """
         Create a correlation heatmap between subjects
         """
+        self.setup_plot_style()
+        
         subjects = ['Mathematics', 'Science', 'English', 'History', 'Art']
         
         # Create correlation matrix
@@ -480,6 +499,8 @@ class GradeAnalyzer:
         """
         Create a comprehensive performance dashboard
         """
+        self.setup_plot_style()
+        
         fig = plt.figure(figsize=(20, 16))
         gs = fig.add_gridspec(4, 4, hspace=0.35, wspace=0.3)
         
@@ -846,8 +867,8 @@ def main():
     print("Professional academic performance analysis and visualization")
     print()
     
-    # Initialize the analyzer
-    analyzer = GradeAnalyzer()
+    # The analyzer (and numpy/matplotlib behind it) is created the first time an option needs it
+    analyzer = None
     
     while True:
         print("\n" + "=" * 60)
@@ -870,6 +891,9 @@ def main():
             print("📚 Keep making data-driven educational decisions!")
             break
         
+        if analyzer is None and choice in ANALYZER_OPTIONS:
+            analyzer = GradeAnalyzer()
+        
         if choice == "1":
             print("\n📊 Calculating Class Statistics...")
             stats = analyzer.calculate_statistics()
@@ -15,13 +15,44 @@ Think of this as your personal business intelligence platform!
 """
 
 import csv
-import pandas as pd
-import numpy as np
+import gzip
+import bz2
+import lzma
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
 
 
+# The shared lazy-import helper lives next to the day folders
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from lazy_import import LazyModule
+
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+
+# Menu options that work on the loaded sales data
+ANALYZER_OPTIONS = {"1", "2", "3", "4", "7", "8"}
+
+
+# Openers and file suffixes for streamed CSV exports
+COMPRESSION_OPENERS = {
+    None: open,
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open
+}
+
+COMPRESSION_SUFFIXES = {
+    None: '',
+    'gzip': '.gz',
+    'bz2': '.bz2',
+    'xz': '.xz'
+}
+
+
 class CSVProcessor:
     """
     Basic CSV processing using Python's built-in csv module
@@ -623,14 +654,15 @@ class SalesDataAnalyzer:
         
         return insights
     
-    def export_comprehensive_report(self, filename="comprehensive_sales_report.txt"):
+    def export_comprehensive_report(self, filename="comprehensive_sales_report.txt", insights=None):
         """
         Export detailed analysis report
         """
         if not self.analysis_results:
             self.comprehensive_analysis()
         
-        insights = self.identify_business_insights()
+        if insights is None:
+            insights = self.identify_business_insights()
         
         try:
             with open(filename, 'w', encoding='utf-8') as f:
@@ -684,47 +716,166 @@ class SalesDataAnalyzer:
             print(f"❌ Error exporting report: {e}")
             return None
     
-    def export_to_multiple_formats(self, base_filename="sales_analysis"):
+    def export_to_multiple_formats(self, base_filename="sales_analysis", compression=None,
+                                   chunk_size=100_000, columnar=False, max_workers=3):
         """
         Export analysis results to multiple formats
+        
+        The CSV, JSON and text writers run concurrently from one shared
+        snapshot, so insights are only computed once. The CSV is streamed
+        in chunks (optionally compressed with 'gzip', 'bz2' or 'xz') and
+        columnar=True adds a binary columnar export (Parquet when pyarrow
+        is installed, otherwise a NumPy .npz archive).
         """
+        if compression not in COMPRESSION_OPENERS:
+            print(f"❌ Unsupported compression: {compression}")
+            return None
+        
         try:
-            # Export cleaned CSV data
-            csv_file = f"{base_filename}_cleaned.csv"
-            self.sales_data.to_csv(csv_file, index=False)
-            print(f"📊 CSV data exported to {csv_file}")
+            if not self.analysis_results:
+                self.comprehensive_analysis()
             
-            # Export summary statistics as JSON
+            # Shared snapshot: everything the writers need, computed once
+            insights = self.identify_business_insights()
+            snapshot = {
+                'frame': self.sales_data,
+                'insights': insights,
+                'json_data': {
+                    'generation_timestamp': datetime.now().isoformat(),
+                    'data_period': {
+                        'start': self.sales_data['Date'].min().isoformat(),
+                        'end': self.sales_data['Date'].max().isoformat()
+                    },
+                    'overall_metrics': {key: value.item() if hasattr(value, 'item') else value
+                                        for key, value in self.analysis_results['overall_metrics'].items()},
+                    'insights': insights
+                }
+            }
+            
+            suffix = COMPRESSION_SUFFIXES[compression]
+            csv_file = f"{base_filename}_cleaned.csv{suffix}"
             json_file = f"{base_filename}_summary.json"
+            txt_file = f"{base_filename}_report.txt"
             
-            # Prepare JSON-serializable data
-            json_data = {
-                'generation_timestamp': datetime.now().isoformat(),
-                'data_period': {
-                    'start': self.sales_data['Date'].min().isoformat(),
-                    'end': self.sales_data['Date'].max().isoformat()
-                },
-                'overall_metrics': self.analysis_results['overall_metrics'],
-                'insights': self.identify_business_insights()
+            writers = {
+                'csv': (self._write_csv_chunks, (csv_file, snapshot['frame'], chunk_size, compression)),
+                'json': (self._write_json_summary, (json_file, snapshot['json_data'])),
+                'report': (self._write_text_report, (txt_file, snapshot['insights']))
             }
             
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, indent=2, ensure_ascii=False)
-            print(f"📋 JSON summary exported to {json_file}")
+            if columnar:
+                writers['columnar'] = (self._write_columnar, (base_filename, snapshot['frame']))
             
-            # Export comprehensive text report
-            txt_file = f"{base_filename}_report.txt"
-            self.export_comprehensive_report(txt_file)
+            results = {}
+            throughput = {}
             
-            return {
-                'csv': csv_file,
-                'json': json_file, 
-                'report': txt_file
-            }
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(self._timed_write, func, *args): fmt
+                           for fmt, (func, args) in writers.items()}
+                
+                for future in as_completed(futures):
+                    fmt = futures[future]
+                    output_file, stats = future.result()
+                    results[fmt] = output_file
+                    throughput[fmt] = stats
+            
+            if any(results[fmt] is None for fmt in writers):
+                print("❌ One or more exports failed")
+                return None
+            
+            print(f"\n⚡ Write throughput:")
+            for fmt in writers:
+                stats = throughput[fmt]
+                print(f"   {fmt}: {stats['megabytes']:.2f} MB in {stats['seconds']:.3f}s "
+                      f"({stats['mb_per_second']:.1f} MB/s)")
+            
+            results['throughput'] = throughput
+            return results
             
         except Exception as e:
             print(f"❌ Error in multi-format export: {e}")
             return None
+    
+    def _timed_write(self, writer, *args):
+        """
+        Run one export writer and measure its throughput
+        """
+        start = time.perf_counter()
+        output_file = writer(*args)
+        elapsed = time.perf_counter() - start
+        
+        size = Path(output_file).stat().st_size if output_file else 0
+        stats = {
+            'seconds': elapsed,
+            'bytes': size,
+            'megabytes': size / 1_000_000,
+            'mb_per_second': (size / 1_000_000) / elapsed if elapsed > 0 else 0.0
+        }
+        return output_file, stats
+    
+    def _write_csv_chunks(self, filename, frame, chunk_size, compression=None):
+        """
+        Stream a DataFrame to CSV chunk by chunk
+        """
+        try:
+            opener = COMPRESSION_OPENERS[compression]
+            with opener(filename, 'wt', newline='', encoding='utf-8') as f:
+                for start in range(0, max(len(frame), 1), chunk_size):
+                    frame.iloc[start:start + chunk_size].to_csv(f, index=False, header=(start == 0))
+            
+            print(f"📊 CSV data exported to {filename}")
+            return filename
+            
+        except Exception as e:
+            print(f"❌ Error exporting CSV: {e}")
+            return None
+    
+    def _write_json_summary(self, filename, json_data):
+        """
+        Write the JSON summary
+        """
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(json_data, f, indent=2, ensure_ascii=False)
+            
+            print(f"📋 JSON summary exported to {filename}")
+            return filename
+            
+        except Exception as e:
+            print(f"❌ Error exporting JSON: {e}")
+            return None
+    
+    def _write_text_report(self, filename, insights):
+        """
+        Write the text report from precomputed insights
+        """
+        return self.export_comprehensive_report(filename, insights=insights)
+    
+    def _write_columnar(self, base_filename, frame):
+        """
+        Write a binary columnar copy of the data
+        """
+        try:
+            try:
+                filename = f"{base_filename}_data.parquet"
+                frame.to_parquet(filename, index=False)
+            except ImportError:
+                # No Parquet engine installed, fall back to one array per column
+                filename = f"{base_filename}_data.npz"
+                columns = {}
+                for col in frame.columns:
+                    if frame[col].dtype == object:
+                        columns[col] = frame[col].astype(str).to_numpy()
+                    else:
+                        columns[col] = frame[col].to_numpy()
+                np.savez(filename, **columns)
+            
+            print(f"🗃️ Columnar data exported to {filename}")
+            return filename
+            
+        except Exception as e:
+            print(f"❌ Error exporting columnar data: {e}")
+            return None
 
 
 def main():
@@ -737,8 +888,8 @@ def main():
     print("Professional data processing and business intelligence toolkit")
     print()
     
-    # Initialize the analyzer
-    analyzer = SalesDataAnalyzer()
+    # The analyzer (and the sample data behind it) is created the first time an option needs it
+    analyzer = None
     
     while True:
         print("\n" + "=" * 60)
@@ -761,6 +912,9 @@ def main():
             print("📊 Remember: Good data analysis drives great business decisions!")
             break
         
+        if analyzer is None and choice in ANALYZER_OPTIONS:
+            analyzer = SalesDataAnalyzer()
+        
         if choice == "1":
             print("\n🔍 Running Data Quality Assessment...")
             analyzer.data_quality_check()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Day 26: Sales Analysis Benchmark Suite
+Reproducible timing and memory measurements for the sales analytics pipeline
+
+This script:
+- Generates seeded sales datasets at 10k, 1M and 10M rows
+- Times every stage of CSVProcessor and SalesDataAnalyzer
+- Records peak memory for each stage
+- Emits results as JSON and compares them against a stored baseline
+
+Usage:
+    python sales_benchmark.py --sizes 10k,1m --output results.json
+    python sales_benchmark.py --baseline results.json --threshold 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sales_analyzer import CSVProcessor, SalesDataAnalyzer
+
+
+DEFAULT_SIZES = ['10k', '1m', '10m']
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+CATEGORIES = {
+    'Electronics': ['Laptop', 'Smartphone', 'Tablet', 'Headphones', 'Smart Watch'],
+    'Clothing': ['T-Shirt', 'Jeans', 'Jacket', 'Sneakers', 'Dress'],
+    'Home & Garden': ['Coffee Maker', 'Vacuum Cleaner', 'Garden Tools', 'Lamp', 'Bed Sheets'],
+    'Books': ['Fiction Novel', 'Cookbook', 'Textbook', 'Children Book', 'Biography'],
+    'Sports': ['Football', 'Basketball', 'Yoga Mat', 'Dumbbells', 'Running Shoes']
+}
+
+SALES_TEAM = [
+    ('Alice Johnson', 'North'), ('Bob Smith', 'South'), ('Charlie Brown', 'East'),
+    ('Diana Prince', 'West'), ('Eve Adams', 'North'), ('Frank Wilson', 'South')
+]
+
+PAYMENT_METHODS = ['Credit Card', 'Debit Card', 'Cash', 'PayPal']
+
+
+def parse_size(text):
+    """
+    Turn '10k' or '1m' into a row count
+    """
+    text = text.strip().lower()
+    if text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def generate_dataset(rows, filename, seed=42):
+    """
+    Generate a seeded sales dataset with the same columns as the analyzer's sample data
+    """
+    rng = np.random.default_rng(seed)
+
+    products = [(category, product) for category, items in CATEGORIES.items() for product in items]
+    product_idx = rng.integers(0, len(products), rows)
+    rep_idx = rng.integers(0, len(SALES_TEAM), rows)
+
+    dates = pd.Timestamp('2023-06-01') + pd.to_timedelta(rng.integers(0, 580, rows), unit='D')
+    dates = dates.sort_values()
+
+    price = np.round(rng.uniform(8, 2000, rows), 2)
+    quantity = rng.choice([1, 2, 3], rows, p=[0.8, 0.15, 0.05])
+    subtotal = np.round(price * quantity, 2)
+    margin = rng.uniform(0.15, 0.5, rows)
+    cost = np.round(subtotal * (1 - margin), 2)
+    discount_percent = np.where(rng.random(rows) < 0.15, rng.choice([5, 10, 15, 20], rows), 0)
+    discount_amount = np.round(subtotal * discount_percent / 100, 2)
+    total = np.round(subtotal - discount_amount, 2)
+
+    frame = pd.DataFrame({
+        'Date': dates.strftime('%Y-%m-%d'),
+        'Order_ID': [f"ORD_{i:09d}" for i in range(rows)],
+        'Customer_ID': [f"CUST_{c}" for c in rng.integers(1000, 1000 + max(rows // 3, 1), rows)],
+        'Product': [products[i][1] for i in product_idx],
+        'Category': [products[i][0] for i in product_idx],
+        'Price': price,
+        'Quantity': quantity,
+        'Subtotal': subtotal,
+        'Discount_Percent': discount_percent,
+        'Discount_Amount': discount_amount,
+        'Total_Amount': total,
+        'Cost': cost,
+        'Profit': np.round(total - cost, 2),
+        'Sales_Rep': [SALES_TEAM[i][0] for i in rep_idx],
+        'Region': [SALES_TEAM[i][1] for i in rep_idx],
+        'Payment_Method': rng.choice(PAYMENT_METHODS, rows, p=[0.45, 0.25, 0.15, 0.15]),
+        'Day_of_Week': dates.strftime('%A'),
+        'Month': dates.strftime('%B'),
+        'Quarter': 'Q' + ((dates.month - 1) // 3 + 1).astype(str),
+        'Year': dates.year
+    })
+
+    frame.to_csv(filename, index=False)
+    return filename
+
+
+def measure(func, trace_memory=True):
+    """
+    Run one benchmark step, returning (result, seconds, peak_bytes)
+
+    The step's own console output is swallowed so it does not dominate the timing.
+    """
+    if trace_memory:
+        tracemalloc.start()
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    return result, elapsed, peak
+
+
+def benchmark_size(rows, data_dir, repeat=1, trace_memory=True, seed=42):
+    """
+    Run every pipeline step on a dataset of the given size
+    """
+    data_file = Path(data_dir) / f"sales_{rows}_{seed}.csv"
+    if not data_file.exists():
+        print(f"🏗️ Generating {rows:,} rows -> {data_file}")
+        generate_dataset(rows, data_file, seed)
+
+    export_dir = Path(tempfile.mkdtemp(prefix='sales_bench_'))
+    state = {}
+
+    def load_analyzer():
+        state['analyzer'] = SalesDataAnalyzer(str(data_file))
+
+    steps = [
+        ('read_csv', lambda: CSVProcessor().read_csv(str(data_file))),
+        ('read_as_dictionaries', lambda: state.setdefault('processor', CSVProcessor()).read_as_dictionaries(str(data_file))),
+        ('get_column_stats', lambda: state['processor'].get_column_stats('Total_Amount')),
+        ('load_sales_data', load_analyzer),
+        ('data_quality_check', lambda: state['analyzer'].data_quality_check()),
+        ('comprehensive_analysis', lambda: state['analyzer'].comprehensive_analysis()),
+        ('export_comprehensive_report', lambda: state['analyzer'].export_comprehensive_report(str(export_dir / 'report.txt'))),
+        ('export_to_multiple_formats', lambda: state['analyzer'].export_to_multiple_formats(str(export_dir / 'multi')))
+    ]
+
+    results = {}
+    try:
+        for name, func in steps:
+            timings = []
+            peaks = []
+            for _ in range(repeat):
+                _, elapsed, peak = measure(func, trace_memory)
+                timings.append(elapsed)
+                peaks.append(peak)
+
+            results[name] = {
+                'seconds': min(timings),
+                'rows_per_second': rows / min(timings) if min(timings) > 0 else None,
+                'peak_memory_mb': max(peaks) / 1_000_000 if trace_memory else None
+            }
+            print(f"   {name:<28} {results[name]['seconds']:>9.3f}s", end='')
+            if trace_memory:
+                print(f"  {results[name]['peak_memory_mb']:>9.1f} MB")
+            else:
+                print()
+    finally:
+        # Drop the per-size state and the exported reports before the next (larger) dataset
+        state.clear()
+        shutil.rmtree(export_dir, ignore_errors=True)
+
+    return results
+
+
+def compare_with_baseline(current, baseline, threshold):
+    """
+    Return a list of regressions where a step got slower than baseline * (1 + threshold)
+    """
+    regressions = []
+
+    if current['settings']['trace_memory'] != baseline.get('settings', {}).get('trace_memory'):
+        print("⚠️ Baseline was recorded with a different memory tracing setting; timings may not be comparable")
+
+    for size, steps in current['results'].items():
+        baseline_steps = baseline.get('results', {}).get(size, {})
+        for step, stats in steps.items():
+            if step not in baseline_steps:
+                continue
+
+            old = baseline_steps[step]['seconds']
+            new = stats['seconds']
+            if old > 0 and new > old * (1 + threshold):
+                regressions.append({
+                    'size': size,
+                    'step': step,
+                    'baseline_seconds': old,
+                    'current_seconds': new,
+                    'slowdown': new / old
+                })
+
+    return regressions
+
+
+def main():
+    """
+    Command line entry point for the benchmark suite
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the day26 sales analytics pipeline")
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES),
+                        help="comma separated row counts, e.g. 10k,1m,10m")
+    parser.add_argument('--data-dir', default='bench_data',
+                        help="where generated datasets are cached")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="runs per step; the fastest run is reported")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip tracemalloc (faster, but no peak memory figures)")
+    parser.add_argument('--output', help="write results JSON to this file")
+    parser.add_argument('--baseline', help="compare against a previous results JSON")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="allowed slowdown before a step counts as a regression (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    Path(args.data_dir).mkdir(parents=True, exist_ok=True)
+    trace_memory = not args.no_memory
+
+    report = {
+        'generated': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__
+        },
+        'settings': {
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'trace_memory': trace_memory
+        },
+        'results': {}
+    }
+
+    for size_text in args.sizes.split(','):
+        rows = parse_size(size_text)
+        print(f"\n⏱️ Benchmarking {rows:,} rows")
+        report['results'][str(rows)] = benchmark_size(rows, args.data_dir, args.repeat,
+                                                       trace_memory, args.seed)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"\n💾 Results saved to {args.output}")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+        regressions = compare_with_baseline(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for r in regressions:
+                print(f"   {r['size']} rows / {r['step']}: {r['baseline_seconds']:.3f}s -> "
+                      f"{r['current_seconds']:.3f}s ({r['slowdown']:.2f}x)")
+            return 1
+
+        print(f"\n✅ No regressions over {args.threshold:.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
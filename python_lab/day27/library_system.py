@@ -14,12 +14,21 @@ This program showcases:
 Think of this as a complete software system built with OOP principles!
 """
 
+from collections import OrderedDict
 from datetime import datetime, timedelta
+import heapq
 import json
 from pathlib import Path
 import random
 
 
+# Default number of serialized books/members kept by a Library's export cache
+INFO_CACHE_SIZE = 2_000_000
+
+# Borrows younger than this count as "recent" in the popularity score
+RECENT_BORROW_WINDOW = timedelta(days=91)
+
+
 class Person:
     """
     Base class for all people in the system
@@ -65,6 +74,9 @@ class Book:
         # Metadata
         self.added_date = datetime.now()
         self.last_borrowed = None
+        
+        # Bumped on every change so cached exports know when to refresh
+        self._version = 0
     
     def __str__(self):
         return f"'{self.title}' by {self.author} ({self.publication_year})"
@@ -100,6 +112,7 @@ class Book:
         if count > 0:
             self._total_copies += count
             self._available_copies += count
+            self.touch()
             return True, f"Added {count} copies. Total: {self._total_copies}"
         return False, "Count must be positive"
     
@@ -122,6 +135,7 @@ class Book:
             'due_date': datetime.now() + timedelta(days=14)
         }
         self._borrow_history.append(borrow_record)
+        self.touch()
         
         return True, f"Book borrowed successfully. Due: {borrow_record['due_date'].strftime('%Y-%m-%d')}"
     
@@ -133,8 +147,23 @@ class Book:
             return False, "All copies are already available"
         
         self._available_copies += 1
+        self.touch()
         return True, "Book returned successfully"
     
+    def touch(self):
+        """
+        Mark the book as changed (call after editing public attributes directly)
+        """
+        self._version += 1
+    
+    def info_expiry(self):
+        """
+        When get_info() changes on its own: the next borrow to drop out of the recent window
+        """
+        now = datetime.now()
+        expiries = [b['borrow_date'] + RECENT_BORROW_WINDOW for b in self._borrow_history]
+        return min((expiry for expiry in expiries if expiry > now), default=None)
+    
     def get_popularity_score(self):
         """
         Calculate popularity based on borrow history
@@ -193,6 +222,9 @@ class Member(Person):
         self._borrow_history = []
         self._fine_amount = 0.0
         self._total_books_borrowed = 0
+        
+        # Bumped on every change so cached exports know when to refresh
+        self._version = 0
     
     def _generate_member_id(self):
         """
@@ -261,6 +293,7 @@ class Member(Person):
         self._borrowed_books.append(borrow_record)
         self._borrow_history.append(borrow_record.copy())
         self._total_books_borrowed += 1
+        self.touch()
         
         return True, f"Successfully borrowed '{book.title}'. Due: {borrow_record['due_date'].strftime('%Y-%m-%d')}"
     
@@ -296,6 +329,7 @@ class Member(Person):
         book_record['fine_added'] = fine_added
         
         self._borrowed_books.remove(book_record)
+        self.touch()
         
         fine_message = f" Fine added: ${fine_added:.2f}" if fine_added > 0 else ""
         return True, f"Book returned successfully.{fine_message}"
@@ -326,8 +360,23 @@ class Member(Person):
             return False, f"Payment exceeds fine amount (${self._fine_amount:.2f})"
         
         self._fine_amount -= amount
+        self.touch()
         return True, f"Payment of ${amount:.2f} processed. Remaining fine: ${self._fine_amount:.2f}"
     
+    def touch(self):
+        """
+        Mark the member as changed (call after editing public attributes directly)
+        """
+        self._version += 1
+    
+    def info_expiry(self):
+        """
+        When get_member_stats() changes on its own: the next borrowed book to become overdue
+        """
+        now = datetime.now()
+        return min((record['due_date'] for record in self._borrowed_books
+                    if record['due_date'] >= now), default=None)
+    
     def get_member_stats(self):
         """
         Get comprehensive member statistics
@@ -385,7 +434,7 @@ class Library:
     Demonstrates composition and system architecture
     """
     
-    def __init__(self, name, address="", phone=""):
+    def __init__(self, name, address="", phone="", cache_size=INFO_CACHE_SIZE):
         self.name = name
         self.address = address
         self.phone = phone
@@ -405,6 +454,10 @@ class Library:
         # Transaction log
         self._transaction_log = []
         
+        # LRU cache of serialized books/members: key -> (object, version, expiry, info, json)
+        self._info_cache = OrderedDict()
+        self._cache_size = cache_size
+        
         print(f"🏛️ Library system '{name}' initialized successfully!")
     
     def _log_transaction(self, action, details):
@@ -450,6 +503,7 @@ class Library:
             return False, "Cannot remove book that is currently borrowed"
         
         del self._books[isbn]
+        self._info_cache.pop(('book', isbn), None)
         
         self._log_transaction("REMOVE_BOOK", {
             'isbn': isbn,
@@ -580,6 +634,55 @@ class Library:
         
         return success, message
     
+    def _cached_entry(self, kind, key, obj):
+        """
+        Return the cached (object, version, expiry, info, json) entry for a book or member
+        
+        An entry is reused while it belongs to the same object, the object's version has
+        not changed and its time-dependent fields (popularity window, overdue status) have
+        not expired; otherwise get_info()/get_member_stats() is called again.
+        """
+        cache_key = (kind, key)
+        entry = self._info_cache.get(cache_key)
+        
+        if (entry is not None and entry[0] is obj and entry[1] == obj._version
+                and (entry[2] is None or datetime.now() < entry[2])):
+            self._info_cache.move_to_end(cache_key)
+            return entry
+        
+        info = obj.get_info() if kind == 'book' else obj.get_member_stats()
+        entry = (obj, obj._version, obj.info_expiry(), info, None)
+        
+        self._info_cache[cache_key] = entry
+        self._info_cache.move_to_end(cache_key)
+        while len(self._info_cache) > self._cache_size:
+            self._info_cache.popitem(last=False)
+        
+        return entry
+    
+    def _cached_json(self, kind, key, obj):
+        """
+        Return the object's info already encoded as an indented JSON fragment
+        """
+        entry = self._cached_entry(kind, key, obj)
+        if entry[4] is None:
+            fragment = json.dumps(entry[3], indent=2, ensure_ascii=False)
+            entry = entry[:4] + (fragment,)
+            self._info_cache[(kind, key)] = entry
+        return entry[4]
+    
+    def get_book_info(self, isbn):
+        """
+        Cached equivalent of book.get_info() (treat the returned dict as read-only)
+        """
+        return self._cached_entry('book', isbn, self._books[isbn])[3]
+    
+    def get_member_info(self, member_id):
+        """
+        Cached equivalent of member.get_member_stats() (treat the returned dict as read-only)
+        """
+        return self._cached_entry('member', member_id, self._members[member_id])[3]
+    
     def get_popular_books(self, limit=10):
         """
         Get most popular books based on borrowing history
@@ -612,15 +715,19 @@ class Library:
         """
         Generate comprehensive system report
         """
-        total_books = len(self._books)
-        total_available = sum(book.available_copies for book in self._books.values())
-        total_copies = sum(book.total_copies for book in self._books.values())
+        # Work from the cached book/member info so unchanged objects are not recomputed
+        book_infos = [self.get_book_info(isbn) for isbn in self._books]
+        member_infos = [self.get_member_info(member_id) for member_id in self._members]
+        
+        total_books = len(book_infos)
+        total_available = sum(info['available_copies'] for info in book_infos)
+        total_copies = sum(info['total_copies'] for info in book_infos)
         currently_borrowed = total_copies - total_available
         
-        overdue_books = self.get_overdue_books()
-        total_fines = sum(member.fine_amount for member in self._members.values())
+        overdue_count = sum(info['overdue_books'] for info in member_infos)
+        total_fines = sum(info['fine_amount'] for info in member_infos)
         
-        popular_books = self.get_popular_books(5)
+        popular_books = heapq.nlargest(5, book_infos, key=lambda info: info['popularity_score'])
         
         report = f"""
 🏛️ LIBRARY SYSTEM REPORT: {self.name}
@@ -638,20 +745,20 @@ class Library:
 📈 ACTIVITY STATISTICS
    📚 Books Ever Borrowed: {self._total_books_borrowed:,}
    🔄 Books Returned: {self._total_books_returned:,}
-   ⏰ Currently Overdue: {len(overdue_books):,}
+   ⏰ Currently Overdue: {overdue_count:,}
    💰 Total Outstanding Fines: ${total_fines:.2f}
 
 🏆 TOP 5 POPULAR BOOKS:
 """
         
-        for i, book in enumerate(popular_books, 1):
-            report += f"   {i}. {book.title} by {book.author}\n"
-            report += f"      Popularity Score: {book.get_popularity_score():.1f}\n"
+        for i, info in enumerate(popular_books, 1):
+            report += f"   {i}. {info['title']} by {info['author']}\n"
+            report += f"      Popularity Score: {info['popularity_score']:.1f}\n"
         
         # Category breakdown
         categories = {}
-        for book in self._books.values():
-            categories[book.category] = categories.get(book.category, 0) + 1
+        for info in book_infos:
+            categories[info['category']] = categories.get(info['category'], 0) + 1
         
         report += f"\n📚 COLLECTION BY CATEGORY:\n"
         for category, count in sorted(categories.items()):
@@ -665,26 +772,43 @@ class Library:
         Export library data to JSON file
         """
         try:
-            export_data = {
-                'library_info': {
-                    'name': self.name,
-                    'address': self.address,
-                    'phone': self.phone,
-                    'established_date': self.established_date.isoformat()
-                },
-                'books': [book.get_info() for book in self._books.values()],
-                'members': [member.get_member_stats() for member in self._members.values()],
-                'statistics': {
-                    'total_books_added': self._total_books_added,
-                    'total_members_registered': self._total_members_registered,
-                    'total_books_borrowed': self._total_books_borrowed,
-                    'total_books_returned': self._total_books_returned
-                },
-                'export_date': datetime.now().isoformat()
+            library_info = {
+                'name': self.name,
+                'address': self.address,
+                'phone': self.phone,
+                'established_date': self.established_date.isoformat()
+            }
+            statistics = {
+                'total_books_added': self._total_books_added,
+                'total_members_registered': self._total_members_registered,
+                'total_books_borrowed': self._total_books_borrowed,
+                'total_books_returned': self._total_books_returned
             }
             
+            def encode(value):
+                # Same layout json.dump(..., indent=2) gives a value nested one level deep
+                return json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+            
+            def write_list(f, fragments):
+                # Cached fragments are encoded at the top level; indent them for the list
+                first = True
+                for fragment in fragments:
+                    f.write('[\n    ' if first else ',\n    ')
+                    f.write(fragment.replace('\n', '\n    '))
+                    first = False
+                f.write('[]' if first else '\n  ]')
+            
+            # The output matches json.dump(export_data, f, indent=2, ensure_ascii=False);
+            # books and members are written from cached, pre-encoded fragments
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+                f.write('{\n  "library_info": ' + encode(library_info) + ',\n  "books": ')
+                write_list(f, (self._cached_json('book', isbn, book)
+                               for isbn, book in self._books.items()))
+                f.write(',\n  "members": ')
+                write_list(f, (self._cached_json('member', member_id, member)
+                               for member_id, member in self._members.items()))
+                f.write(',\n  "statistics": ' + encode(statistics))
+                f.write(',\n  "export_date": ' + encode(datetime.now().isoformat()) + '\n}')
             
             return True, f"Library data exported to {filename}"
             
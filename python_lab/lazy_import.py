@@ -0,0 +1,28 @@
+"""
+Lazy imports shared by the interactive apps
+Heavy libraries (matplotlib, seaborn, pandas, numpy) take seconds to import,
+so the apps bind them to a LazyModule and the menu appears before they load
+
+Usage (from a dayNN script):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from lazy_import import LazyModule
+
+    np = LazyModule('numpy')
+"""
+
+import importlib
+
+
+class LazyModule:
+    """
+    Stand-in for a heavy module that is imported on first attribute access
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
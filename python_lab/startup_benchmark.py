@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for the interactive apps
+Measures time-to-first-prompt: how long each app takes from launch until its main menu asks for input
+
+This script:
+- Launches each app in a fresh Python process inside an empty temporary directory
+- Watches its output until the menu prompt appears, then stops the process
+- Repeats every launch and reports the fastest and median times
+- Optionally writes the results as JSON
+
+Usage:
+    python startup_benchmark.py
+    python startup_benchmark.py --apps diary,finance --repeat 10 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import selectors
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+LAB_DIR = Path(__file__).resolve().parent
+
+# name -> (script, text of the main menu prompt)
+APPS = {
+    'sales': ('day26/sales_analyzer.py', 'Select option (1-9):'),
+    'grades': ('day25/grade_analyzer.py', 'Select option (1-9):'),
+    'diary': ('day19/digital_diary.py', '請選擇功能 (0-7):'),
+    'finance': ('day21/personal_finance_manager.py', 'Select option (1-10):')
+}
+
+
+def time_to_prompt(script, prompt, timeout=60):
+    """
+    Launch one app and return the seconds until its prompt is printed (None on failure)
+    """
+    with tempfile.TemporaryDirectory(prefix='startup_bench_') as work_dir:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, '-u', str(LAB_DIR / script)],
+                                   cwd=work_dir, stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        target = prompt.encode('utf-8')
+        output = b''
+        elapsed = None
+
+        selector = selectors.DefaultSelector()
+        selector.register(process.stdout, selectors.EVENT_READ)
+        try:
+            while time.perf_counter() - start < timeout:
+                if not selector.select(timeout=0.5):
+                    continue
+                chunk = os.read(process.stdout.fileno(), 65536)
+                if not chunk:
+                    break   # the app exited before showing the menu
+                output += chunk
+                if target in output:
+                    elapsed = time.perf_counter() - start
+                    break
+        finally:
+            selector.close()
+            process.kill()
+            process.communicate()
+
+        if elapsed is None:
+            tail = output.decode('utf-8', errors='replace').strip().splitlines()[-3:]
+            print(f"   ⚠️ No prompt from {script}: {' | '.join(tail)}")
+        return elapsed
+
+
+def benchmark_app(name, repeat=5, timeout=60):
+    """
+    Measure one app several times
+    """
+    script, prompt = APPS[name]
+    timings = []
+    for _ in range(repeat):
+        elapsed = time_to_prompt(script, prompt, timeout)
+        if elapsed is None:
+            return None
+        timings.append(elapsed)
+
+    return {
+        'script': script,
+        'fastest_seconds': min(timings),
+        'median_seconds': statistics.median(timings),
+        'runs': timings
+    }
+
+
+def main():
+    """
+    Command line entry point for the startup benchmark
+    """
+    parser = argparse.ArgumentParser(description="Measure time-to-first-prompt of the interactive apps")
+    parser.add_argument('--apps', default=','.join(APPS),
+                        help=f"comma separated apps to measure ({', '.join(APPS)})")
+    parser.add_argument('--repeat', type=int, default=5, help="launches per app")
+    parser.add_argument('--timeout', type=float, default=60, help="seconds to wait for a prompt")
+    parser.add_argument('--output', help="write results JSON to this file")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.apps.split(',') if name.strip()]
+    unknown = [name for name in names if name not in APPS]
+    if unknown:
+        parser.error(f"unknown app(s): {', '.join(unknown)}")
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform()
+        },
+        'settings': {'repeat': args.repeat},
+        'results': {}
+    }
+
+    print(f"⏱️ Time to first prompt ({args.repeat} launches each)")
+    for name in names:
+        result = benchmark_app(name, args.repeat, args.timeout)
+        report['results'][name] = result
+        if result:
+            print(f"   {name:<10} fastest {result['fastest_seconds']:.3f}s   "
+                  f"median {result['median_seconds']:.3f}s")
+        else:
+            print(f"   {name:<10} failed")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+    return 0 if all(report['results'].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())